@@ -0,0 +1,137 @@
+"""
+Fixed-income analytics for the Bond Investment Platform
+Yield to maturity, duration, convexity and DV01 for many bonds at once
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+from coupon_schedule import ScheduleSet
+
+ONE_DAY = np.timedelta64(1, "D")
+
+# YTM bracket for the bisection fallback, as annual rates
+MAX_YIELD = 10.0
+NEWTON_ITERATIONS = 50
+BISECTION_ITERATIONS = 200
+PRICE_TOLERANCE = 1e-10
+
+
+def _present_value(periods: np.ndarray, flows: np.ndarray, ytm: np.ndarray, frequency: np.ndarray):
+    base = 1.0 + ytm[:, None] / frequency[:, None]
+    discount = base ** -periods
+    return (flows * discount).sum(axis=1), base, discount
+
+
+def solve_ytm(periods: np.ndarray, flows: np.ndarray, dirty_price: np.ndarray, frequency: np.ndarray,
+              guess: np.ndarray) -> np.ndarray:
+    """Solve PV(flows, ytm) = dirty_price for every bond
+
+    Vectorized Newton steps from `guess`; rows that fail to converge (or
+    leave the valid domain) are finished by vectorized bisection, which
+    always converges because PV is monotonic in the yield.
+    """
+    ytm = guess.astype(np.float64).copy()
+    # Divergent rows may step outside (1 + y/f) > 0; they are caught below
+    with np.errstate(all="ignore"):
+        for _ in range(NEWTON_ITERATIONS):
+            pv, base, discount = _present_value(periods, flows, ytm, frequency)
+            slope = (-periods * flows * discount / base).sum(axis=1) / frequency
+            ytm = ytm - (pv - dirty_price) / slope
+            if np.all(np.abs(pv - dirty_price) < PRICE_TOLERANCE * dirty_price):
+                break
+        pv = _present_value(periods, flows, ytm, frequency)[0]
+        failed = ~np.isfinite(ytm) | (ytm <= -frequency) | ~(np.abs(pv - dirty_price) < 1e-8 * dirty_price)
+    if failed.any():
+        ytm[failed] = _bisect(periods[failed], flows[failed], dirty_price[failed], frequency[failed])
+    return ytm
+
+
+def _bisect(periods: np.ndarray, flows: np.ndarray, dirty_price: np.ndarray, frequency: np.ndarray) -> np.ndarray:
+    low = -0.99 * frequency
+    high = np.full(len(dirty_price), MAX_YIELD)
+    for _ in range(BISECTION_ITERATIONS):
+        middle = (low + high) / 2
+        too_low = _present_value(periods, flows, middle, frequency)[0] > dirty_price
+        low = np.where(too_low, middle, low)
+        high = np.where(too_low, high, middle)
+    return (low + high) / 2
+
+
+def calculate_analytics(schedules: ScheduleSet, clean_price: np.ndarray,
+                        valuation_date: date) -> Dict[str, np.ndarray]:
+    """YTM, durations, convexity and DV01 for every bond at its clean price (per 100 face)
+
+    Cash flows come from each bond's coupon schedule. Yields are annual
+    rates compounded at the bond's coupon frequency, returned in percent;
+    durations in years; DV01 per 100 face. Matured bonds get NaN.
+    """
+    remaining = schedules.remaining_flows(valuation_date)
+    periods, flows = remaining["periods"], remaining["flows"] * 100
+    accrued = schedules.accrued(valuation_date) * 100
+    frequency = schedules.frequency
+
+    dirty_price = clean_price + accrued
+    live = remaining["counts"] > 0
+    ytm = np.full(len(schedules), np.nan)
+    macaulay = np.full(len(schedules), np.nan)
+    convexity = np.full(len(schedules), np.nan)
+
+    if live.any():
+        periods, amounts, price, freq = periods[live], flows[live], dirty_price[live], frequency[live]
+        guess = schedules.coupon_rate[live] / 10000
+        solved = solve_ytm(periods, amounts, price, freq, guess)
+        pv, base, discount = _present_value(periods, amounts, solved, freq)
+        ytm[live] = solved
+        macaulay[live] = (periods * amounts * discount).sum(axis=1) / pv / freq
+        convexity[live] = ((amounts * periods * (periods + 1) * discount / base ** 2).sum(axis=1)
+                           / pv / freq ** 2)
+
+    modified = macaulay / (1.0 + ytm / frequency)
+    start = np.datetime64(valuation_date, "D")
+    years = (schedules.maturity - start) / ONE_DAY / 365.0
+    return {
+        "bondId": schedules.ids,
+        "price": clean_price,
+        "accruedInterest": accrued,
+        "dirtyPrice": dirty_price,
+        "yieldToMaturity": ytm * 100,
+        "macaulayDuration": macaulay,
+        "modifiedDuration": modified,
+        "convexity": convexity,
+        "dv01": modified * dirty_price * 0.0001,
+        "yearsToMaturity": np.maximum(np.nan_to_num(years), 0.0),
+    }
+
+
+def price_from_yield(schedules: ScheduleSet, ytm_pct: np.ndarray, valuation_date: date) -> np.ndarray:
+    """Clean price per 100 face for annual yields given in percent (inverse of the YTM solve)"""
+    remaining = schedules.remaining_flows(valuation_date)
+    pv = _present_value(remaining["periods"], remaining["flows"] * 100, ytm_pct / 100, schedules.frequency)[0]
+    return pv - schedules.accrued(valuation_date) * 100
+
+
+def value_holdings(schedules: ScheduleSet, notional: np.ndarray, valuation_date: date,
+                   model_yield: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """Accrued interest, next-12-month coupons and mark-to-model value for one holding per bond
+
+    `notional` is the face amount held in each bond. Remaining flows are
+    discounted at `model_yield` (percent), or at each bond's coupon rate
+    when it is None; matured holdings are carried at par awaiting redemption.
+    """
+    accrued = schedules.accrued(valuation_date) * notional
+    income = schedules.projected(valuation_date, valuation_date + timedelta(days=365)) * notional
+    ytm = schedules.coupon_rate / 100 if model_yield is None else np.full(len(schedules), model_yield)
+    clean = price_from_yield(schedules, ytm, valuation_date) / 100 * notional
+    matured = ~(schedules.maturity > np.datetime64(valuation_date, "D"))
+    clean[matured] = notional[matured]
+    next_dates = schedules.next_payment(valuation_date)[0]
+    return {
+        "bondId": schedules.ids,
+        "accruedInterest": accrued,
+        "projectedAnnualIncome": income,
+        "marketValue": clean + accrued,
+        "nextPaymentDate": next_dates,
+    }
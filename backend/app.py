@@ -3,28 +3,55 @@ FastAPI Backend for Bond Investment Platform
 Manages bond metadata, yield calculations, and user investment records
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
 import json
 import os
 from dotenv import load_dotenv
 
-from models import Bond, Investment, Portfolio, YieldCalculation, UserRegister, UserLogin, Token, User, BondUpdate
-from services import BondService, InvestmentService, YieldCalculator, UserService
-from auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES, set_user_service
+from models import (
+    Bond, Investment, InvestmentBatch, YieldCalculation, UserRegister, UserLogin, Token, User, BondUpdate,
+    BondSchedule, CouponPayment, fits_scale
+)
+from services import (
+    BondService, InvestmentService, YieldCalculator, BondAnalyticsService, PortfolioValuationService,
+    PortfolioRiskService, UserService, AuthBusyError
+)
+from risk import RiskEngine
+from write_queue import GroupCommitWriter
+from serialization import FastJSONResponse, bond_struct, ndjson_chunks, csv_chunks
+from auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES, set_user_service, get_auth_cache_stats
 from admin_auth import create_admin_access_token, get_current_admin, authenticate_admin, ADMIN_ACCESS_TOKEN_EXPIRE_MINUTES
 from database import init_db_instance
+from blockchain_utils import BlockchainClient, InvestorStateReader
+from config import (
+    BLOCKCHAIN_RPC_URL, CHAIN_READS_ENABLED, RISK_DEFAULT_PATHS, RISK_DEFAULT_HORIZON_DAYS, INVEST_BATCH_MAX_ROWS,
+    GROUP_COMMIT_ENABLED
+)
 
 load_dotenv()
 
-app = FastAPI(title="Bond Investment Platform API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Drain background writers and stop worker processes before the worker exits"""
+    yield
+    if write_queue is not None:
+        # Commits investments still queued for the group-commit thread
+        write_queue.close()
+    risk_engine.close()
+
+
+app = FastAPI(title="Bond Investment Platform API", version="1.0.0", lifespan=lifespan)
 
 # Initialize database
-init_db_instance()
+db = init_db_instance()
 
 # CORS middleware for frontend access
 app.add_middleware(
@@ -37,14 +64,22 @@ app.add_middleware(
 
 # Initialize services
 bond_service = BondService()
-investment_service = InvestmentService()
-yield_calculator = YieldCalculator()
+# Concurrent single investments share commits through one writer thread
+write_queue = GroupCommitWriter(db) if GROUP_COMMIT_ENABLED else None
+investment_service = InvestmentService(write_queue)
+# Investor yields read BondToken state when a node is configured
+chain_client = BlockchainClient(BLOCKCHAIN_RPC_URL) if CHAIN_READS_ENABLED else None
+yield_calculator = YieldCalculator(InvestorStateReader(chain_client) if chain_client else None)
+analytics_service = BondAnalyticsService()
+portfolio_service = PortfolioValuationService(investment_service, bond_service)
+risk_engine = RiskEngine()
+risk_service = PortfolioRiskService(risk_engine, investment_service, bond_service)
 user_service = UserService()
 
 # Initialize auth with user service
 set_user_service(user_service)
 
-# Sample bonds data (in production, this would come from a database)
+# Sample bonds seeded into an empty catalog
 SAMPLE_BONDS = [
     {
         "id": 0,
@@ -55,6 +90,8 @@ SAMPLE_BONDS = [
         "maturityDate": (datetime.now() + timedelta(days=3650)).isoformat(),
         "issueDate": datetime.now().isoformat(),
         "description": "10-year US Treasury bond with semi-annual interest payments",
+        "couponFrequency": 2,
+        "dayCount": "ACT/ACT",
         "minimumInvestment": 10,  # $10 minimum
         "bondTokenAddress": "0x0000000000000000000000000000000000000000"  # Placeholder
     },
@@ -67,6 +104,8 @@ SAMPLE_BONDS = [
         "maturityDate": (datetime.now() + timedelta(days=1825)).isoformat(),
         "issueDate": datetime.now().isoformat(),
         "description": "5-year UK government bond with quarterly interest payments",
+        "couponFrequency": 4,
+        "dayCount": "ACT/ACT",
         "minimumInvestment": 20,  # £20 minimum
         "bondTokenAddress": "0x0000000000000000000000000000000000000001"  # Placeholder
     },
@@ -79,15 +118,45 @@ SAMPLE_BONDS = [
         "maturityDate": (datetime.now() + timedelta(days=1095)).isoformat(),
         "issueDate": datetime.now().isoformat(),
         "description": "3-year German government bond with annual interest payments",
+        "couponFrequency": 1,
+        "dayCount": "ACT/ACT",
         "minimumInvestment": 15,  # €15 minimum
         "bondTokenAddress": "0x0000000000000000000000000000000000000002"  # Placeholder
     }
 ]
 
-# Initialize sample bonds
-for bond_data in SAMPLE_BONDS:
-    bond = Bond(**bond_data)
-    bond_service.add_bond(bond)
+# Upper bound for paginated list endpoints
+MAX_PAGE_SIZE = 1000
+
+
+def check_page_size(limit: int):
+    """Reject page sizes outside 1..MAX_PAGE_SIZE"""
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+
+# Export format -> (media type, chunk encoder for Database.iter_* streams)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_chunks),
+    "csv": ("text/csv", csv_chunks),
+}
+
+
+def export_response(name: str, export_format: str, open_stream) -> StreamingResponse:
+    """Stream a Database.iter_* export as an NDJSON or CSV attachment"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if not investment_service.db:
+        raise HTTPException(status_code=500, detail="Database not available")
+    media_type, encode_chunks = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        encode_chunks(open_stream(investment_service.db)), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
+
+
+# Seed sample bonds; bonds already in the catalog (possibly edited by an admin) are kept
+bond_service.seed_bonds([Bond(**bond_data) for bond_data in SAMPLE_BONDS])
 
 
 @app.get("/")
@@ -115,7 +184,7 @@ async def register(user_data: UserRegister):
     print(f"DEBUG: Register endpoint called with email={user_data.email}")
     try:
         print(f"DEBUG: About to call create_user")
-        user = user_service.create_user(
+        user = await user_service.create_user_async(
             email=user_data.email,
             username=user_data.username,
             password=user_data.password
@@ -140,6 +209,12 @@ async def register(user_data: UserRegister):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except AuthBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -150,7 +225,14 @@ async def register(user_data: UserRegister):
 @app.post("/api/auth/login", response_model=Token)
 async def login(user_data: UserLogin):
     """Login user"""
-    user = user_service.authenticate_user(user_data.email, user_data.password)
+    try:
+        user = await user_service.authenticate_user_async(user_data.email, user_data.password)
+    except AuthBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     
     if not user:
         raise HTTPException(
@@ -186,11 +268,19 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @app.get("/api/bonds")
-async def get_bonds():
-    """Get all available bonds"""
-    bonds = bond_service.get_all_bonds()
-    # Convert Pydantic models to dict for JSON serialization
-    return [bond.model_dump() for bond in bonds]
+async def get_bonds(issuer: Optional[str] = None,
+                    min_coupon_rate: Optional[float] = None, max_coupon_rate: Optional[float] = None,
+                    matures_after: Optional[str] = None, matures_before: Optional[str] = None):
+    """Get all available bonds, optionally filtered by issuer, coupon rate (basis points) and maturity"""
+    if any(value is not None for value in (issuer, min_coupon_rate, max_coupon_rate,
+                                            matures_after, matures_before)):
+        bonds = bond_service.search_bonds(
+            issuer=issuer, min_coupon_rate=min_coupon_rate, max_coupon_rate=max_coupon_rate,
+            matures_after=matures_after, matures_before=matures_before
+        )
+        return FastJSONResponse([bond_struct(bond) for bond in bonds])
+    # Catalog Structs are cached between reloads and encoded without re-validation
+    return FastJSONResponse(bond_service.get_bond_structs())
 
 
 @app.get("/api/bonds/{bond_id}")
@@ -219,9 +309,14 @@ async def record_investment(investment_data: Investment, current_user: User = De
                 status_code=400,
                 detail=f"Investment amount must be at least ${bond.minimumInvestment}"
             )
+        if not fits_scale(investment.amount, bond.currencyScale):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Investment amount can have at most {bond.currencyScale} decimal places"
+            )
 
         # Persist investment with associated user id
-        record = investment_service.record_investment(investment, user_id=current_user.id)
+        record = await run_in_threadpool(investment_service.record_investment, investment, current_user.id)
 
         return {
             "success": True,
@@ -234,27 +329,109 @@ async def record_investment(investment_data: Investment, current_user: User = De
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/invest/batch")
+async def record_investment_batch(batch: InvestmentBatch, current_user: User = Depends(get_current_user)):
+    """Record many investments in one database transaction, with a result per row"""
+    try:
+        if not 1 <= len(batch.investments) <= INVEST_BATCH_MAX_ROWS:
+            raise HTTPException(status_code=400,
+                                detail=f"A batch must hold between 1 and {INVEST_BATCH_MAX_ROWS} investments")
+        
+        results = await run_in_threadpool(
+            investment_service.record_investments, batch.investments, current_user.id, bond_service.get_bond_map()
+        )
+        recorded = sum(result["status"] == "recorded" for result in results)
+        return FastJSONResponse({
+            "success": True,
+            "recorded": recorded,
+            "rejected": len(results) - recorded,
+            "results": results
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/portfolio")
 async def get_portfolio(current_user: User = Depends(get_current_user)):
-    """Get user portfolio with all investments (PRIVATE - requires authentication)"""
-    # Get investments for the current user by user ID
-    investments = investment_service.get_user_investments_by_id(current_user.id)
-    
-    # Calculate total value and yields
-    total_invested = sum(inv.amount for inv in investments)
-    total_value = total_invested  # Simplified - in production, calculate current market value
-    
-    portfolio = Portfolio(
-        address=current_user.wallet_address or "wallet_not_connected",
-        investments=investments,
-        totalInvested=total_invested,
-        totalValue=total_value,
-        totalYield=0  # Calculate from individual bond yields
+    """Get user portfolio with all investments, valued per holding (PRIVATE - requires authentication)"""
+    portfolio = await run_in_threadpool(
+        portfolio_service.get_portfolio, current_user.id, current_user.wallet_address or "wallet_not_connected"
     )
-    
+    return FastJSONResponse(portfolio)
+
+
+@app.get("/api/yield")
+async def calculate_yields(bond_ids: Optional[str] = Query(None, description="Comma-separated bond IDs; all bonds if omitted")):
+    """Calculate current yields for many bonds at once"""
+    arrays = bond_service.get_bond_arrays()
+    schedules = bond_service.get_coupon_schedules()
+    if bond_ids:
+        try:
+            ids = [int(bond_id) for bond_id in bond_ids.split(",") if bond_id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="bond_ids must be comma-separated integers")
+        arrays, schedules = arrays.take(ids), schedules.take(ids)
+    return yield_calculator.calculate_yields(arrays, schedules)
+
+
+@app.get("/api/analytics")
+async def get_bond_analytics(
+    bond_ids: Optional[str] = Query(None, description="Comma-separated bond IDs; all bonds if omitted"),
+    prices: Optional[str] = Query(None, description="Comma-separated clean prices per 100 face, aligned with bond_ids"),
+    valuation_date: Optional[date] = Query(None, alias="date", description="Valuation date (YYYY-MM-DD); today if omitted")
+):
+    """Calculate YTM, duration, convexity and DV01 for many bonds at once"""
+    schedules = bond_service.get_coupon_schedules()
+    try:
+        if bond_ids:
+            ids = [int(bond_id) for bond_id in bond_ids.split(",") if bond_id.strip()]
+            schedules = schedules.take(ids)
+            if len(schedules) != len(ids):
+                raise HTTPException(status_code=404, detail="Bond not found")
+        price_list = None
+        if prices:
+            if not bond_ids:
+                raise ValueError("prices require bond_ids")
+            price_list = [float(price) for price in prices.split(",") if price.strip()]
+            if any(price <= 0 for price in price_list):
+                raise ValueError("prices must be positive")
+        analytics = await run_in_threadpool(analytics_service.analyze, schedules, price_list, valuation_date)
+        return [item.model_dump() for item in analytics]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/analytics/portfolio")
+async def get_portfolio_analytics(current_user: User = Depends(get_current_user)):
+    """Get market-value-weighted risk measures for the user's holdings (PRIVATE - requires authentication)"""
+    holdings = investment_service.get_user_holdings(current_user.id)
+    portfolio = await run_in_threadpool(analytics_service.analyze_portfolio, bond_service.get_coupon_schedules(), holdings)
     return portfolio.model_dump()
 
 
+@app.get("/api/risk/portfolio")
+async def get_portfolio_risk(paths: int = RISK_DEFAULT_PATHS, horizon_days: int = RISK_DEFAULT_HORIZON_DAYS,
+                             seed: int = 0, current_user: User = Depends(get_current_user)):
+    """Get simulated VaR and expected shortfall for the user's holdings (PRIVATE - requires authentication)"""
+    try:
+        risk = await run_in_threadpool(risk_service.user_risk, current_user.id, paths, horizon_days, seed)
+        return risk.model_dump()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/yield/investor/{address}")
+async def calculate_investor_yields(address: str):
+    """Calculate investor-specific yields across all bonds"""
+    bonds = bond_service.get_all_bonds()
+    # Chain reads are blocking I/O; keep them off the event loop
+    yields = await run_in_threadpool(yield_calculator.calculate_investor_yields, bonds, address,
+                                     bond_service.get_coupon_schedules())
+    return [yield_data.model_dump() for yield_data in yields]
+
+
 @app.get("/api/yield/{bond_id}")
 async def calculate_yield(bond_id: int, address: Optional[str] = None):
     """Calculate current yield for a bond"""
@@ -263,11 +440,35 @@ async def calculate_yield(bond_id: int, address: Optional[str] = None):
         raise HTTPException(status_code=404, detail="Bond not found")
     
     # Calculate yield
-    yield_data = yield_calculator.calculate_yield(bond, address)
+    yield_data = await run_in_threadpool(yield_calculator.calculate_yield, bond, address,
+                                         bond_service.get_coupon_schedule(bond_id))
     
     return yield_data.model_dump()
 
 
+@app.get("/api/bonds/{bond_id}/schedule")
+async def get_bond_schedule(bond_id: int, investment: float = 1000.0):
+    """Get a bond's coupon payment dates and amounts for an investment amount"""
+    schedule = bond_service.get_coupon_schedule(bond_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail="Bond not found")
+    if investment <= 0:
+        raise HTTPException(status_code=400, detail="investment must be positive")
+    
+    today = date.today()
+    upcoming = [(day, amount) for day, amount in zip(schedule.dates.tolist(), schedule.amounts.tolist()) if day > today]
+    return BondSchedule(
+        bondId=bond_id,
+        couponFrequency=schedule.frequency,
+        dayCount=schedule.day_count,
+        investment=investment,
+        accruedInterest=investment * schedule.accrued(today),
+        nextPaymentDate=upcoming[0][0].isoformat() if upcoming else None,
+        payments=[CouponPayment(date=day.isoformat(), amount=investment * amount)
+                  for day, amount in zip(schedule.dates.tolist(), schedule.amounts.tolist())]
+    ).model_dump()
+
+
 @app.get("/api/bonds/{bond_id}/stats")
 async def get_bond_stats(bond_id: int):
     """Get statistics for a bond"""
@@ -275,12 +476,9 @@ async def get_bond_stats(bond_id: int):
     if not bond:
         raise HTTPException(status_code=404, detail="Bond not found")
     
-    # Get all investments for this bond
-    all_investments = investment_service.get_all_investments()
-    bond_investments = [inv for inv in all_investments if inv.bondId == bond_id]
-    
-    total_invested = sum(inv.amount for inv in bond_investments)
-    investor_count = len(set(inv.investorAddress for inv in bond_investments))
+    totals = investment_service.get_bond_totals(bond_id)
+    total_invested = totals['total_invested']
+    investor_count = totals['investor_count']
     
     # Calculate days to maturity
     maturity_date = datetime.fromisoformat(bond.maturityDate.replace('Z', '+00:00'))
@@ -292,8 +490,8 @@ async def get_bond_stats(bond_id: int):
         "investorCount": investor_count,
         "daysToMaturity": days_to_maturity,
         "couponRate": bond.couponRate / 100,  # Convert to percentage
-        "faceValue": bond.faceValue,
-        "utilization": (total_invested / bond.faceValue * 100) if bond.faceValue > 0 else 0
+        "faceValue": float(bond.faceValue),
+        "utilization": (total_invested / float(bond.faceValue) * 100) if bond.faceValue > 0 else 0
     }
 
 
@@ -309,6 +507,8 @@ async def create_bond(bond_data: Bond, current_user: User = Depends(get_current_
             "message": "Bond created successfully",
             "bond": bond_data.model_dump()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -317,11 +517,12 @@ async def create_bond(bond_data: Bond, current_user: User = Depends(get_current_
 async def get_user_investments_by_id(user_id: int, current_user: User = Depends(get_current_user)):
     """Get all investments for a specific user"""
     try:
-        investments = investment_service.db.get_user_investments(user_id) if investment_service.db else []
+        if not investment_service.db:
+            return {"userId": user_id, "investments": [], "totalInvested": 0}
         return {
             "userId": user_id,
-            "investments": investments,
-            "totalInvested": sum(inv['amount'] for inv in investments)
+            "investments": investment_service.db.get_user_investments(user_id),
+            "totalInvested": investment_service.db.get_investment_totals(user_id=user_id)["total_invested"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -331,27 +532,25 @@ async def get_user_investments_by_id(user_id: int, current_user: User = Depends(
 async def get_investment_statistics():
     """Get overall investment platform statistics"""
     try:
-        all_investments = investment_service.get_all_investments()
         all_bonds = bond_service.get_all_bonds()
-        
-        total_invested = sum(inv.amount for inv in all_investments)
-        total_investors = len(set(inv.investorAddress for inv in all_investments))
+        platform_totals = investment_service.get_platform_totals()
+        bond_totals = investment_service.get_all_bond_totals()
         
         # Calculate bond-wise statistics
         bond_stats = {}
         for bond in all_bonds:
-            bond_invs = [inv for inv in all_investments if inv.bondId == bond.id]
+            totals = bond_totals.get(bond.id, {})
             bond_stats[bond.id] = {
                 "name": bond.name,
-                "totalInvested": sum(inv.amount for inv in bond_invs),
-                "investorCount": len(set(inv.investorAddress for inv in bond_invs)),
-                "investmentCount": len(bond_invs)
+                "totalInvested": totals.get('total_invested', 0),
+                "investorCount": totals.get('investor_count', 0),
+                "investmentCount": totals.get('investment_count', 0)
             }
         
         return {
-            "totalInvested": total_invested,
-            "totalInvestors": total_investors,
-            "totalInvestments": len(all_investments),
+            "totalInvested": platform_totals['total_invested'],
+            "totalInvestors": platform_totals['investor_count'],
+            "totalInvestments": platform_totals['investment_count'],
             "totalBonds": len(all_bonds),
             "bondStats": bond_stats
         }
@@ -360,22 +559,34 @@ async def get_investment_statistics():
 
 
 @app.get("/api/investments/bond/{bond_id}")
-async def get_bond_investments(bond_id: int):
-    """Get all investments for a specific bond"""
+async def get_bond_investments(bond_id: int, limit: int = 100, cursor: Optional[str] = None,
+                               created_after: Optional[str] = None, created_before: Optional[str] = None):
+    """Get investments for a specific bond, newest first, paginated by cursor"""
     try:
+        check_page_size(limit)
         bond = bond_service.get_bond(bond_id)
         if not bond:
             raise HTTPException(status_code=404, detail="Bond not found")
         
-        investments = investment_service.get_bond_investments(bond_id)
+        investments, next_cursor = investment_service.get_bond_investments_page(
+            bond_id, limit=limit, cursor=cursor,
+            created_after=created_after, created_before=created_before
+        )
+        totals = investment_service.get_bond_totals(
+            bond_id, created_after=created_after, created_before=created_before
+        )
         
         return {
             "bondId": bond_id,
             "bondName": bond.name,
             "investments": [inv.model_dump() for inv in investments],
-            "totalInvested": sum(inv.amount for inv in investments),
-            "investorCount": len(set(inv.investorAddress for inv in investments))
+            "totalInvested": totals['total_invested'],
+            "investorCount": totals['investor_count'],
+            "investmentCount": totals['investment_count'],
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -415,53 +626,57 @@ async def admin_login(admin_data: UserLogin):
 
 
 @app.get("/api/admin/users")
-async def get_all_users_with_investments(admin: dict = Depends(get_current_admin)):
-    """Get all users and their investments (admin only)"""
+async def get_all_users_with_investments(limit: int = 100, cursor: Optional[str] = None,
+                                         created_after: Optional[str] = None,
+                                         created_before: Optional[str] = None,
+                                         admin: dict = Depends(get_current_admin)):
+    """Get users and their investments, newest users first, paginated by cursor (admin only)"""
     try:
-        # Get all users
-        all_investments = investment_service.get_all_investments()
-        all_bonds = bond_service.get_all_bonds()
+        check_page_size(limit)
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        users_data, next_cursor = investment_service.db.get_users_page(
+            limit=limit, cursor=cursor,
+            created_after=created_after, created_before=created_before
+        )
         
-        # Group investments by user_id
         users_dict = {}
+        for user_row in users_data:
+            user_id = user_row['id']
+            users_dict[user_id] = {
+                "id": user_id,
+                "email": user_row['email'],
+                "username": user_row['username'],
+                "created_at": user_row['created_at'],
+                "investments": []
+            }
         
-        if investment_service.db:
-            # Get users from database
-            users_data = investment_service.db.get_all_users()
-            for user_row in users_data:
-                user_id = user_row['id']
-                users_dict[user_id] = {
-                    "id": user_id,
-                    "email": user_row['email'],
-                    "username": user_row['username'],
-                    "created_at": user_row['created_at'],
-                    "investments": []
-                }
+        # Add investments for this page of users
+        for inv in investment_service.db.get_investments_for_users(list(users_dict)):
+            users_dict[inv['user_id']]["investments"].append({
+                "id": inv['id'],
+                "bond_id": inv['bond_id'],
+                "amount": inv['amount'],
+                "timestamp": inv['timestamp'],
+                "investor_address": inv['investor_address']
+            })
         
-        # Add investments to users
-        for inv in all_investments:
-            user_id = inv.user_id if hasattr(inv, 'user_id') else None
-            if user_id and user_id in users_dict:
-                users_dict[user_id]["investments"].append({
-                    "id": inv.id if hasattr(inv, 'id') else None,
-                    "bond_id": inv.bondId,
-                    "amount": inv.amount,
-                    "timestamp": inv.timestamp,
-                    "investor_address": inv.investorAddress
-                })
-        
-        # Calculate statistics
-        total_invested = sum(inv.amount for inv in all_investments)
-        total_investments = len(all_investments)
-        total_users = len(users_dict)
+        # Platform-wide statistics
+        totals = investment_service.get_platform_totals()
         
         return {
             "users": list(users_dict.values()),
-            "total_users": total_users,
-            "total_investments": total_investments,
-            "total_invested": total_invested,
-            "total_bonds": len(all_bonds)
+            "total_users": investment_service.db.count_users(),
+            "total_investments": totals['investment_count'],
+            "total_invested": totals['total_invested'],
+            "total_bonds": len(bond_service.get_all_bonds()),
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -487,13 +702,13 @@ async def get_user_investments_admin(user_id: int, admin: dict = Depends(get_cur
                 "investments": [
                     {
                         "bond_id": inv.bondId,
-                        "amount": inv.amount,
+                        "amount": float(inv.amount),
                         "timestamp": inv.timestamp,
                         "investor_address": inv.investorAddress
                     }
                     for inv in investments
                 ],
-                "total_invested": sum(inv.amount for inv in investments),
+                "total_invested": investment_service.db.get_investment_totals(user_id=user_id)["total_invested"],
                 "investment_count": len(investments)
             }
         else:
@@ -518,6 +733,8 @@ async def admin_create_bond(bond_data: Bond, admin: dict = Depends(get_current_a
             "message": "Bond created successfully",
             "bond": bond_data.model_dump()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -526,11 +743,11 @@ async def admin_create_bond(bond_data: Bond, admin: dict = Depends(get_current_a
 async def admin_get_all_bonds(admin: dict = Depends(get_current_admin)):
     """Get all bonds (admin view)"""
     try:
-        bonds = bond_service.get_all_bonds()
-        return {
+        bonds = bond_service.get_bond_structs()
+        return FastJSONResponse({
             "total_bonds": len(bonds),
-            "bonds": [bond.model_dump() for bond in bonds]
-        }
+            "bonds": bonds
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -544,14 +761,13 @@ async def admin_get_bond(bond_id: int, admin: dict = Depends(get_current_admin))
             raise HTTPException(status_code=404, detail="Bond not found")
         
         # Get investment stats for this bond
-        all_investments = investment_service.get_all_investments()
-        bond_investments = [inv for inv in all_investments if inv.bondId == bond_id]
+        totals = investment_service.get_bond_totals(bond_id)
         
         return {
             "bond": bond.model_dump(),
-            "total_invested": sum(inv.amount for inv in bond_investments),
-            "investor_count": len(set(inv.investorAddress for inv in bond_investments)),
-            "investment_count": len(bond_investments)
+            "total_invested": totals['total_invested'],
+            "investor_count": totals['investor_count'],
+            "investment_count": totals['investment_count']
         }
     except HTTPException:
         raise
@@ -563,23 +779,19 @@ async def admin_get_bond(bond_id: int, admin: dict = Depends(get_current_admin))
 async def admin_update_bond(bond_id: int, bond_update: BondUpdate, admin: dict = Depends(get_current_admin)):
     """Update bond details (admin only)"""
     try:
-        bond = bond_service.get_bond(bond_id)
-        if not bond:
-            raise HTTPException(status_code=404, detail="Bond not found")
-        
         # Update bond fields
         update_data = bond_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            if value is not None:
-                setattr(bond, key, value)
-        
-        bond_service.bonds[bond_id] = bond
+        bond = bond_service.update_bond(bond_id, update_data)
+        if not bond:
+            raise HTTPException(status_code=404, detail="Bond not found")
         
         return {
             "success": True,
             "message": f"Bond {bond_id} updated successfully",
             "bond": bond.model_dump()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -590,12 +802,9 @@ async def admin_update_bond(bond_id: int, bond_update: BondUpdate, admin: dict =
 async def admin_delete_bond(bond_id: int, admin: dict = Depends(get_current_admin)):
     """Delete a bond (admin only)"""
     try:
-        bond = bond_service.get_bond(bond_id)
-        if not bond:
+        if not bond_service.delete_bond(bond_id):
             raise HTTPException(status_code=404, detail="Bond not found")
         
-        del bond_service.bonds[bond_id]
-        
         return {
             "success": True,
             "message": f"Bond {bond_id} deleted successfully"
@@ -611,63 +820,80 @@ async def admin_delete_bond(bond_id: int, admin: dict = Depends(get_current_admi
 # =======================
 
 @app.get("/api/admin/users/full")
-async def admin_get_all_users_full(admin: dict = Depends(get_current_admin)):
-    """Get all users with full details including credentials (admin only)"""
+async def admin_get_all_users_full(limit: int = 100, cursor: Optional[str] = None,
+                                   admin: dict = Depends(get_current_admin)):
+    """Get users with full details including credentials (admin only)
+    
+    Results are paginated newest first; pass `next_cursor` from a response as
+    `cursor` to fetch the following page.
+    """
     try:
-        users_data = investment_service.db.get_all_users() if investment_service.db else []
+        check_page_size(limit)
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        summaries, next_cursor = investment_service.db.get_user_summaries(limit=limit, cursor=cursor)
         
         result = []
-        for user_row in users_data:
-            user_id = user_row['id']
-            
-            # Get payment access
-            payment_access = investment_service.db.get_payment_access(user_id) if investment_service.db else None
-            
-            # Get transactions
-            transactions = investment_service.db.get_user_transactions(user_id) if investment_service.db else []
-            
-            # Get bills
-            bills = investment_service.db.get_user_bills(user_id) if investment_service.db else []
-            
-            # Get investments
-            investments = investment_service.get_user_investments_by_id(user_id)
-            
+        for summary in summaries:
             result.append({
-                "id": user_id,
-                "email": user_row['email'],
-                "username": user_row['username'],
-                "hashed_password": user_row['hashed_password'],
-                "created_at": user_row['created_at'],
-                "payment_access": payment_access or {"status": "not_configured"},
-                "transaction_count": len(transactions),
-                "bill_count": len(bills),
-                "investment_count": len(investments),
-                "total_invested": sum(inv.amount for inv in investments),
+                "id": summary['id'],
+                "email": summary['email'],
+                "username": summary['username'],
+                "hashed_password": summary['hashed_password'],
+                "created_at": summary['created_at'],
+                "payment_access": summary['payment_access'] or {"status": "not_configured"},
+                "transaction_count": summary['transaction_count'],
+                "bill_count": summary['bill_count'],
+                "investment_count": summary['investment_count'],
+                "total_invested": summary['total_invested'],
                 "login_credentials": {
-                    "email": user_row['email'],
-                    "username": user_row['username'],
-                    "password_hash": user_row['hashed_password']
+                    "email": summary['email'],
+                    "username": summary['username'],
+                    "password_hash": summary['hashed_password']
                 }
             })
         
         return {
-            "total_users": len(result),
-            "users": result
+            "total_users": investment_service.db.count_users(),
+            "users": result,
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/admin/payment-access")
-async def admin_get_all_payment_access(admin: dict = Depends(get_current_admin)):
-    """Get payment access for all users (admin only)"""
+async def admin_get_all_payment_access(limit: int = 100, cursor: Optional[str] = None,
+                                       payment_status: Optional[str] = None,
+                                       access_level: Optional[str] = None,
+                                       admin: dict = Depends(get_current_admin)):
+    """Get payment access records, newest first, paginated by cursor (admin only)"""
     try:
-        payment_access_list = investment_service.db.get_all_payment_access() if investment_service.db else []
+        check_page_size(limit)
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        payment_access_list, next_cursor = investment_service.db.get_payment_access_page(
+            limit=limit, cursor=cursor,
+            payment_status=payment_status, access_level=access_level
+        )
         
         return {
-            "total_records": len(payment_access_list),
-            "payment_access": payment_access_list
+            "total_records": investment_service.db.count_payment_access(
+                payment_status=payment_status, access_level=access_level
+            ),
+            "payment_access": payment_access_list,
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -708,24 +934,42 @@ async def admin_update_payment_access(user_id: int, access_update: dict, admin:
 # =======================
 
 @app.get("/api/admin/transactions")
-async def admin_get_all_transactions(admin: dict = Depends(get_current_admin)):
-    """Get all transactions (admin only)"""
+async def admin_get_all_transactions(limit: int = 100, cursor: Optional[str] = None,
+                                     status_filter: Optional[str] = Query(None, alias="status"),
+                                     trans_type: Optional[str] = Query(None, alias="type"),
+                                     bond_id: Optional[int] = None, user_id: Optional[int] = None,
+                                     created_after: Optional[str] = None,
+                                     created_before: Optional[str] = None,
+                                     admin: dict = Depends(get_current_admin)):
+    """Get transactions, newest first, filtered and paginated by cursor (admin only)"""
     try:
-        transactions = investment_service.db.get_all_transactions() if investment_service.db else []
-        
-        # Group by status
-        by_status = {}
-        for trans in transactions:
-            status = trans['status']
-            if status not in by_status:
-                by_status[status] = []
-            by_status[status].append(trans)
+        check_page_size(limit)
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
         
-        return {
-            "total_transactions": len(transactions),
-            "by_status": by_status,
-            "transactions": transactions
+        filters = {
+            "user_id": user_id,
+            "bond_id": bond_id,
+            "status": status_filter,
+            "trans_type": trans_type,
+            "created_after": created_after,
+            "created_before": created_before
         }
+        transactions, next_cursor = investment_service.db.get_transactions_page(
+            limit=limit, cursor=cursor, raw_rows=True, **filters
+        )
+        status_counts = investment_service.db.get_transaction_status_counts(**filters)
+        
+        return FastJSONResponse({
+            "total_transactions": sum(status_counts.values()),
+            "status_counts": status_counts,
+            "transactions": transactions,
+            "next_cursor": next_cursor
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -741,15 +985,15 @@ async def admin_get_user_transactions(user_id: int, admin: dict = Depends(get_cu
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        transactions = investment_service.db.get_user_transactions(user_id)
+        transactions = investment_service.db.get_user_transactions(user_id, raw_rows=True)
         
-        return {
+        return FastJSONResponse({
             "user_id": user_id,
             "username": user['username'],
             "email": user['email'],
             "total_transactions": len(transactions),
             "transactions": transactions
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -761,27 +1005,48 @@ async def admin_get_user_transactions(user_id: int, admin: dict = Depends(get_cu
 # =======================
 
 @app.get("/api/admin/bills")
-async def admin_get_all_bills(admin: dict = Depends(get_current_admin)):
-    """Get all transaction bills (admin only)"""
+async def admin_get_all_bills(limit: int = 100, cursor: Optional[str] = None,
+                              status_filter: Optional[str] = Query(None, alias="status"),
+                              trans_type: Optional[str] = Query(None, alias="type"),
+                              user_id: Optional[int] = None,
+                              created_after: Optional[str] = None,
+                              created_before: Optional[str] = None,
+                              admin: dict = Depends(get_current_admin)):
+    """Get transaction bills, newest first, filtered and paginated by cursor (admin only)"""
     try:
-        bills = investment_service.db.get_all_bills() if investment_service.db else []
+        check_page_size(limit)
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        filters = {
+            "user_id": user_id,
+            "status": status_filter,
+            "trans_type": trans_type,
+            "created_after": created_after,
+            "created_before": created_before
+        }
+        bills, next_cursor = investment_service.db.get_bills_page(
+            limit=limit, cursor=cursor, raw_rows=True, **filters
+        )
         
-        # Calculate totals
-        total_amount = sum(bill['amount'] for bill in bills)
-        total_tax = sum(bill['tax_amount'] for bill in bills)
-        total_fee = sum(bill['fee_amount'] for bill in bills)
-        total_net = sum(bill['net_amount'] for bill in bills)
+        # Totals over every matching bill, not just this page
+        summary = investment_service.db.get_bills_summary(**filters)
         
-        return {
-            "total_bills": len(bills),
+        return FastJSONResponse({
+            "total_bills": summary['total_bills'],
             "summary": {
-                "total_amount": total_amount,
-                "total_tax": total_tax,
-                "total_fee": total_fee,
-                "total_net": total_net
+                "total_amount": summary['total_amount'],
+                "total_tax": summary['total_tax'],
+                "total_fee": summary['total_fee'],
+                "total_net": summary['total_net']
             },
-            "bills": bills
-        }
+            "bills": bills,
+            "next_cursor": next_cursor
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -798,11 +1063,7 @@ async def admin_get_user_bills(user_id: int, admin: dict = Depends(get_current_a
             raise HTTPException(status_code=404, detail="User not found")
         
         bills = investment_service.db.get_user_bills(user_id)
-        
-        total_amount = sum(bill['amount'] for bill in bills)
-        total_tax = sum(bill['tax_amount'] for bill in bills)
-        total_fee = sum(bill['fee_amount'] for bill in bills)
-        total_net = sum(bill['net_amount'] for bill in bills)
+        summary = investment_service.db.get_bills_summary(user_id=user_id)
         
         return {
             "user_id": user_id,
@@ -810,10 +1071,10 @@ async def admin_get_user_bills(user_id: int, admin: dict = Depends(get_current_a
             "email": user['email'],
             "total_bills": len(bills),
             "summary": {
-                "total_amount": total_amount,
-                "total_tax": total_tax,
-                "total_fee": total_fee,
-                "total_net": total_net
+                "total_amount": summary['total_amount'],
+                "total_tax": summary['total_tax'],
+                "total_fee": summary['total_fee'],
+                "total_net": summary['total_net']
             },
             "bills": bills
         }
@@ -823,6 +1084,195 @@ async def admin_get_user_bills(user_id: int, admin: dict = Depends(get_current_a
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# =======================
+# ADMIN EXPORTS
+# =======================
+
+@app.get("/api/admin/export/investments")
+async def admin_export_investments(export_format: str = Query("ndjson", alias="format"),
+                                   user_id: Optional[int] = None, bond_id: Optional[int] = None,
+                                   investor_address: Optional[str] = None,
+                                   created_after: Optional[str] = None, created_before: Optional[str] = None,
+                                   admin: dict = Depends(get_current_admin)):
+    """Stream matching investments, oldest first, as NDJSON or CSV (admin only)"""
+    return export_response("investments", export_format, lambda db: db.iter_investments(
+        user_id=user_id, bond_id=bond_id, investor_address=investor_address,
+        created_after=created_after, created_before=created_before
+    ))
+
+
+@app.get("/api/admin/export/transactions")
+async def admin_export_transactions(export_format: str = Query("ndjson", alias="format"),
+                                    status_filter: Optional[str] = Query(None, alias="status"),
+                                    trans_type: Optional[str] = Query(None, alias="type"),
+                                    bond_id: Optional[int] = None, user_id: Optional[int] = None,
+                                    created_after: Optional[str] = None, created_before: Optional[str] = None,
+                                    admin: dict = Depends(get_current_admin)):
+    """Stream matching transactions, oldest first, as NDJSON or CSV (admin only)"""
+    return export_response("transactions", export_format, lambda db: db.iter_transactions(
+        user_id=user_id, bond_id=bond_id, status=status_filter, trans_type=trans_type,
+        created_after=created_after, created_before=created_before
+    ))
+
+
+@app.get("/api/admin/export/bills")
+async def admin_export_bills(export_format: str = Query("ndjson", alias="format"),
+                             status_filter: Optional[str] = Query(None, alias="status"),
+                             trans_type: Optional[str] = Query(None, alias="type"),
+                             user_id: Optional[int] = None,
+                             created_after: Optional[str] = None, created_before: Optional[str] = None,
+                             admin: dict = Depends(get_current_admin)):
+    """Stream matching transaction bills, oldest first, as NDJSON or CSV (admin only)"""
+    return export_response("bills", export_format, lambda db: db.iter_bills(
+        user_id=user_id, status=status_filter, trans_type=trans_type,
+        created_after=created_after, created_before=created_before
+    ))
+
+
+# =======================
+# ADMIN SYSTEM MONITORING
+# =======================
+
+@app.get("/api/admin/system/db-pool")
+async def admin_get_db_pool_stats(admin: dict = Depends(get_current_admin)):
+    """Get database connection pool metrics (admin only)"""
+    try:
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        return investment_service.db.pool_stats()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/admin/system/auth-pool")
+async def admin_get_auth_pool_stats(admin: dict = Depends(get_current_admin)):
+    """Get password hashing pool metrics (admin only)"""
+    return user_service.hash_pool_stats()
+
+
+@app.get("/api/admin/system/auth-cache")
+async def admin_get_auth_cache_stats(admin: dict = Depends(get_current_admin)):
+    """Get token and user cache hit/miss counters (admin only)"""
+    return get_auth_cache_stats()
+
+
+@app.get("/api/admin/system/chain-cache")
+async def admin_get_chain_cache_stats(admin: dict = Depends(get_current_admin)):
+    """Get blockchain read cache hit rate and saved-RPC counters (admin only)"""
+    if chain_client is None:
+        return {"enabled": False}
+    return chain_client.cache_stats()
+
+
+@app.get("/api/admin/system/analytics-cache")
+async def admin_get_analytics_cache_stats(admin: dict = Depends(get_current_admin)):
+    """Get bond analytics memo size and hit/miss counters (admin only)"""
+    return analytics_service.cache_stats()
+
+
+@app.get("/api/admin/system/portfolio-cache")
+async def admin_get_portfolio_cache_stats(admin: dict = Depends(get_current_admin)):
+    """Get per-user portfolio valuation cache counters (admin only)"""
+    return portfolio_service.cache_stats()
+
+
+@app.get("/api/admin/risk/platform")
+async def admin_get_platform_risk(paths: int = RISK_DEFAULT_PATHS, horizon_days: int = RISK_DEFAULT_HORIZON_DAYS,
+                                  seed: int = 0, admin: dict = Depends(get_current_admin)):
+    """Get simulated VaR and expected shortfall for all platform investments (admin only)"""
+    try:
+        risk = await run_in_threadpool(risk_service.platform_risk, paths, horizon_days, seed)
+        return risk.model_dump()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/admin/system/risk-cache")
+async def admin_get_risk_cache_stats(admin: dict = Depends(get_current_admin)):
+    """Get Monte Carlo scenario cache counters (admin only)"""
+    return risk_engine.cache_stats()
+
+
+@app.get("/api/admin/system/write-queue")
+async def admin_get_write_queue_stats(admin: dict = Depends(get_current_admin)):
+    """Get group-commit writer counters (admin only)"""
+    if write_queue is None:
+        return {"enabled": False}
+    return {"enabled": True, **write_queue.stats()}
+
+
+@app.get("/api/admin/system/aggregates/verify")
+async def admin_verify_aggregates(admin: dict = Depends(get_current_admin)):
+    """Compare stored investment aggregates with the investments table (admin only)"""
+    try:
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        drift = investment_service.db.verify_aggregates()
+        return {
+            "consistent": not drift,
+            "drift": drift
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/admin/system/aggregates/rebuild")
+async def admin_rebuild_aggregates(admin: dict = Depends(get_current_admin)):
+    """Recompute investment aggregates from the investments table (admin only)"""
+    try:
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        return {
+            "success": True,
+            "platform": investment_service.db.rebuild_aggregates()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/admin/system/db-settings")
+async def admin_get_db_settings(admin: dict = Depends(get_current_admin)):
+    """Get the SQLite PRAGMA settings in effect (admin only)"""
+    try:
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        return {
+            "journal_mode": investment_service.db.journal_mode,
+            "configured": investment_service.db.pragmas,
+            "effective": investment_service.db.get_pragma_settings()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/admin/system/db-checkpoint")
+async def admin_checkpoint_db(mode: str = "PASSIVE", admin: dict = Depends(get_current_admin)):
+    """Run a WAL checkpoint (admin only)"""
+    try:
+        if not investment_service.db:
+            raise HTTPException(status_code=500, detail="Database not available")
+        
+        return investment_service.db.checkpoint(mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
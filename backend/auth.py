@@ -2,13 +2,17 @@
 Authentication utilities for JWT token management
 """
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Hashable, Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models import User
 from services import UserService
+from config import AUTH_CACHE_SIZE, AUTH_CACHE_TTL
 
 # JWT Configuration
 SECRET_KEY = "your-secret-key-change-this-in-production"  # In production, use environment variable
@@ -18,6 +22,83 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 security = HTTPBearer()
 
 
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL or an explicit deadline"""
+    
+    def __init__(self, max_size: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a live entry, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """Store an entry until the TTL elapses or `expires_at` (epoch seconds), whichever is first"""
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._entries[key] = (deadline, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable):
+        """Drop an entry if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Decoded claims keyed by raw token, and users keyed by ID
+_token_cache = TTLCache()
+_user_cache = TTLCache()
+
+
+def invalidate_user(user_id: int):
+    """Forget a cached user so the next request reloads it"""
+    _user_cache.pop(user_id)
+
+
+def get_auth_cache_stats() -> dict:
+    """Get hit/miss counters for the token and user caches"""
+    return {
+        "tokens": _token_cache.stats(),
+        "users": _user_cache.stats()
+    }
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -54,6 +135,9 @@ def set_user_service(service: UserService):
     """Set the user service (called from app.py)"""
     global _user_service
     _user_service = service
+    service.add_change_listener(invalidate_user)
+    _token_cache.clear()
+    _user_cache.clear()
 
 
 async def get_current_user(
@@ -67,7 +151,10 @@ async def get_current_user(
         )
     
     token = credentials.credentials
-    payload = verify_token(token)
+    payload = _token_cache.get(token)
+    if payload is None:
+        payload = verify_token(token)
+        _token_cache.set(token, payload, expires_at=payload.get("exp"))
     user_id = payload.get("sub")
     
     if user_id is None:
@@ -87,13 +174,17 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = _user_service.get_user_by_id(user_id)
+    # Cached users are shared between requests and must not be mutated
+    user = _user_cache.get(user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        user = _user_service.get_user_by_id(user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        _user_cache.set(user_id, user, expires_at=payload.get("exp"))
     
     return user
 
@@ -0,0 +1,54 @@
+"""
+Benchmark: ABI encode/decode throughput for contract reads
+Compares per-call keccak + eth_abi.encode/decode against compiled, cached functions
+
+Usage: python bench_abi_codec.py [--calls 100000]
+"""
+
+import argparse
+import time
+
+from eth_abi import encode, decode
+from eth_utils import keccak
+
+from blockchain_utils import BOND_TOKEN_FUNCTIONS
+
+SIGNATURE = "calculateAccruedInterest(address)"
+
+
+def naive_encode(investor: str) -> str:
+    return "0x" + (keccak(text=SIGNATURE)[:4] + encode(["address"], [investor])).hex()
+
+
+def naive_decode(data: str) -> tuple:
+    return decode(["uint256"], bytes.fromhex(data[2:]))
+
+
+def measure(label: str, func, items: list):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(items) / elapsed:>12,.0f} ops/s  {elapsed * 1e6 / len(items):>7.2f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ABI codec micro-benchmark")
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    function = BOND_TOKEN_FUNCTIONS["calculateAccruedInterest"]
+    investors = [f"0x{i:040x}" for i in range(args.calls)]
+    results = ["0x" + encode(["uint256"], [i * 10 ** 15]).hex() for i in range(args.calls)]
+    assert naive_encode(investors[7]) == function.encode_call(investors[7])
+    assert naive_decode(results[7]) == function.decode_output(results[7])
+
+    print(f"{args.calls} calls of {SIGNATURE}")
+    measure("encode: keccak + eth_abi", naive_encode, investors)
+    measure("encode: compiled function", function.encode_call, investors)
+    measure("decode: eth_abi.decode", naive_decode, results)
+    measure("decode: compiled function", function.decode_output, results)
+
+
+if __name__ == "__main__":
+    main()
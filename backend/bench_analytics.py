@@ -0,0 +1,50 @@
+"""
+Benchmark: catalog-wide YTM/duration/convexity, per-bond solves vs vectorized vs memoized
+
+Usage: python bench_analytics.py [--bonds 10000] [--repeat 5]
+"""
+
+import argparse
+import random
+from datetime import date
+
+import numpy as np
+
+from analytics import calculate_analytics
+from bench_yield_engine import best_of, make_bonds
+from coupon_schedule import CouponSchedule, ScheduleSet
+from services import BondAnalyticsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bond analytics benchmark")
+    parser.add_argument("--bonds", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    schedules = ScheduleSet(CouponSchedule.build(bond) for bond in make_bonds(args.bonds))
+    rng = random.Random(2)
+    prices = [round(rng.uniform(80.0, 120.0), 2) for _ in range(args.bonds)]
+    price_array = np.array(prices)
+    valuation_date = date(2026, 1, 1)
+    singles = [ScheduleSet([schedule]) for schedule in schedules.schedules]
+
+    per_bond = best_of(1, lambda: [
+        calculate_analytics(single, price_array[i:i + 1], valuation_date)
+        for i, single in enumerate(singles)
+    ])
+    vectorized = best_of(args.repeat, lambda: calculate_analytics(schedules, price_array, valuation_date))
+    cold = best_of(args.repeat, lambda: BondAnalyticsService().analyze(schedules, prices, valuation_date))
+    service = BondAnalyticsService()
+    service.analyze(schedules, prices, valuation_date)
+    warm = best_of(args.repeat, lambda: service.analyze(schedules, prices, valuation_date))
+
+    print(f"{args.bonds} bonds, best of {args.repeat}")
+    print(f"  one solve per bond                    {per_bond * 1000:9.2f} ms")
+    print(f"  vectorized columns                    {vectorized * 1000:9.2f} ms  ({per_bond / vectorized:,.0f}x)")
+    print(f"  service, cold memo (response models)  {cold * 1000:9.2f} ms")
+    print(f"  service, warm memo                    {warm * 1000:9.2f} ms  ({cold / warm:,.1f}x vs cold)")
+
+
+if __name__ == "__main__":
+    main()
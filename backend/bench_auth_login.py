@@ -0,0 +1,134 @@
+"""
+Benchmark: concurrent logins with inline bcrypt vs the worker-pool auth path
+Reports login p50/p99, overall RPS and latency of a cheap endpoint served meanwhile
+
+The API runs under uvicorn in a background thread and is driven over HTTP,
+so client-side timings include time requests spend queued behind a blocked
+event loop.
+
+Usage: python bench_auth_login.py [--logins 64] [--concurrency 16] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+import database
+from services import UserService, AuthBusyError
+
+PASSWORD = "BenchPassword123!"
+PING_INTERVAL = 0.01
+
+
+def build_app(user_service: UserService) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.post("/inline-login")
+    async def inline_login(email: str):
+        # Pre-change behaviour: bcrypt runs on the event loop
+        if not user_service.authenticate_user(email, PASSWORD):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @bench_app.post("/pooled-login")
+    async def pooled_login(email: str):
+        try:
+            user = await user_service.authenticate_user_async(email, PASSWORD)
+        except AuthBusyError:
+            raise HTTPException(status_code=503)
+        if not user:
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @bench_app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return bench_app
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, int(len(ordered) * pct) - 1)] * 1000
+
+
+async def run(client: httpx.AsyncClient, path: str, emails: list, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+    ping_latencies = []
+    done = asyncio.Event()
+
+    async def login(email: str):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(path, params={"email": email})
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def pinger():
+        # Latency is measured from each scheduled tick, so time spent waiting
+        # for a blocked event loop counts against the ping
+        tick = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(max(0.0, tick - time.perf_counter()))
+            await client.get("/ping")
+            ping_latencies.append(time.perf_counter() - tick)
+            tick = max(tick + PING_INTERVAL, time.perf_counter())
+
+    ping_task = asyncio.create_task(pinger())
+    start = time.perf_counter()
+    await asyncio.gather(*(login(email) for email in emails))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ping_task
+
+    print(f"{path:<15} rps={len(emails) / elapsed:>7.1f}  login p50={percentile(latencies, 0.5):>8.1f} ms  "
+          f"p99={percentile(latencies, 0.99):>8.1f} ms  ping p99={percentile(ping_latencies, 0.99):>8.1f} ms  "
+          f"statuses={statuses}")
+
+
+async def main(args):
+    database._db = database.Database(os.path.join(tempfile.mkdtemp(), "bench_auth.db"))
+    user_service = UserService(hash_workers=args.workers, max_pending=args.logins)
+    emails = []
+    for i in range(args.users):
+        email = f"bench{i}@example.com"
+        user_service.create_user(email, f"bench{i}", PASSWORD)
+        emails.append(email)
+    emails = [emails[i % len(emails)] for i in range(args.logins)]
+
+    server = uvicorn.Server(uvicorn.Config(build_app(user_service), host="127.0.0.1",
+                                           port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits,
+                                 timeout=120) as client:
+        print(f"{args.logins} logins, concurrency {args.concurrency}, {args.workers} hash workers")
+        await run(client, "/inline-login", emails, args.concurrency)
+        await run(client, "/pooled-login", emails, args.concurrency)
+
+    server.should_exit = True
+    thread.join()
+    database._db.delete_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
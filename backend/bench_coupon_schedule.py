@@ -0,0 +1,49 @@
+"""
+Benchmark: coupon schedules for the catalog, built from bond terms vs loaded from SQLite
+
+Usage: python bench_coupon_schedule.py [--bonds 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import date
+
+from bench_yield_engine import best_of, make_bonds
+from coupon_schedule import CouponSchedule, ScheduleSet
+from database import Database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coupon schedule benchmark")
+    parser.add_argument("--bonds", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bonds = make_bonds(args.bonds)
+    db = Database(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    for bond in bonds:
+        db.save_bond({"id": bond.id, "name": bond.name, "issuer": bond.issuer, "face_value": bond.faceValue,
+                      "coupon_rate": bond.couponRate, "maturity_date": bond.maturityDate,
+                      "issue_date": bond.issueDate, "minimum_investment": bond.minimumInvestment})
+    db.save_coupon_schedules([CouponSchedule.build(bond).to_row() for bond in bonds])
+    schedules = ScheduleSet(CouponSchedule.build(bond) for bond in bonds)
+    today = date(2026, 1, 1)
+
+    build = best_of(args.repeat, lambda: [CouponSchedule.build(bond) for bond in bonds])
+    load = best_of(args.repeat, lambda: [CouponSchedule.from_row(row) for row in db.get_coupon_schedules().values()])
+    flatten = best_of(args.repeat, lambda: ScheduleSet(schedules.schedules))
+    accrue = best_of(args.repeat, lambda: schedules.accrued(today))
+    per_bond = best_of(args.repeat, lambda: [schedule.accrued(today) for schedule in schedules.schedules])
+
+    print(f"{args.bonds} bonds, {len(schedules.ends)} coupon periods, best of {args.repeat}")
+    print(f"  build schedules from bond terms       {build * 1000:9.2f} ms")
+    print(f"  load stored schedules from SQLite     {load * 1000:9.2f} ms  ({build / load:,.1f}x)")
+    print(f"  flatten into a ScheduleSet            {flatten * 1000:9.2f} ms")
+    print(f"  accrued interest, per bond            {per_bond * 1000:9.2f} ms")
+    print(f"  accrued interest, flat arrays         {accrue * 1000:9.2f} ms  ({per_bond / accrue:,.0f}x)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: event indexer throughput against a local stand-in node
+Compares a fixed eth_getLogs block range with the adaptive range
+
+Usage: python bench_event_indexer.py [--events 50000] [--blocks 200000] [--fixed-range 500]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from blockchain_utils import BlockchainClient
+from database import Database
+from event_indexer import EventIndexer
+from mock_rpc_node import MockRPCNode, MockLogChain
+
+PLATFORM = "0x" + "ab" * 20
+TOKENS = ["0x" + f"{i + 1:02x}" * 20 for i in range(3)]
+EVENTS = ["InvestmentMade"] * 8 + ["InterestPaid", "PrincipalRedeemed"]
+
+
+def build_chain(events: int, blocks: int, investors: int) -> MockLogChain:
+    rng = random.Random(42)
+    chain = MockLogChain(max_logs=10000)
+    for chain_bond_id, token in enumerate(TOKENS):
+        chain.create_bond(1, PLATFORM, chain_bond_id, token, f"Bond {chain_bond_id}")
+    # Bursty activity: most blocks are empty, a few are busy
+    for block in sorted(rng.randint(2, blocks) for _ in range(events)):
+        event = rng.choice(EVENTS)
+        amounts = [rng.randint(1, 10_000) * 10 ** 18]
+        if event == "InvestmentMade":
+            amounts.append(amounts[0])
+        chain.token_event(block, rng.choice(TOKENS), event, f"0x{rng.randrange(investors):040x}", *amounts)
+    chain.head = blocks
+    return chain
+
+
+def run(label: str, node: MockRPCNode, **indexer_options):
+    db = Database(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    client = BlockchainClient(node.url)
+    indexer = EventIndexer(db, client, PLATFORM, start_block=0, confirmations=0, **indexer_options)
+    node.http_requests = 0
+    start = time.perf_counter()
+    stats = indexer.sync()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed:>8.2f}s {stats['events'] / elapsed:>10.0f} events/s "
+          f"{node.http_requests:>8} HTTP requests {stats['range_splits']:>6} splits "
+          f"final range {stats['block_range']}")
+    client.close()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event indexer throughput benchmark")
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--blocks", type=int, default=200000)
+    parser.add_argument("--investors", type=int, default=2000)
+    parser.add_argument("--fixed-range", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Building chain: {args.events} events over {args.blocks} blocks...")
+    chain = build_chain(args.events, args.blocks, args.investors)
+    with MockRPCNode() as node:
+        chain.attach(node)
+        print(f"{'mode':<16} {'time':>9} {'throughput':>17} {'requests':>21} {'splits':>13}")
+        run("fixed range", node, initial_range=args.fixed_range,
+            min_range=args.fixed_range, max_range=args.fixed_range)
+        run("adaptive range", node)
+
+
+if __name__ == "__main__":
+    main()
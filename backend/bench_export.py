@@ -0,0 +1,75 @@
+"""
+Benchmark: streaming transaction exports vs materializing every row
+Reports rows/s and peak RSS for NDJSON and CSV streams over a large transactions table
+
+Usage: python bench_export.py [--rows 5000000] [--batch 1000] [--baseline]
+"""
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+
+from database import Database
+from serialization import csv_chunks, ndjson_chunks
+
+INSERT_BATCH = 100000
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fill(db: Database, rows: int):
+    user_id = db.create_user("bench@example.com", "bench", "hash")["id"]
+    for start in range(0, rows, INSERT_BATCH):
+        with db.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO transactions
+                (user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at)
+                VALUES (?, 'investment', ?, ?, 'completed', ?, ?, 'Bench export', ?)
+            """, [
+                (user_id, i % 50, 10000 + i, f"2026-01-01T00:00:{i % 60:02d}", f"0x{i:064x}",
+                 f"2026-01-01T{i // 3600000 % 24:02d}:{i // 60000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:06d}")
+                for i in range(start, min(start + INSERT_BATCH, rows))
+            ])
+
+
+def measure(label: str, chunks, rows: int):
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in chunks)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed:7.2f} s  {rows / elapsed:>10,.0f} rows/s  "
+          f"{size / 2 ** 20:8.1f} MiB  peak RSS {peak_rss_mb():7.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming export benchmark")
+    parser.add_argument("--rows", type=int, default=5000000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--baseline", action="store_true",
+                        help="Also build the whole export in memory (needs several GB at 5M rows)")
+    args = parser.parse_args()
+
+    db = Database(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    start = time.perf_counter()
+    fill(db, args.rows)
+    print(f"{args.rows:,} transactions inserted in {time.perf_counter() - start:.1f} s, "
+          f"peak RSS {peak_rss_mb():.1f} MiB")
+
+    measure("NDJSON stream", ndjson_chunks(db.iter_transactions(batch_size=args.batch)), args.rows)
+    measure("CSV stream", csv_chunks(db.iter_transactions(batch_size=args.batch)), args.rows)
+    assert db.pool_stats()["in_use"] == 0
+
+    if args.baseline:
+        def materialized():
+            with db.get_connection() as conn:
+                rows = [dict(row) for row in conn.execute(db.TRANSACTION_LISTING).fetchall()]
+            yield json.dumps({"transactions": rows}).encode()
+        measure("fetchall + dicts + json.dumps", materialized(), args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: bulk investment ingestion, one commit per row vs POST /api/invest/batch
+The batch path also writes a transaction and a bill per investment
+
+Usage: python bench_invest_batch.py [--rows 10000] [--bonds 200] [--batch 5000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import database
+from bench_yield_engine import make_bonds
+from database import Database
+from models import Investment
+from services import BondService, InvestmentService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk investment ingestion benchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--bonds", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per batch request")
+    args = parser.parse_args()
+
+    database._db = Database(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    user_id = database._db.create_user("bench@example.com", "bench", "hash")["id"]
+    bond_service = BondService()
+    for bond in make_bonds(args.bonds):
+        bond_service.add_bond(bond)
+    investment_service = InvestmentService()
+
+    rng = random.Random(5)
+    investments = [
+        Investment(bondId=rng.randrange(args.bonds), investorAddress=f"0x{rng.randrange(500):040x}",
+                   amount=float(rng.randint(1000, 100000)))
+        for _ in range(args.rows)
+    ]
+    print(f"{args.rows:,} investments over {args.bonds} bonds")
+
+    start = time.perf_counter()
+    for investment in investments:
+        # What POST /api/invest does per request
+        bond = bond_service.get_bond(investment.bondId)
+        assert investment.amount >= bond.minimumInvestment
+        investment_service.record_investment(investment.model_copy(), user_id=user_id)
+    elapsed = time.perf_counter() - start
+    print(f"  one commit per row          {elapsed:7.2f} s  {args.rows / elapsed:>10,.0f} rows/s")
+
+    start = time.perf_counter()
+    for first in range(0, args.rows, args.batch):
+        results = investment_service.record_investments(investments[first:first + args.batch], user_id,
+                                                        bond_service.get_bond_map())
+        assert all(result["status"] == "recorded" for result in results)
+    elapsed = time.perf_counter() - start
+    print(f"  batches of {args.batch:<6}            {elapsed:7.2f} s  {args.rows / elapsed:>10,.0f} rows/s  "
+          f"(+ transaction and bill rows)")
+    assert database._db.verify_aggregates() == []
+
+
+if __name__ == "__main__":
+    main()
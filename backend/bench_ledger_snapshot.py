@@ -0,0 +1,92 @@
+"""
+Benchmark: columnar ledger snapshot vs pulling transactions as JSON
+Times the full and incremental snapshot runs, then a per-status amount total both ways
+
+Usage: python bench_ledger_snapshot.py [--rows 1000000] [--format auto] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_yield_engine import best_of
+from database import Database
+from ledger_snapshot import LedgerSnapshot
+
+STATUSES = ("completed", "pending", "failed")
+INSERT_BATCH = 100000
+
+
+def fill(db: Database, user_id: int, start: int, stop: int):
+    for first in range(start, stop, INSERT_BATCH):
+        with db.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO transactions
+                (user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at)
+                VALUES (?, 'investment', ?, ?, ?, ?, NULL, 'Bench', ?)
+            """, [
+                (user_id, i % 50, i % 1000 * 100, STATUSES[i % 3], created, created)
+                for i in range(first, min(first + INSERT_BATCH, stop))
+                for created in [f"2025-{i * 12 // stop + 1:02d}-15T12:00:00.{i % 1000000:06d}"]
+            ])
+
+
+def directory_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ledger snapshot benchmark")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--format", default="auto")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db = Database(db_file)
+    user_id = db.create_user("bench@example.com", "bench", "hash")["id"]
+    fill(db, user_id, 0, args.rows)
+
+    directory = tempfile.mkdtemp()
+    snapshot = LedgerSnapshot(directory, args.format)
+    start = time.perf_counter()
+    snapshot.update(db, ["transactions"])
+    elapsed = time.perf_counter() - start
+    print(f"{args.rows:,} transactions, {snapshot.format} snapshot")
+    print(f"  full snapshot            {elapsed:8.2f} s   {args.rows / elapsed:>10,.0f} rows/s  "
+          f"{len(snapshot.parts('transactions'))} parts, {directory_mb(directory):.1f} MiB "
+          f"(database {os.path.getsize(db_file) / 2 ** 20:.1f} MiB)")
+
+    extra = args.rows // 100
+    fill(db, user_id, args.rows, args.rows + extra)
+    start = time.perf_counter()
+    snapshot.update(db, ["transactions"])
+    print(f"  incremental (+{extra:,})    {time.perf_counter() - start:8.2f} s")
+
+    def from_json():
+        payload = json.dumps({"transactions": db.get_all_transactions()})
+        totals = {}
+        for row in json.loads(payload)["transactions"]:
+            totals[row["status"]] = totals.get(row["status"], 0.0) + row["amount"]
+        return totals
+
+    def from_snapshot():
+        totals = {}
+        for part in snapshot.scan("transactions", columns=["status", "amount"]):
+            statuses, codes = np.unique(part["status"], return_inverse=True)
+            for status, total in zip(statuses.tolist(), np.bincount(codes, weights=part["amount"]).tolist()):
+                totals[status] = totals.get(status, 0.0) + total
+        return totals
+
+    assert from_json().keys() == from_snapshot().keys()
+    print(f"  totals by status, JSON   {best_of(args.repeat, from_json) * 1000:8.1f} ms")
+    print(f"  totals by status, mmap   {best_of(args.repeat, from_snapshot) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: GET /api/portfolio valuation, per-row models vs grouped, vectorized and cached
+
+Usage: python bench_portfolio.py [--investments 20000] [--bonds 200] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+import database
+from bench_yield_engine import best_of, make_bonds
+from database import Database
+from services import BondService, InvestmentService, PortfolioValuationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio valuation benchmark")
+    parser.add_argument("--investments", type=int, default=20000)
+    parser.add_argument("--bonds", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database._db = Database(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    user_id = database._db.create_user("bench@example.com", "bench", "hash")["id"]
+    bond_service = BondService()
+    for bond in make_bonds(args.bonds):
+        bond_service.add_bond(bond)
+    rng = random.Random(3)
+    for _ in range(args.investments):
+        database._db.record_investment(user_id, rng.randrange(args.bonds), "0x" + "a" * 40,
+                                       rng.randint(10, 1000), "2026-01-01T00:00:00")
+    investment_service = InvestmentService()
+    portfolios = PortfolioValuationService(investment_service, bond_service)
+    bond_service.get_coupon_schedules()
+
+    def per_row():
+        investments = investment_service.get_user_investments_by_id(user_id)
+        return sum(inv.amount for inv in investments)
+
+    def cold():
+        portfolios.invalidate(user_id)
+        return portfolios.get_portfolio(user_id, "0xbench")
+
+    old = best_of(args.repeat, per_row)
+    valued = best_of(args.repeat, cold)
+    holdings = best_of(args.repeat, lambda: investment_service.get_user_holdings(user_id))
+    warm = best_of(args.repeat, lambda: portfolios.get_portfolio(user_id, "0xbench"))
+
+    print(f"{args.investments} investments across {args.bonds} bonds, best of {args.repeat}")
+    print(f"  per-row Investment models, summed only  {old * 1000:9.2f} ms")
+    print(f"  grouped holdings query                  {holdings * 1000:9.2f} ms")
+    print(f"  full valuation incl. investment list    {valued * 1000:9.2f} ms")
+    print(f"  cached valuation                        {warm * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
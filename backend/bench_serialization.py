@@ -0,0 +1,68 @@
+"""
+Benchmark: response serialization cost for large list endpoints
+Compares model_dump + FastAPI's jsonable_encoder + JSONResponse against msgspec Structs and sqlite3.Row encoding
+
+Usage: python bench_serialization.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import tempfile
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import database
+from bench_yield_engine import best_of, make_bonds
+from database import Database
+from serialization import FastJSONResponse, bond_struct
+
+
+def fastapi_default(content) -> bytes:
+    """What FastAPI does with a returned dict/list and no response_model"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def report(label: str, seconds: float, rows: int):
+    print(f"  {label:<40} {seconds * 1000:8.2f} ms  {seconds * 1e6 / rows:6.2f} us/row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bonds = make_bonds(args.rows)
+    structs = [bond_struct(bond) for bond in bonds]
+    assert FastJSONResponse(structs).body == FastJSONResponse([bond.model_dump() for bond in bonds]).body
+
+    print(f"GET /api/bonds, {args.rows} bonds")
+    report("model_dump + jsonable_encoder + json", best_of(args.repeat, lambda: fastapi_default(
+        [bond.model_dump() for bond in bonds])), args.rows)
+    report("model_dump + msgspec", best_of(args.repeat, lambda: FastJSONResponse(
+        [bond.model_dump() for bond in bonds]).body), args.rows)
+    report("cached Structs + msgspec", best_of(args.repeat, lambda: FastJSONResponse(structs).body), args.rows)
+
+    db = database._db = Database(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    user_id = db.create_user("bench@example.com", "bench", "hash")["id"]
+    with db.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO transactions
+            (user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at)
+            VALUES (?, 'investment', ?, ?, 'completed', '2026-01-01T00:00:00', ?, 'Bench', '2026-01-01T00:00:00')
+        """, [(user_id, i % 50, 10000 + i, f"0x{i:064x}") for i in range(args.rows)])
+
+    print(f"GET /api/admin/transactions/{{user_id}}, {args.rows} rows")
+    report("dict rows + jsonable_encoder + json", best_of(args.repeat, lambda: fastapi_default(
+        db.get_user_transactions(user_id))), args.rows)
+    report("dict rows + msgspec", best_of(args.repeat, lambda: FastJSONResponse(
+        db.get_user_transactions(user_id)).body), args.rows)
+    report("sqlite3.Row + msgspec", best_of(args.repeat, lambda: FastJSONResponse(
+        db.get_user_transactions(user_id, raw_rows=True)).body), args.rows)
+    report("query only (sqlite3.Row)", best_of(args.repeat, lambda: db.get_user_transactions(
+        user_id, raw_rows=True)), args.rows)
+
+
+if __name__ == "__main__":
+    main()
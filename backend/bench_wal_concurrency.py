@@ -0,0 +1,93 @@
+"""
+Benchmark: read throughput while investments are being written
+Compares the rollback-journal defaults against the configured WAL profile
+
+Usage: python bench_wal_concurrency.py [--seconds 5] [--readers 4] [--rows 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from database import Database, get_pragma_profile
+
+ROLLBACK_JOURNAL = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "busy_timeout": 5000,
+}
+
+
+def seed(db: Database, rows: int) -> list:
+    """Create users with investments to read back"""
+    user_ids = []
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        for i in range(20):
+            cursor.execute("""
+                INSERT INTO users (email, username, hashed_password, created_at)
+                VALUES (?, ?, 'x', '2026-01-01T00:00:00')
+            """, (f"bench{i}@example.com", f"bench{i}"))
+            user_ids.append(cursor.lastrowid)
+        cursor.executemany("""
+            INSERT INTO investments
+            (user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at)
+            VALUES (?, ?, ?, ?, '2026-01-01T00:00:00', NULL, '2026-01-01T00:00:00')
+        """, [(user_ids[i % 20], i % 3, f"0x{i % 20:040x}", 10000) for i in range(rows)])
+    return user_ids
+
+
+def run(label: str, pragmas: dict, seconds: float, readers: int, rows: int):
+    tmp_dir = tempfile.mkdtemp()
+    db = Database(os.path.join(tmp_dir, "bench.db"), pool_size=readers + 1, pragmas=pragmas)
+    user_ids = seed(db, rows)
+
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0]
+    read_latencies = []
+
+    def writer():
+        while not stop.is_set():
+            db.record_investment(user_ids[0], 0, "0xwriter", 50.0, "2026-01-01T00:00:00")
+            writes[0] += 1
+
+    def reader(slot: int):
+        local_latencies = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            db.get_user_investments(user_ids[slot % len(user_ids)])
+            local_latencies.append(time.perf_counter() - start)
+            reads[slot] += 1
+        read_latencies.extend(local_latencies)
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    read_latencies.sort()
+    p99 = read_latencies[int(len(read_latencies) * 0.99) - 1] * 1000 if read_latencies else 0.0
+    print(f"{label:<28} journal={db.journal_mode:<7} "
+          f"reads/s={sum(reads) / seconds:>9.1f}  writes/s={writes[0] / seconds:>8.1f}  "
+          f"read p99={p99:>7.2f} ms  pool waits={db.pool_stats()['waits']}")
+    db.delete_database()
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers + 1 writer, {args.rows} seeded investments, {args.seconds}s per run")
+    run("rollback journal (DELETE)", ROLLBACK_JOURNAL, args.seconds, args.readers, args.rows)
+    run("configured profile", get_pragma_profile(), args.seconds, args.readers, args.rows)
@@ -0,0 +1,65 @@
+"""
+Benchmark: concurrent single investments, one commit each vs the group-commit writer
+Each worker thread records investments one at a time, as POST /api/invest does
+
+Usage: python bench_write_queue.py [--threads 64] [--writes 50] [--profile balanced] [--max-latency 0.002]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import database
+from config import DB_PROFILE
+from database import Database, get_pragma_profile
+from models import Investment
+from services import InvestmentService
+from write_queue import GroupCommitWriter
+
+
+def run(investment_service: InvestmentService, user_id: int, threads: int, writes: int) -> float:
+    def worker(thread: int):
+        for i in range(writes):
+            investment_service.record_investment(
+                Investment(bondId=i % 20, investorAddress=f"0x{thread:040x}", amount=100.0), user_id=user_id
+            )
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group-commit write queue benchmark")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--writes", type=int, default=50, help="Investments per thread")
+    parser.add_argument("--profile", default=DB_PROFILE, help="PRAGMA profile: durable, balanced or fast")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-latency", type=float, default=0.002, help="Seconds")
+    args = parser.parse_args()
+
+    total = args.threads * args.writes
+    print(f"{args.threads} threads x {args.writes} investments, {args.profile} profile")
+    for label in ("one commit per write", "group commit"):
+        database._db = Database(os.path.join(tempfile.mkdtemp(), "bench.db"), pool_size=args.threads + 1,
+                                pragmas=get_pragma_profile(args.profile))
+        user_id = database._db.create_user("bench@example.com", "bench", "hash")["id"]
+        writer = GroupCommitWriter(database._db, args.max_batch, args.max_latency) if label == "group commit" else None
+        elapsed = run(InvestmentService(writer), user_id, args.threads, args.writes)
+        assert database._db.verify_aggregates() == []
+        line = f"  {label:<22} {elapsed:7.2f} s  {total / elapsed:>10,.0f} writes/s"
+        if writer:
+            stats = writer.stats()
+            writer.close()
+            line += f"  ({stats['groups']} commits, avg {stats['avg_group_size']:.1f} writes)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
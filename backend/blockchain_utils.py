@@ -3,18 +3,286 @@ Blockchain utility functions using eth-abi and requests
 For interacting with smart contracts without web3.py
 """
 
+import asyncio
+import functools
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+from collections import OrderedDict
+import httpx
 import requests
-from eth_abi import encode, decode
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from eth_abi.abi import default_codec
+from eth_abi.registry import registry
+from eth_utils import keccak
+from typing import Optional, Dict, Any, List, Tuple, NamedTuple
 import json
 
+from config import (
+    RPC_TIMEOUT, RPC_POOL_SIZE, RPC_MAX_BATCH_SIZE,
+    RPC_MAX_CONCURRENCY, RPC_MAX_RETRIES, RPC_RETRY_BACKOFF, CHAIN_STATE_CACHE_BLOCKS,
+    RPC_CACHE_SIZE, RPC_HEAD_POLL_INTERVAL
+)
+
+# HTTP statuses worth retrying: rate limiting and transient server failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def split_signature(signature: str) -> Tuple[str, Tuple[str, ...]]:
+    """Split 'name(type1,type2)' into its name and argument types, keeping tuple types whole"""
+    name, _, rest = signature.replace(" ", "").partition("(")
+    if not rest.endswith(")"):
+        raise ValueError(f"Invalid function signature: {signature}")
+    body = rest[:-1]
+    types, depth, start = [], 0, 0
+    for index, char in enumerate(body):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            types.append(body[start:index])
+            start = index + 1
+    if body:
+        types.append(body[start:])
+    return name, tuple(types)
+
+
+@functools.lru_cache(maxsize=None)
+def _tuple_encoder(types: Tuple[str, ...]):
+    return registry.get_tuple_encoder(*types)
+
+
+@functools.lru_cache(maxsize=None)
+def _tuple_decoder(types: Tuple[str, ...]):
+    return registry.get_tuple_decoder(*types)
+
+
+class ContractFunction:
+    """A contract function compiled once: selector, input encoder and output decoder
+    
+    Build through compile_function so each signature is parsed and hashed once.
+    """
+    
+    __slots__ = ("name", "signature", "inputs", "outputs", "selector", "_encoder", "_decoder")
+    
+    def __init__(self, signature: str, outputs: Tuple[str, ...] = ()):
+        self.name, self.inputs = split_signature(signature)
+        self.signature = f"{self.name}({','.join(self.inputs)})"
+        self.outputs = tuple(outputs)
+        self.selector = keccak(text=self.signature)[:4]
+        self._encoder = _tuple_encoder(self.inputs)
+        self._decoder = _tuple_decoder(self.outputs)
+    
+    def encode_call(self, *args) -> str:
+        """Encode call data: selector followed by the ABI-encoded arguments"""
+        return "0x" + (self.selector + self._encoder(args)).hex()
+    
+    def decode_output(self, data: str) -> tuple:
+        """Decode return data into a tuple of output values"""
+        if not data or data == "0x":
+            return tuple()
+        return self._decoder(default_codec.stream_class(bytes.fromhex(data[2:])))
+    
+    def __repr__(self):
+        return f"ContractFunction({self.signature} -> ({','.join(self.outputs)}))"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_function(signature: str, outputs: Tuple[str, ...] = ()) -> ContractFunction:
+    """Get the compiled function for a signature, memoized"""
+    return ContractFunction(signature, outputs)
+
+
+# Read functions of the platform contracts, compiled at import
+BOND_TOKEN_FUNCTIONS = {
+    function.name: function for function in (
+        compile_function("investments(address)", ("uint256",)),
+        compile_function("claimedInterest(address)", ("uint256",)),
+        compile_function("calculateAccruedInterest(address)", ("uint256",)),
+        compile_function("balanceOf(address)", ("uint256",)),
+        compile_function("totalSupply()", ("uint256",)),
+        compile_function("stablecoin()", ("address",)),
+        compile_function("getBondInfo()", ("string", "string", "uint256", "uint256",
+                                           "uint256", "uint256", "uint256", "bool")),
+    )
+}
+
+BOND_PLATFORM_FUNCTIONS = {
+    function.name: function for function in (
+        compile_function("getBondCount()", ("uint256",)),
+        compile_function("getAllBonds()", ("address[]",)),
+        compile_function("getBondToken(uint256)", ("address",)),
+        compile_function("bondIds(address)", ("uint256",)),
+        compile_function("stablecoinAddress()", ("address",)),
+    )
+}
+
+
+class RPCError(Exception):
+    """Error object returned by the node for a JSON-RPC request"""
+    
+    def __init__(self, error: Any):
+        self.error = error
+        self.code = error.get("code") if isinstance(error, dict) else None
+        self.message = error.get("message") if isinstance(error, dict) else str(error)
+        super().__init__(f"RPC Error: {error}")
+
+
+class BlockReadCache:
+    """Read-through cache for eth_call and eth_getBalance results
+    
+    Reads pinned to a block number never change, so they stay in an LRU of
+    `max_size` entries. Reads at "latest" are kept only while the head they
+    were read at is the newest block observed; a new head drops them all.
+    Concurrent requests for the same key share one in-flight RPC.
+    """
+    
+    CACHEABLE_METHODS = ("eth_call", "eth_getBalance")
+    
+    def __init__(self, max_size: int = RPC_CACHE_SIZE):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.pinned: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.latest: Dict[tuple, Any] = {}
+        self.inflight: Dict[tuple, Future] = {}
+        self.head: Optional[int] = None
+        self.head_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+    
+    @classmethod
+    def key(cls, method: str, params: list) -> Optional[tuple]:
+        """Cache key for a call, or None when the call is not cacheable"""
+        if method not in cls.CACHEABLE_METHODS or not params:
+            return None
+        target = params[0]
+        if isinstance(target, dict):
+            target = tuple(sorted((name, str(value).lower()) for name, value in target.items()))
+        else:
+            target = str(target).lower()
+        block = params[1] if len(params) > 1 else "latest"
+        if block == "latest":
+            return (method, target, None)
+        if isinstance(block, int):
+            return (method, target, block)
+        if isinstance(block, str) and block.startswith("0x"):
+            return (method, target, int(block, 16))
+        # "pending", "safe", "finalized" etc. move independently of the head
+        return None
+    
+    def observe_head(self, block_number: int):
+        """Record the newest block; a new head invalidates all "latest" entries"""
+        with self.lock:
+            self.head_checked_at = time.monotonic()
+            if block_number != self.head:
+                self.head = block_number
+                self.latest.clear()
+    
+    def head_is_stale(self, poll_interval: float) -> bool:
+        return self.head is None or time.monotonic() - self.head_checked_at > poll_interval
+    
+    def claim(self, key: tuple) -> Tuple[str, Any]:
+        """Look a key up: ("hit", value), ("wait", future) or ("fetch", future)
+        
+        The caller owning a "fetch" future must resolve it through `store`
+        or `fail`. Call with `lock` held.
+        """
+        if key[2] is None:
+            if key in self.latest:
+                self.hits += 1
+                return "hit", self.latest[key]
+        elif key in self.pinned:
+            self.pinned.move_to_end(key)
+            self.hits += 1
+            return "hit", self.pinned[key]
+        
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return "wait", future
+        future = self.inflight[key] = Future()
+        self.misses += 1
+        return "fetch", future
+    
+    def store(self, key: tuple, future: Future, value: Any, head: Optional[int]):
+        """Publish a fetched value; "latest" values are kept only if the head is unchanged"""
+        with self.lock:
+            self.inflight.pop(key, None)
+            if not isinstance(value, RPCError):
+                if key[2] is not None:
+                    self.pinned[key] = value
+                    self.pinned.move_to_end(key)
+                    while len(self.pinned) > self.max_size:
+                        self.pinned.popitem(last=False)
+                elif head is not None and head == self.head:
+                    self.latest[key] = value
+        future.set_result(value)
+    
+    def fail(self, key: tuple, future: Future, error: BaseException):
+        with self.lock:
+            self.inflight.pop(key, None)
+        future.set_exception(error)
+    
+    def stats(self) -> dict:
+        """Hit rate and saved-RPC counters"""
+        with self.lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "pinned_entries": len(self.pinned),
+                "latest_entries": len(self.latest),
+                "max_size": self.max_size,
+                "head": self.head,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "saved_rpcs": self.hits + self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
 
 class BlockchainClient:
-    """Client for interacting with blockchain via JSON-RPC"""
+    """Client for interacting with blockchain via JSON-RPC
+    
+    Requests share one keep-alive HTTP session. `batch` packs many calls into
+    JSON-RPC 2.0 batch POSTs of up to `max_batch_size` calls each. Contract
+    calls and balance reads go through a BlockReadCache unless `cache_size`
+    is 0; "latest" entries are rechecked against the head at most every
+    `head_poll_interval` seconds.
+    """
     
-    def __init__(self, rpc_url: str):
+    def __init__(self, rpc_url: str, timeout: float = RPC_TIMEOUT, pool_size: int = RPC_POOL_SIZE,
+                 max_batch_size: int = RPC_MAX_BATCH_SIZE, cache_size: int = RPC_CACHE_SIZE,
+                 head_poll_interval: float = RPC_HEAD_POLL_INTERVAL):
         self.rpc_url = rpc_url
-        self.request_id = 0
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+        self._ids = itertools.count()  # JSON-RPC request ids; next() is atomic under the GIL
+        self.cache = BlockReadCache(cache_size) if cache_size > 0 else None
+        self.head_poll_interval = head_poll_interval
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _post(self, payload: Any) -> Any:
+        response = self.session.post(self.rpc_url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
     
     def _make_request(self, method: str, params: list) -> Dict[str, Any]:
         """Make a JSON-RPC request"""
@@ -22,19 +290,103 @@ class BlockchainClient:
             "jsonrpc": "2.0",
             "method": method,
             "params": params,
-            "id": self.request_id
+            "id": next(self._ids)
         }
-        self.request_id += 1
         
-        response = requests.post(self.rpc_url, json=payload, timeout=10)
-        response.raise_for_status()
-        result = response.json()
+        result = self._post(payload)
         
         if "error" in result:
-            raise Exception(f"RPC Error: {result['error']}")
+            raise RPCError(result['error'])
         
         return result.get("result")
     
+    def batch(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        """Send many (method, params) calls as JSON-RPC batches
+        
+        Returns results in call order. A call the node rejected yields an
+        RPCError instance in its slot instead of raising, so one bad call does
+        not fail the whole batch.
+        """
+        results: List[Any] = []
+        for start in range(0, len(calls), self.max_batch_size):
+            chunk = calls[start:start + self.max_batch_size]
+            ids = [next(self._ids) for _ in chunk]
+            payload = [
+                {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+                for request_id, (method, params) in zip(ids, chunk)
+            ]
+            
+            results.extend(_demux_batch(ids, self._post(payload)))
+        return results
+    
+    def _read_through(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        """Batch calls, answering what it can from the read cache
+        
+        Misses are fetched in one batch; when "latest" reads need a fresh head
+        and nothing cached depends on it yet, eth_blockNumber rides along in
+        that batch instead of costing its own round trip.
+        """
+        if self.cache is None:
+            return self.batch(calls)
+        
+        keys = [self.cache.key(method, params) for method, params in calls]
+        reads_latest = any(key is not None and key[2] is None for key in keys)
+        if reads_latest and self.cache.head_is_stale(self.head_poll_interval) and self.cache.latest:
+            self.get_block_number()
+        
+        results: List[Any] = [None] * len(calls)
+        waiting, owned, fetch = [], [], []
+        with self.cache.lock:
+            head = self.cache.head
+            for index, key in enumerate(keys):
+                if key is None:
+                    fetch.append(index)
+                    continue
+                state, value = self.cache.claim(key)
+                if state == "hit":
+                    results[index] = value
+                elif state == "wait":
+                    waiting.append((index, value))
+                else:
+                    owned.append((index, key, value))
+                    fetch.append(index)
+        
+        if fetch:
+            probe_head = reads_latest and self.cache.head_is_stale(self.head_poll_interval)
+            request = [calls[index] for index in fetch]
+            try:
+                fetched = self.batch(request + [("eth_blockNumber", [])] if probe_head else request)
+            except BaseException as e:
+                for _, key, future in owned:
+                    self.cache.fail(key, future, e)
+                raise
+            if probe_head:
+                block_number = fetched.pop()
+                if not isinstance(block_number, RPCError):
+                    # Results in this batch were read at (about) the probed head
+                    self.cache.observe_head(int(block_number, 16))
+                    head = self.cache.head
+            for index, value in zip(fetch, fetched):
+                results[index] = value
+            for index, key, future in owned:
+                self.cache.store(key, future, results[index], head)
+        
+        for index, future in waiting:
+            results[index] = future.result()
+        return results
+    
+    def _read(self, method: str, params: list) -> Any:
+        result = self._read_through([(method, params)])[0]
+        if isinstance(result, RPCError):
+            raise result
+        return result
+    
+    def cache_stats(self) -> dict:
+        """Read cache counters, or {"enabled": False} without a cache"""
+        if self.cache is None:
+            return {"enabled": False}
+        return dict(self.cache.stats(), enabled=True)
+    
     def call_contract(self, contract_address: str, data: str, block: str = "latest") -> Optional[str]:
         """Call a contract method (read-only)"""
         params = [{
@@ -42,27 +394,284 @@ class BlockchainClient:
             "data": data
         }, block]
         
-        return self._make_request("eth_call", params)
+        return self._read("eth_call", params)
+    
+    def call_contracts(self, calls: List[Tuple[str, str]], block: str = "latest") -> List[Any]:
+        """Batch many (contract_address, data) read-only calls; see `batch` for error handling"""
+        return self._read_through([
+            ("eth_call", [{"to": contract_address, "data": data}, block])
+            for contract_address, data in calls
+        ])
+    
+    def get_block_number(self) -> int:
+        """Get the number of the most recent block"""
+        block_number = int(self._make_request("eth_blockNumber", []), 16)
+        if self.cache is not None:
+            self.cache.observe_head(block_number)
+        return block_number
     
     def get_balance(self, address: str, block: str = "latest") -> int:
         """Get balance of an address"""
-        result = self._make_request("eth_getBalance", [address, block])
+        result = self._read("eth_getBalance", [address, block])
         return int(result, 16) if result else 0
     
+    def get_balances(self, addresses: List[str], block: str = "latest") -> List[Any]:
+        """Batch balance lookups; failed lookups yield RPCError instances"""
+        results = self._read_through([("eth_getBalance", [address, block]) for address in addresses])
+        return [
+            result if isinstance(result, RPCError) else (int(result, 16) if result else 0)
+            for result in results
+        ]
+    
     def encode_function_call(self, function_signature: str, *args) -> str:
-        """Encode function call data"""
-        # This is a simplified version - in production, use proper ABI encoding
-        # For now, return placeholder
-        return "0x" + "0" * 64
+        """Encode function call data, e.g. encode_function_call("balanceOf(address)", address)"""
+        return compile_function(function_signature).encode_call(*args)
     
     def decode_function_result(self, types: list, data: str) -> tuple:
         """Decode function result"""
-        if not data or data == "0x":
-            return tuple()
+        return decode_result(types, data)
+
+
+class AsyncBlockchainClient:
+    """Asyncio JSON-RPC client with the same surface as BlockchainClient
+    
+    Safe to await from FastAPI handlers: requests share a pooled
+    httpx.AsyncClient, at most `max_concurrency` are in flight, each has its
+    own timeout, and transport failures or 429/5xx responses are retried
+    with jittered exponential backoff. JSON-RPC errors are not retried.
+    """
+    
+    def __init__(self, rpc_url: str, timeout: float = RPC_TIMEOUT,
+                 max_concurrency: int = RPC_MAX_CONCURRENCY, max_retries: int = RPC_MAX_RETRIES,
+                 retry_backoff: float = RPC_RETRY_BACKOFF, max_batch_size: int = RPC_MAX_BATCH_SIZE):
+        self.rpc_url = rpc_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_batch_size = max_batch_size
+        self._ids = itertools.count()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency,
+                                max_keepalive_connections=max_concurrency)
+        )
+    
+    async def close(self):
+        """Close pooled HTTP connections"""
+        await self.client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _post(self, payload: Any, timeout: Optional[float] = None) -> Any:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self.client.post(self.rpc_url, json=payload,
+                                                      timeout=timeout or self.timeout)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            # Full jitter: sleep a random share of the exponential backoff window
+            await asyncio.sleep(random.uniform(0, self.retry_backoff * (2 ** attempt)))
+            attempt += 1
+    
+    async def _make_request(self, method: str, params: list, timeout: Optional[float] = None) -> Any:
+        """Make a JSON-RPC request"""
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": next(self._ids)
+        }
+        
+        result = await self._post(payload, timeout)
+        
+        if "error" in result:
+            raise RPCError(result['error'])
+        
+        return result.get("result")
+    
+    async def batch(self, calls: List[Tuple[str, list]], timeout: Optional[float] = None) -> List[Any]:
+        """Send many (method, params) calls as JSON-RPC batches, chunks in parallel
+        
+        Same contract as BlockchainClient.batch: results in call order, with
+        RPCError instances in the slots of rejected calls.
+        """
+        chunks = []
+        for start in range(0, len(calls), self.max_batch_size):
+            chunk = calls[start:start + self.max_batch_size]
+            ids = [next(self._ids) for _ in chunk]
+            payload = [
+                {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+                for request_id, (method, params) in zip(ids, chunk)
+            ]
+            chunks.append((ids, payload))
+        
+        responses = await asyncio.gather(*(self._post(payload, timeout) for _, payload in chunks))
+        results: List[Any] = []
+        for (ids, _), response in zip(chunks, responses):
+            results.extend(_demux_batch(ids, response))
+        return results
+    
+    async def call_contract(self, contract_address: str, data: str, block: str = "latest",
+                            timeout: Optional[float] = None) -> Optional[str]:
+        """Call a contract method (read-only)"""
+        params = [{
+            "to": contract_address,
+            "data": data
+        }, block]
         
-        # Remove 0x prefix and convert to bytes
-        data_bytes = bytes.fromhex(data[2:])
-        return decode(types, data_bytes)
+        return await self._make_request("eth_call", params, timeout)
+    
+    async def call_contracts(self, calls: List[Tuple[str, str]], block: str = "latest",
+                             timeout: Optional[float] = None) -> List[Any]:
+        """Batch many (contract_address, data) read-only calls"""
+        return await self.batch([
+            ("eth_call", [{"to": contract_address, "data": data}, block])
+            for contract_address, data in calls
+        ], timeout)
+    
+    async def get_block_number(self, timeout: Optional[float] = None) -> int:
+        """Get the number of the most recent block"""
+        return int(await self._make_request("eth_blockNumber", [], timeout), 16)
+    
+    async def get_balance(self, address: str, block: str = "latest", timeout: Optional[float] = None) -> int:
+        """Get balance of an address"""
+        result = await self._make_request("eth_getBalance", [address, block], timeout)
+        return int(result, 16) if result else 0
+    
+    async def get_balances(self, addresses: List[str], block: str = "latest",
+                           timeout: Optional[float] = None) -> List[Any]:
+        """Batch balance lookups; failed lookups yield RPCError instances"""
+        results = await self.batch([("eth_getBalance", [address, block]) for address in addresses], timeout)
+        return [
+            result if isinstance(result, RPCError) else (int(result, 16) if result else 0)
+            for result in results
+        ]
+    
+    def decode_function_result(self, types: list, data: str) -> tuple:
+        """Decode function result"""
+        return decode_result(types, data)
+
+
+class InvestorPosition(NamedTuple):
+    """An investor's BondToken state in stablecoin base units"""
+    invested: int
+    claimed_interest: int
+    accrued_interest: int
+
+
+class InvestorStateReader:
+    """Batched reads of per-investor BondToken state, cached per block
+    
+    `read_positions` turns every (bond token, investor) pair into the three
+    view calls investments, claimedInterest and calculateAccruedInterest,
+    sends them as JSON-RPC batches pinned to one block so the snapshot is
+    consistent, and keeps decoded results for the last `cache_blocks` blocks.
+    """
+    
+    # View functions read per pair, in InvestorPosition field order
+    POSITION_FUNCTIONS = (
+        BOND_TOKEN_FUNCTIONS["investments"],
+        BOND_TOKEN_FUNCTIONS["claimedInterest"],
+        BOND_TOKEN_FUNCTIONS["calculateAccruedInterest"],
+    )
+    
+    def __init__(self, client: BlockchainClient, cache_blocks: int = CHAIN_STATE_CACHE_BLOCKS):
+        self.client = client
+        self.cache_blocks = cache_blocks
+        self._cache: "OrderedDict[int, Dict[Tuple[str, str], Optional[InvestorPosition]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _cached_block(self, block_number: int) -> dict:
+        with self._lock:
+            entries = self._cache.get(block_number)
+            if entries is None:
+                entries = self._cache[block_number] = {}
+                while len(self._cache) > self.cache_blocks:
+                    self._cache.popitem(last=False)
+            return entries
+    
+    def read_positions(self, pairs: List[Tuple[str, str]],
+                       block_number: Optional[int] = None) -> Tuple[int, Dict[Tuple[str, str], Optional[InvestorPosition]]]:
+        """Read positions for (bond token address, investor address) pairs
+        
+        Returns (block number, {pair: InvestorPosition}). Pairs whose calls
+        the node rejected (e.g. no contract at the address) map to None.
+        Reads the latest block unless `block_number` is given.
+        """
+        if block_number is None:
+            block_number = self.client.get_block_number()
+        entries = self._cached_block(block_number)
+        
+        keys = {pair: (pair[0].lower(), pair[1].lower()) for pair in pairs}
+        missing = list({key for key in keys.values() if key not in entries})
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        
+        if missing:
+            calls = [
+                (token, function.encode_call(investor))
+                for token, investor in missing
+                for function in self.POSITION_FUNCTIONS
+            ]
+            results = self.client.call_contracts(calls, hex(block_number))
+            width = len(self.POSITION_FUNCTIONS)
+            for index, key in enumerate(missing):
+                values = results[index * width:(index + 1) * width]
+                if any(isinstance(value, RPCError) or not value or value == "0x" for value in values):
+                    entries[key] = None
+                else:
+                    entries[key] = InvestorPosition(*(
+                        function.decode_output(value)[0] for function, value in zip(self.POSITION_FUNCTIONS, values)
+                    ))
+        
+        return block_number, {pair: entries[key] for pair, key in keys.items()}
+    
+    def stats(self) -> dict:
+        """Cache counters"""
+        with self._lock:
+            return {"blocks_cached": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+def _demux_batch(ids: List[int], response: Any) -> List[Any]:
+    """Order a batch response by request id, turning error objects into RPCError"""
+    if isinstance(response, dict):
+        # Nodes without batch support answer with a single error object
+        raise RPCError(response.get("error", response))
+    
+    by_id = {item.get("id"): item for item in response}
+    results = []
+    for request_id in ids:
+        item = by_id.get(request_id)
+        if item is None:
+            results.append(RPCError({"code": -32603, "message": f"No response for request id {request_id}"}))
+        elif "error" in item:
+            results.append(RPCError(item['error']))
+        else:
+            results.append(item.get("result"))
+    return results
+
+
+def decode_result(types: list, data: str) -> tuple:
+    """Decode ABI-encoded return data"""
+    if not data or data == "0x":
+        return tuple()
+    
+    # Remove 0x prefix and convert to bytes
+    data_bytes = bytes.fromhex(data[2:])
+    return _tuple_decoder(tuple(types))(default_codec.stream_class(data_bytes))
 
 
 def encode_address(address: str) -> bytes:
@@ -84,5 +693,3 @@ def validate_address(address: str) -> bool:
         return True
     except ValueError:
         return False
-
-
@@ -0,0 +1,17 @@
+"""
+Bond factory shared by the analytics, coupon schedule and risk tests
+Builds a Bond model from the few fields a test varies
+"""
+
+from datetime import datetime
+
+from models import Bond
+
+
+def make_bond(bond_id: int, coupon_rate: float, maturity: datetime, frequency: int = 2,
+              day_count: str = "ACT/ACT", issue: datetime = datetime(2024, 1, 1)) -> Bond:
+    """A 1,000,000 face Treasury bond named after its id"""
+    return Bond(id=bond_id, name=f"Bond {bond_id}", issuer="Treasury", faceValue=1_000_000.0,
+                couponRate=coupon_rate, description="", minimumInvestment=100.0,
+                issueDate=issue.isoformat(), maturityDate=maturity.isoformat(),
+                bondTokenAddress="0x" + "0" * 40, couponFrequency=frequency, dayCount=day_count)
@@ -12,6 +12,18 @@ BLOCKCHAIN_RPC_URL = os.getenv("BLOCKCHAIN_RPC_URL", "http://localhost:8545")
 BOND_PLATFORM_CONTRACT_ADDRESS = os.getenv("BOND_PLATFORM_CONTRACT_ADDRESS", "")
 STABLECOIN_CONTRACT_ADDRESS = os.getenv("STABLECOIN_CONTRACT_ADDRESS", "")
 
+# JSON-RPC client tuning
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", 10.0))  # Seconds per HTTP request
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", 10))  # Keep-alive connections to the node
+RPC_MAX_BATCH_SIZE = int(os.getenv("RPC_MAX_BATCH_SIZE", 100))  # Calls per JSON-RPC batch POST
+RPC_MAX_CONCURRENCY = int(os.getenv("RPC_MAX_CONCURRENCY", 16))  # In-flight requests per async client
+RPC_MAX_RETRIES = int(os.getenv("RPC_MAX_RETRIES", 3))  # Retries after transport errors and 429/5xx
+RPC_RETRY_BACKOFF = float(os.getenv("RPC_RETRY_BACKOFF", 0.2))  # Base seconds, doubled per attempt with jitter
+RPC_CACHE_SIZE = int(os.getenv("RPC_CACHE_SIZE", 10000))  # Block-pinned eth_call/eth_getBalance results; 0 disables
+RPC_HEAD_POLL_INTERVAL = float(os.getenv("RPC_HEAD_POLL_INTERVAL", 1.0))  # Seconds before "latest" reads recheck the head
+CHAIN_READS_ENABLED = os.getenv("CHAIN_READS_ENABLED", "false").lower() == "true"  # Investor yields from contract state
+CHAIN_STATE_CACHE_BLOCKS = int(os.getenv("CHAIN_STATE_CACHE_BLOCKS", 8))  # Blocks of investor state kept in memory
+
 # API configuration
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", 8000))
@@ -19,4 +31,112 @@ API_PORT = int(os.getenv("API_PORT", 8000))
 # Database configuration (for future use)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bonds.db")
 
+# SQLite connection pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10.0))  # Seconds to wait for a free connection
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30.0))  # Idle seconds before re-checking
+
+# Seconds between bond catalog version checks; bounds how stale a worker's cache can be
+BOND_CACHE_CHECK_INTERVAL = float(os.getenv("BOND_CACHE_CHECK_INTERVAL", 1.0))
+
+# Password hashing worker pool: bcrypt runs here instead of on the event loop
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+AUTH_HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", 64))  # Queued + running hashes before rejecting
+
+# Authenticated request cache: decoded token claims and users, never kept past token expiry
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", 60.0))  # Seconds
+
+# Bond analytics
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", 50000))  # Memoized (bond, price, date) results
+
+# Bulk investment ingestion
+INVEST_BATCH_MAX_ROWS = int(os.getenv("INVEST_BATCH_MAX_ROWS", 10000))  # Rows per POST /api/invest/batch
+
+# Group commit: single investment writes from concurrent requests share one transaction
+GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "true").lower() == "true"
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", 256))  # Writes per commit
+GROUP_COMMIT_MAX_LATENCY = float(os.getenv("GROUP_COMMIT_MAX_LATENCY", 0.002))  # Seconds a write waits for company
+
+# Portfolio valuation
+PORTFOLIO_CACHE_SIZE = int(os.getenv("PORTFOLIO_CACHE_SIZE", 10000))  # Valued portfolios kept, one per user
+PORTFOLIO_CACHE_TTL = float(os.getenv("PORTFOLIO_CACHE_TTL", 60.0))  # Seconds; bounds staleness from out-of-process writes
+# Flat yield (percent) for mark-to-model values; unset values each bond at its own coupon rate
+PORTFOLIO_MODEL_YIELD = float(os.environ["PORTFOLIO_MODEL_YIELD"]) if os.getenv("PORTFOLIO_MODEL_YIELD") else None
+
+# Monte Carlo rate risk (Vasicek short rate, annual decimals)
+RISK_MEAN_REVERSION = float(os.getenv("RISK_MEAN_REVERSION", 0.1))
+RISK_LONG_RATE = float(os.getenv("RISK_LONG_RATE", 0.04))
+RISK_VOLATILITY = float(os.getenv("RISK_VOLATILITY", 0.01))
+RISK_INITIAL_RATE = float(os.getenv("RISK_INITIAL_RATE", 0.04))
+RISK_DEFAULT_PATHS = int(os.getenv("RISK_DEFAULT_PATHS", 10000))
+RISK_MAX_PATHS = int(os.getenv("RISK_MAX_PATHS", 200000))
+RISK_DEFAULT_HORIZON_DAYS = int(os.getenv("RISK_DEFAULT_HORIZON_DAYS", 10))
+RISK_SCENARIO_CACHE_SIZE = int(os.getenv("RISK_SCENARIO_CACHE_SIZE", 32))  # Scenario sets kept, keyed by seed
+RISK_WORKERS = int(os.getenv("RISK_WORKERS", os.cpu_count() or 1))  # Repricing processes
+RISK_START_METHOD = os.getenv("RISK_START_METHOD", "spawn")  # Forking a threaded server can deadlock
+RISK_PARALLEL_THRESHOLD = int(os.getenv("RISK_PARALLEL_THRESHOLD", 50_000_000))  # path x cash-flow evaluations
+RISK_CHUNK_ELEMENTS = int(os.getenv("RISK_CHUNK_ELEMENTS", 2_000_000))  # Per repricing chunk, bounds memory
+
+# Streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))  # Rows per fetchmany call and response chunk
+
+# Columnar ledger snapshots
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "ledger_snapshot")
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "auto")  # parquet (needs pyarrow), npy, or auto
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION", "zstd")  # Parquet codec
+SNAPSHOT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", 100000))  # Rows read per fetchmany and per part file
+
+# Contract event indexer
+STABLECOIN_DECIMALS = int(os.getenv("STABLECOIN_DECIMALS", 18))  # On-chain amounts are scaled by 10**decimals
+CHAIN_BOND_ID_OFFSET = int(os.getenv("CHAIN_BOND_ID_OFFSET", 1))  # Catalog bond id = BondPlatform bondId + offset
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", 0))
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", 6))  # Stay this many blocks behind head
+INDEXER_INITIAL_RANGE = int(os.getenv("INDEXER_INITIAL_RANGE", 1000))  # Blocks per eth_getLogs request
+INDEXER_MIN_RANGE = int(os.getenv("INDEXER_MIN_RANGE", 1))
+INDEXER_MAX_RANGE = int(os.getenv("INDEXER_MAX_RANGE", 50000))
+INDEXER_TARGET_LOGS = int(os.getenv("INDEXER_TARGET_LOGS", 2000))  # Range adapts towards this many logs
+INDEXER_REORG_DEPTH = int(os.getenv("INDEXER_REORG_DEPTH", 256))  # Block hashes kept for reorg detection
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", 5.0))
+
+# SQLite durability/performance profile
+# "durable" fsyncs every commit, "balanced" relies on WAL for crash safety,
+# "fast" trades durability of the last commits for write throughput.
+DB_PRAGMA_PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,  # Negative values are KiB (16 MiB)
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,  # Milliseconds
+        "wal_autocheckpoint": 1000,  # Pages
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,  # 64 MiB
+        "mmap_size": 268435456,  # 256 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "wal_autocheckpoint": 1000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -131072,  # 128 MiB
+        "mmap_size": 1073741824,  # 1 GiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "wal_autocheckpoint": 4000,
+    },
+}
+DB_PROFILE = os.getenv("DB_PROFILE", "balanced")
 
+# Individual overrides on top of the selected profile
+DB_PRAGMA_OVERRIDES = {
+    pragma: os.getenv(f"DB_{pragma.upper()}")
+    for pragma in ("journal_mode", "synchronous", "cache_size", "mmap_size",
+                   "temp_store", "busy_timeout", "wal_autocheckpoint")
+    if os.getenv(f"DB_{pragma.upper()}")
+}
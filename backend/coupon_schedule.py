@@ -0,0 +1,280 @@
+"""
+Coupon schedules for the Bond Investment Platform
+Builds each bond's payment dates and amounts once and evaluates accrual for the whole catalog
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from models import Bond
+from yield_engine import _to_datetime64
+
+# Coupons per year and the day-count conventions a bond may declare
+COUPON_FREQUENCIES = (1, 2, 4, 12)
+DAY_COUNTS = ("ACT/ACT", "ACT/365", "ACT/360", "30/360")
+
+# Year basis for the conventions that use a fixed one
+DAY_COUNT_BASIS = {"ACT/365": 365.0, "ACT/360": 360.0, "30/360": 360.0}
+
+ONE_MONTH = np.timedelta64(1, "M")
+
+
+def validate_coupon_terms(frequency: int, day_count: str):
+    """Raise ValueError for a frequency or day count the schedule builder does not support"""
+    if frequency not in COUPON_FREQUENCIES:
+        raise ValueError(f"couponFrequency must be one of {', '.join(map(str, COUPON_FREQUENCIES))}")
+    if day_count not in DAY_COUNTS:
+        raise ValueError(f"dayCount must be one of {', '.join(DAY_COUNTS)}")
+
+
+def _to_day(value: Union[str, date, datetime, np.datetime64, None]) -> np.datetime64:
+    if value is None:
+        return np.datetime64(datetime.now(), "D")
+    if isinstance(value, str):
+        return _to_datetime64(value).astype("datetime64[D]")
+    return np.datetime64(value, "D")
+
+
+def _roll_back(end: np.datetime64, months: np.ndarray, anchor_day: int) -> np.ndarray:
+    """Dates `months` calendar months before `end`, on `anchor_day` clamped to the month's length"""
+    month = end.astype("datetime64[M]") - months.astype(np.int64)
+    month_days = ((month + ONE_MONTH).astype("datetime64[D]") - month.astype("datetime64[D]")).astype(np.int64)
+    return month.astype("datetime64[D]") + (np.minimum(anchor_day, month_days) - 1)
+
+
+def _ymd(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    years = days.astype("datetime64[Y]")
+    months = days.astype("datetime64[M]")
+    return (years.astype(np.int64),
+            (months - years.astype("datetime64[M]")).astype(np.int64),
+            (days - months.astype("datetime64[D]")).astype(np.int64) + 1)
+
+
+def day_count_days(start: np.ndarray, end: np.ndarray, thirty_360: Union[bool, np.ndarray] = False) -> np.ndarray:
+    """Days between dates: actual days, or 30/360 (bond basis) days where `thirty_360` is set"""
+    actual = (end - start).astype(np.int64)
+    if not np.any(thirty_360):
+        return actual.astype(np.float64)
+    y1, m1, d1 = _ymd(start)
+    y2, m2, d2 = _ymd(end)
+    d1 = np.minimum(d1, 30)
+    d2 = np.where((d1 == 30) & (d2 == 31), 30, d2)
+    thirty = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+    return np.where(thirty_360, thirty, actual).astype(np.float64)
+
+
+class CouponSchedule:
+    """Payment dates and coupon amounts (per 1 unit of face value) for one bond
+
+    Dates are rolled back from maturity in whole periods of 12/frequency
+    months, so the first period after issue may be short. Principal is
+    repaid on the last date and is not included in `amounts`.
+    """
+
+    __slots__ = ("bond_id", "coupon_rate", "frequency", "day_count", "issue_date",
+                 "dates", "amounts", "accrual_starts", "period_starts", "key")
+
+    def __init__(self, bond_id: int, coupon_rate: float, frequency: int, day_count: str,
+                 issue_date: np.datetime64, dates: np.ndarray, amounts: np.ndarray,
+                 first_period_start: Optional[np.datetime64] = None):
+        self.bond_id = bond_id
+        self.coupon_rate = coupon_rate  # basis points
+        self.frequency = frequency
+        self.day_count = day_count
+        self.issue_date = issue_date
+        self.dates = dates
+        self.amounts = amounts
+        # Interest accrues from the previous payment (or issue); periods are
+        # measured against their regular length, which differs only for a short first period
+        if len(dates):
+            if first_period_start is None:
+                first_period_start = _roll_back(dates[0], np.array([12 // frequency]), int(_ymd(dates[-1:])[2][0]))[0]
+            self.accrual_starts = np.concatenate([[issue_date], dates[:-1]])
+            self.period_starts = np.concatenate([[first_period_start], dates[:-1]])
+        else:
+            self.accrual_starts = self.period_starts = dates
+        # Terms the schedule was built from, used to key derived caches
+        maturity = dates[-1] if len(dates) else issue_date
+        self.key = (bond_id, coupon_rate, frequency, day_count,
+                    int(issue_date.astype(np.int64)), int(maturity.astype(np.int64)))
+
+    @classmethod
+    def build(cls, bond: Bond) -> "CouponSchedule":
+        validate_coupon_terms(bond.couponFrequency, bond.dayCount)
+        issue = _to_day(bond.issueDate)
+        maturity = _to_day(bond.maturityDate)
+        if maturity <= issue:
+            empty = np.array([], dtype="datetime64[D]")
+            return cls(bond.id, bond.couponRate, bond.couponFrequency, bond.dayCount, issue,
+                       empty, np.array([], dtype=np.float64))
+
+        step = 12 // bond.couponFrequency
+        anchor_day = int(_ymd(np.array([maturity]))[2][0])
+        span = int((maturity.astype("datetime64[M]") - issue.astype("datetime64[M]")).astype(np.int64))
+        dates = _roll_back(maturity, np.arange(span // step + 1)[::-1] * step, anchor_day)
+        dates = dates[dates > issue]
+
+        schedule = cls(bond.id, bond.couponRate, bond.couponFrequency, bond.dayCount, issue,
+                       dates, np.empty(len(dates)))
+        rate = bond.couponRate / 10000
+        thirty_360 = bond.dayCount == "30/360"
+        accrual_days = day_count_days(schedule.accrual_starts, dates, thirty_360)
+        if bond.dayCount == "ACT/ACT":
+            # Regular periods pay exactly rate/frequency; a short first period pays pro rata
+            schedule.amounts = rate / bond.couponFrequency * accrual_days / day_count_days(schedule.period_starts, dates)
+        else:
+            schedule.amounts = rate * accrual_days / DAY_COUNT_BASIS[bond.dayCount]
+        return schedule
+
+    def to_row(self) -> dict:
+        """Compact database row: dates as int32 days since the epoch, amounts as float64"""
+        return {
+            "bond_id": self.bond_id,
+            "coupon_rate": self.coupon_rate,
+            "coupon_frequency": self.frequency,
+            "day_count": self.day_count,
+            "issue_date": int(self.issue_date.astype(np.int64)),
+            "first_period_start": int(self.period_starts[0].astype(np.int64)) if len(self.dates) else None,
+            "payment_dates": self.dates.astype(np.int64).astype("<i4").tobytes(),
+            "amounts": self.amounts.astype("<f8").tobytes(),
+        }
+
+    @classmethod
+    def from_row(cls, row: dict) -> "CouponSchedule":
+        return cls(
+            row["bond_id"], row["coupon_rate"], row["coupon_frequency"], row["day_count"],
+            np.datetime64(row["issue_date"], "D"),
+            np.frombuffer(row["payment_dates"], dtype="<i4").astype("datetime64[D]"),
+            np.frombuffer(row["amounts"], dtype="<f8").astype(np.float64),
+            np.datetime64(row["first_period_start"], "D") if row["first_period_start"] is not None else None,
+        )
+
+    def accrued(self, on: Union[date, datetime, None] = None) -> float:
+        """Interest accrued in the current period per 1 unit of face"""
+        day = _to_day(on)
+        index = int(np.searchsorted(self.dates, day, side="right"))
+        if index >= len(self.dates) or day < self.accrual_starts[index]:
+            return 0.0
+        thirty_360 = self.day_count == "30/360"
+        start = self.accrual_starts[index:index + 1]
+        elapsed = day_count_days(start, np.array([day]), thirty_360)[0]
+        return float(self.amounts[index] * elapsed / day_count_days(start, self.dates[index:index + 1], thirty_360)[0])
+
+    def matches(self, bond: Bond) -> bool:
+        """Whether the schedule was built from the bond's current terms"""
+        return (self.coupon_rate == bond.couponRate and self.frequency == bond.couponFrequency
+                and self.day_count == bond.dayCount and self.issue_date == _to_day(bond.issueDate)
+                and (not len(self.dates) or self.dates[-1] == _to_day(bond.maturityDate)))
+
+
+class ScheduleSet:
+    """Schedules for many bonds concatenated into flat period arrays
+
+    Period i belongs to bond `owner[i]` (a position in `ids`); each bond's
+    periods are contiguous and in date order, so per-bond questions become
+    one masked pass over the flat arrays.
+    """
+
+    __slots__ = ("ids", "schedules", "coupon_rate", "frequency", "maturity", "offsets", "owner", "accrual_starts",
+                 "period_starts", "ends", "amounts", "thirty_360", "_positions")
+
+    def __init__(self, schedules: Iterable[CouponSchedule]):
+        self.schedules: List[CouponSchedule] = list(schedules)
+        self.ids = np.array([s.bond_id for s in self.schedules], dtype=np.int64)
+        self._positions = {s.bond_id: index for index, s in enumerate(self.schedules)}
+        self.coupon_rate = np.array([s.coupon_rate for s in self.schedules], dtype=np.float64)  # basis points
+        self.frequency = np.array([s.frequency for s in self.schedules], dtype=np.float64)
+        counts = np.array([len(s.dates) for s in self.schedules], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.owner = np.repeat(np.arange(len(self.schedules)), counts)
+
+        def flat(field: str, dtype) -> np.ndarray:
+            parts = [getattr(s, field) for s in self.schedules]
+            return np.concatenate(parts) if parts else np.array([], dtype=dtype)
+
+        self.accrual_starts = flat("accrual_starts", "datetime64[D]")
+        self.period_starts = flat("period_starts", "datetime64[D]")
+        self.ends = flat("dates", "datetime64[D]")
+        self.amounts = flat("amounts", np.float64)
+        self.thirty_360 = np.repeat([s.day_count == "30/360" for s in self.schedules], counts).astype(bool)
+        self.maturity = np.array([s.dates[-1] if len(s.dates) else np.datetime64("NaT") for s in self.schedules],
+                                 dtype="datetime64[D]")
+
+    def __len__(self) -> int:
+        return len(self.schedules)
+
+    def get(self, bond_id: int) -> Optional[CouponSchedule]:
+        index = self._positions.get(bond_id)
+        return self.schedules[index] if index is not None else None
+
+    def take(self, bond_ids: Iterable[int]) -> "ScheduleSet":
+        """Subset in the order given; ids not in the set are skipped"""
+        return ScheduleSet(self.schedules[self._positions[bond_id]]
+                           for bond_id in bond_ids if bond_id in self._positions)
+
+    def accrued(self, on: Union[date, datetime, None] = None) -> np.ndarray:
+        """Interest accrued in the current period per 1 unit of face, one value per bond"""
+        day = _to_day(on)
+        current = np.flatnonzero((self.accrual_starts <= day) & (day < self.ends))
+        accrued = np.zeros(len(self.schedules))
+        starts = self.accrual_starts[current]
+        elapsed = day_count_days(starts, np.full(len(current), day), self.thirty_360[current])
+        length = day_count_days(starts, self.ends[current], self.thirty_360[current])
+        accrued[self.owner[current]] = self.amounts[current] * elapsed / length
+        return accrued
+
+    def projected(self, start: Union[date, datetime, None], end: Union[date, datetime]) -> np.ndarray:
+        """Coupons paid after `start` up to and including `end` per 1 unit of face, one value per bond"""
+        first, last = _to_day(start), _to_day(end)
+        paid = (self.ends > first) & (self.ends <= last)
+        return np.bincount(self.owner[paid], weights=self.amounts[paid], minlength=len(self.schedules))
+
+    def next_payment(self, on: Union[date, datetime, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Date and coupon of each bond's next payment after `on` (NaT and 0 once matured)"""
+        day = _to_day(on)
+        remaining = self.ends > day
+        first = np.full(len(self.schedules), -1)
+        # Flat arrays are in date order per bond, so the first remaining period per owner comes last when reversed
+        indexes = np.flatnonzero(remaining)[::-1]
+        first[self.owner[indexes]] = indexes
+        dates = np.full(len(self.schedules), np.datetime64("NaT"), dtype="datetime64[D]")
+        amounts = np.zeros(len(self.schedules))
+        found = first >= 0
+        dates[found] = self.ends[first[found]]
+        amounts[found] = self.amounts[first[found]]
+        return dates, amounts
+
+    def remaining_flows(self, on: Union[date, datetime, None] = None) -> Dict[str, np.ndarray]:
+        """Padded matrices of the flows still to be paid per 1 unit of face, one row per bond
+
+        `periods` is each flow's distance from `on` in coupon periods: whole
+        periods after the next payment plus the unexpired fraction of the
+        current one, measured in actual days against its regular length;
+        `times` is the same distance in ACT/365 years. Principal is added to
+        each bond's last flow.
+        """
+        day = _to_day(on)
+        remaining = np.flatnonzero(self.ends > day)
+        owner = self.owner[remaining]
+        counts = np.bincount(owner, minlength=len(self.schedules))
+        width = max(int(counts.max()) if len(counts) else 0, 1)
+        rank = remaining - (self.offsets[1:] - counts)[owner]
+
+        fraction = np.zeros(len(self.schedules))
+        head = remaining[rank == 0]
+        fraction[self.owner[head]] = (
+            day_count_days(np.full(len(head), day), self.ends[head])
+            / day_count_days(self.period_starts[head], self.ends[head])
+        )
+
+        periods = np.zeros((len(self.schedules), width))
+        times = np.zeros((len(self.schedules), width))
+        flows = np.zeros((len(self.schedules), width))
+        periods[owner, rank] = rank + fraction[owner]
+        times[owner, rank] = (self.ends[remaining] - day).astype(np.int64) / 365.0
+        flows[owner, rank] = self.amounts[remaining]
+        live = counts > 0
+        flows[np.flatnonzero(live), counts[live] - 1] += 1.0
+        return {"periods": periods, "times": times, "flows": flows, "counts": counts}
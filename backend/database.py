@@ -5,33 +5,353 @@ Uses SQLite for persistence of user credentials and investments
 
 import sqlite3
 import os
+import base64
+import json
+import re
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional, List
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Dict, Iterator, Optional, List, Tuple
 from contextlib import contextmanager
 
+from config import (
+    DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_HEALTH_CHECK_INTERVAL,
+    DB_PRAGMA_PROFILES, DB_PROFILE, DB_PRAGMA_OVERRIDES, CHAIN_BOND_ID_OFFSET, EXPORT_BATCH_SIZE,
+    STABLECOIN_DECIMALS
+)
+from models import AMOUNT_SCALE, from_minor_units, to_minor_units, token_to_minor_units
+
 DATABASE_FILE = "bond_platform.db"
 
+# PRAGMA user_version of the current schema; _migrate upgrades older files
+SCHEMA_VERSION = 2
+
+# Money columns, stored as INTEGER minor units (see models.AMOUNT_SCALE) from schema version 1
+MINOR_UNIT_COLUMNS = {
+    "investments": ("amount",),
+    "transactions": ("amount",),
+    "transaction_bills": ("amount", "tax_amount", "fee_amount", "net_amount"),
+    "bond_aggregates": ("total_invested",),
+    "platform_aggregates": ("total_invested",),
+    "bonds": ("face_value", "minimum_investment"),
+}
+
+# Transaction history row written for each indexed BondToken event: (type, description)
+CHAIN_TRANSACTION_TYPES = {
+    "InvestmentMade": ("investment", "On-chain bond investment"),
+    "InterestPaid": ("interest_payment", "On-chain interest claim"),
+    "PrincipalRedeemed": ("withdrawal", "On-chain principal redemption"),
+}
+
+# PRAGMAs stored in the database file itself; set once instead of per connection
+DATABASE_PRAGMAS = ("journal_mode",)
+
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+# Append-mostly tables exported by ledger snapshots
+LEDGER_TABLES = ("investments", "transactions", "transaction_bills")
+
+# Single-column indexes superseded by the (column, created_at) keyset indexes
+LEGACY_INDEXES = (
+    "idx_investment_user", "idx_investment_bond", "idx_transaction_user",
+    "idx_transaction_type", "idx_bill_user", "idx_bill_status",
+)
+
+
+def get_pragma_profile(profile: Optional[str] = None) -> dict:
+    """Resolve a PRAGMA profile from config, with environment overrides applied"""
+    name = profile or DB_PROFILE
+    if name not in DB_PRAGMA_PROFILES:
+        raise ValueError(f"Unknown database profile: {name}")
+    pragmas = dict(DB_PRAGMA_PROFILES[name])
+    pragmas.update(DB_PRAGMA_OVERRIDES)
+    return pragmas
+
+
+def major_units(expression: str, name: Optional[str] = None) -> str:
+    """SQL reading a minor-unit column, or a SUM of one, back in major units
+    
+    Sums stay exact integers in SQLite; only the result is divided. The
+    output column is `name`, by default the column name without its alias.
+    """
+    return f"{expression} / {10 ** AMOUNT_SCALE}.0 AS {name or expression.split('.')[-1]}"
+
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque pagination cursor"""
+    raw = json.dumps([created_at, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a pagination cursor produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return str(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the pool timeout"""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of long-lived SQLite connections"""
+    
+    def __init__(self, db_file: str, max_size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 health_check_interval: float = DB_POOL_HEALTH_CHECK_INTERVAL,
+                 pragmas: Optional[dict] = None):
+        if max_size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_file = db_file
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pragmas = dict(get_pragma_profile() if pragmas is None else pragmas)
+        
+        self._idle = deque()  # (connection, last_used) pairs, most recently used last
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        # Metrics
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection and apply the per-connection PRAGMA setup"""
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # busy_timeout goes first so the remaining PRAGMAs wait on locks
+        if "busy_timeout" in self.pragmas:
+            conn.execute(f"PRAGMA busy_timeout = {int(self.pragmas['busy_timeout'])}")
+        for name, value in self.pragmas.items():
+            if name in DATABASE_PRAGMAS or name == "busy_timeout":
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+    
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Check that a connection can still run a query"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Borrow a connection, waiting up to `timeout` seconds for one to free up"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        conn = None
+        last_used = 0.0
+        
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            
+            wait_time = time.monotonic() - start
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+            self._wait_time_total += wait_time
+            self._wait_time_max = max(self._wait_time_max, wait_time)
+        
+        if conn is not None and time.monotonic() - last_used >= self.health_check_interval:
+            if not self._is_healthy(conn):
+                self._close_quietly(conn)
+                with self._cond:
+                    self._discarded += 1
+                conn = None
+        
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created += 1
+        
+        return conn
+    
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """Return a borrowed connection; broken connections are dropped"""
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                discard = True
+        
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                self._discarded += 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+    
+    def close(self):
+        """Close idle connections; borrowed ones are closed when released"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._close_quietly(conn)
+            self._cond.notify_all()
+    
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
+    def stats(self) -> dict:
+        """Pool size and wait-time metrics"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "created": self._created,
+                "discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": self._wait_time_total * 1000,
+                "wait_time_avg_ms": (self._wait_time_total / self._checkouts * 1000) if self._checkouts else 0.0,
+                "wait_time_max_ms": self._wait_time_max * 1000,
+            }
+
 
 class Database:
     """Database manager for SQLite operations"""
     
-    def __init__(self, db_file: str = DATABASE_FILE):
+    def __init__(self, db_file: str = DATABASE_FILE, pool_size: int = DB_POOL_SIZE,
+                 pragmas: Optional[dict] = None):
         self.db_file = db_file
+        self.pool_size = pool_size
+        self.pragmas = get_pragma_profile() if pragmas is None else dict(pragmas)
+        self.pool = ConnectionPool(db_file, max_size=pool_size, pragmas=self.pragmas)
+        self._local = threading.local()
+        self.journal_mode = self._set_journal_mode()
         self.init_db()
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_file)
-        conn.row_factory = sqlite3.Row
+        """Context manager for database connections
+        
+        Connections are borrowed from the pool and returned afterwards. A nested
+        call on the same thread reuses the outer connection, so its statements
+        join the outer transaction and are committed (or rolled back) with it.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        
+        conn = self.pool.acquire()
+        self._local.conn = conn
+        discard = False
         try:
             yield conn
             conn.commit()
         except Exception as e:
-            conn.rollback()
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
             raise e
         finally:
-            conn.close()
+            self._local.conn = None
+            self.pool.release(conn, discard=discard)
+    
+    def pool_stats(self) -> dict:
+        """Get connection pool metrics"""
+        return self.pool.stats()
+    
+    def _set_journal_mode(self) -> str:
+        """Apply the configured journal mode and return the one SQLite reports"""
+        requested = self.pragmas.get("journal_mode")
+        with self.get_connection() as conn:
+            if requested:
+                row = conn.execute(f"PRAGMA journal_mode = {requested}").fetchone()
+            else:
+                row = conn.execute("PRAGMA journal_mode").fetchone()
+            return row[0].lower()
+    
+    def get_pragma_settings(self) -> dict:
+        """Get the PRAGMA values in effect on a pooled connection"""
+        with self.get_connection() as conn:
+            return {
+                name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in self.pragmas
+            }
+    
+    def checkpoint(self, mode: str = "PASSIVE") -> dict:
+        """Run a WAL checkpoint, copying committed pages back into the database file
+        
+        PASSIVE never blocks writers; TRUNCATE also resets the WAL file to zero bytes.
+        """
+        mode = mode.upper()
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f"Invalid checkpoint mode: {mode}")
+        
+        with self.get_connection() as conn:
+            busy, log_frames, checkpointed = conn.execute(
+                f"PRAGMA wal_checkpoint({mode})"
+            ).fetchone()
+        
+        return {
+            "mode": mode,
+            "journal_mode": self.journal_mode,
+            "busy": bool(busy),
+            "wal_frames": log_frames,
+            "checkpointed_frames": checkpointed
+        }
+    
+    def close(self):
+        """Checkpoint the WAL and close all pooled connections"""
+        if self.journal_mode == "wal":
+            try:
+                self.checkpoint("TRUNCATE")
+            except (sqlite3.Error, RuntimeError):
+                pass
+        self.pool.close()
     
     def init_db(self):
         """Initialize database tables"""
@@ -56,7 +376,7 @@ class Database:
                     user_id INTEGER NOT NULL,
                     bond_id INTEGER NOT NULL,
                     investor_address TEXT NOT NULL,
-                    amount REAL NOT NULL,
+                    amount INTEGER NOT NULL,
                     timestamp TEXT NOT NULL,
                     transaction_hash TEXT,
                     created_at TEXT NOT NULL,
@@ -74,15 +394,25 @@ class Database:
             """)
             
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_investment_user ON investments(user_id)
+                CREATE INDEX IF NOT EXISTS idx_user_created ON users(created_at)
             """)
             
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_investment_address ON investments(investor_address)
             """)
             
+            # Keyset pagination indexes: (filter column, created_at) so every
+            # page is an index range scan, whatever its offset
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_investment_bond ON investments(bond_id)
+                CREATE INDEX IF NOT EXISTS idx_investment_created ON investments(created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_investment_user_created ON investments(user_id, created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_investment_bond_created ON investments(bond_id, created_at)
             """)
             
             # Payment Access table
@@ -108,7 +438,7 @@ class Database:
                     user_id INTEGER NOT NULL,
                     type TEXT NOT NULL,
                     bond_id INTEGER,
-                    amount REAL NOT NULL,
+                    amount INTEGER NOT NULL,
                     status TEXT DEFAULT 'pending',
                     timestamp TEXT NOT NULL,
                     transaction_hash TEXT,
@@ -125,13 +455,13 @@ class Database:
                     transaction_id INTEGER,
                     user_id INTEGER NOT NULL,
                     bond_name TEXT,
-                    amount REAL NOT NULL,
+                    amount INTEGER NOT NULL,
                     transaction_type TEXT NOT NULL,
                     status TEXT DEFAULT 'pending',
                     timestamp TEXT NOT NULL,
-                    tax_amount REAL DEFAULT 0.0,
-                    fee_amount REAL DEFAULT 0.0,
-                    net_amount REAL,
+                    tax_amount INTEGER DEFAULT 0,
+                    fee_amount INTEGER DEFAULT 0,
+                    net_amount INTEGER,
                     created_at TEXT NOT NULL,
                     FOREIGN KEY (user_id) REFERENCES users(id),
                     FOREIGN KEY (transaction_id) REFERENCES transactions(id)
@@ -144,20 +474,425 @@ class Database:
             """)
             
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_transaction_user ON transactions(user_id)
+                CREATE INDEX IF NOT EXISTS idx_payment_access_created ON payment_access(created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_payment_access_status_created
+                ON payment_access(payment_status, created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transaction_created ON transactions(created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transaction_user_created ON transactions(user_id, created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transaction_bond_created ON transactions(bond_id, created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transaction_status_created ON transactions(status, created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transaction_type_created ON transactions(type, created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bill_created ON transaction_bills(created_at)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bill_user_created ON transaction_bills(user_id, created_at)
             """)
             
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_transaction_type ON transactions(type)
+                CREATE INDEX IF NOT EXISTS idx_bill_status_created ON transaction_bills(status, created_at)
             """)
             
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_bill_user ON transaction_bills(user_id)
+                CREATE INDEX IF NOT EXISTS idx_bill_type_created ON transaction_bills(transaction_type, created_at)
             """)
             
+            for index_name in LEGACY_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+            
+            # Investment aggregates, maintained by record_investment so stats
+            # endpoints never scan the investments table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS bond_aggregates (
+                    bond_id INTEGER PRIMARY KEY,
+                    total_invested INTEGER NOT NULL DEFAULT 0,
+                    investment_count INTEGER NOT NULL DEFAULT 0,
+                    investor_count INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            
+            # Distinct investor sets backing the investor counts
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS bond_investors (
+                    bond_id INTEGER NOT NULL,
+                    investor_address TEXT NOT NULL,
+                    PRIMARY KEY (bond_id, investor_address)
+                ) WITHOUT ROWID
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS platform_investors (
+                    investor_address TEXT PRIMARY KEY
+                ) WITHOUT ROWID
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS platform_aggregates (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_invested INTEGER NOT NULL DEFAULT 0,
+                    investment_count INTEGER NOT NULL DEFAULT 0,
+                    investor_count INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            
+            # Bond catalog shared by all workers
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS bonds (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    issuer TEXT NOT NULL,
+                    face_value INTEGER NOT NULL,
+                    coupon_rate REAL NOT NULL,
+                    maturity_date TEXT NOT NULL,
+                    issue_date TEXT NOT NULL,
+                    description TEXT,
+                    minimum_investment INTEGER NOT NULL,
+                    bond_token_address TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    coupon_frequency INTEGER NOT NULL DEFAULT 2,
+                    day_count TEXT NOT NULL DEFAULT 'ACT/ACT',
+                    currency_scale INTEGER NOT NULL DEFAULT 2
+                )
+            """)
+            self._add_coupon_term_columns(cursor)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bond_issuer ON bonds(issuer)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bond_maturity ON bonds(maturity_date)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bond_coupon ON bonds(coupon_rate)
+            """)
+            
+            # Key/value counters, e.g. the bond catalog version used for cache invalidation
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS app_metadata (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            """)
+            
+            # On-chain events ingested by event_indexer.py; (tx_hash, log_index)
+            # makes replaying a block range idempotent. amount is the raw uint256
+            # as decimal TEXT, since 18-decimal values overflow INTEGER.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chain_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tx_hash TEXT NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    block_hash TEXT NOT NULL,
+                    contract_address TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    investor_address TEXT,
+                    bond_id INTEGER,
+                    amount TEXT,
+                    investment_id INTEGER,
+                    transaction_id INTEGER,
+                    created_at TEXT NOT NULL,
+                    UNIQUE (tx_hash, log_index)
+                )
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_chain_event_block ON chain_events(block_number)
+            """)
+            
+            # Events from addresses no user has invested from yet, found by address when one does
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_chain_event_unattributed
+                ON chain_events(lower(investor_address)) WHERE transaction_id IS NULL
+            """)
+            
+            # Bond tokens announced by BondPlatform's BondCreated event
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chain_bonds (
+                    bond_token_address TEXT PRIMARY KEY,
+                    chain_bond_id INTEGER NOT NULL,
+                    bond_name TEXT,
+                    issuer TEXT,
+                    block_number INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            
+            # Hashes of recently indexed blocks, compared against the node to detect reorgs
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chain_blocks (
+                    block_number INTEGER PRIMARY KEY,
+                    block_hash TEXT NOT NULL
+                )
+            """)
+            
+            # Coupon schedules built by coupon_schedule.py; dates are packed int32
+            # days since the epoch, amounts float64 per unit of face value
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS coupon_schedules (
+                    bond_id INTEGER PRIMARY KEY,
+                    coupon_rate REAL NOT NULL,
+                    coupon_frequency INTEGER NOT NULL,
+                    day_count TEXT NOT NULL,
+                    issue_date INTEGER NOT NULL,
+                    first_period_start INTEGER,
+                    payment_dates BLOB NOT NULL,
+                    amounts BLOB NOT NULL
+                )
+            """)
+            
+            # Lets the indexer match self-reported investments to their on-chain event
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_bill_status ON transaction_bills(status)
+                CREATE INDEX IF NOT EXISTS idx_investment_tx_hash ON investments(transaction_hash)
             """)
+            
+            self._migrate(cursor)
+            
+            # Databases created before the aggregates existed get them backfilled
+            cursor.execute("SELECT COUNT(*) FROM platform_aggregates")
+            if cursor.fetchone()[0] == 0:
+                self._rebuild_aggregates(cursor)
+    
+    def _add_coupon_term_columns(self, cursor: sqlite3.Cursor):
+        """Add coupon frequency/day count to bond tables created before they existed
+        
+        Frequencies are taken from the bond description where it names one.
+        """
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(bonds)")}
+        if "coupon_frequency" in columns:
+            return
+        cursor.execute("ALTER TABLE bonds ADD COLUMN coupon_frequency INTEGER NOT NULL DEFAULT 2")
+        cursor.execute("ALTER TABLE bonds ADD COLUMN day_count TEXT NOT NULL DEFAULT 'ACT/ACT'")
+        cursor.execute("""
+            UPDATE bonds SET coupon_frequency = CASE
+                WHEN lower(description) LIKE '%semi-annual%' OR lower(description) LIKE '%semiannual%' THEN 2
+                WHEN lower(description) LIKE '%quarterly%' THEN 4
+                WHEN lower(description) LIKE '%monthly%' THEN 12
+                WHEN lower(description) LIKE '%annual%' THEN 1
+                ELSE 2
+            END
+        """)
+    
+    def _migrate(self, cursor: sqlite3.Cursor):
+        """Upgrade a database written by older code to SCHEMA_VERSION
+        
+        Runs in one IMMEDIATE transaction, so concurrent workers starting on
+        the same file migrate it once and a failed migration leaves it as it was.
+        """
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"Database schema version {version} is newer than this code ({SCHEMA_VERSION})")
+        if version < 1:
+            self._migrate_to_minor_units(cursor)
+        if version < 2:
+            self._migrate_chain_events(cursor)
+        if version < SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def _migrate_to_minor_units(self, cursor: sqlite3.Cursor):
+        """Schema version 1: money columns go from REAL major units to INTEGER minor units
+        
+        Each table still declaring REAL money columns is rebuilt by
+        _retype_columns. Values are converted with models.to_minor_units, the
+        same rounding new writes get. Bonds also gain currency_scale.
+        """
+        cursor.connection.create_function(
+            "to_minor_units", 1, lambda amount: None if amount is None else to_minor_units(amount), deterministic=True
+        )
+        for table, columns in MINOR_UNIT_COLUMNS.items():
+            self._retype_columns(cursor, table, columns, "REAL", "INTEGER", "to_minor_units")
+        
+        if "currency_scale" not in {row[1] for row in cursor.execute("PRAGMA table_info(bonds)")}:
+            cursor.execute(f"ALTER TABLE bonds ADD COLUMN currency_scale INTEGER NOT NULL DEFAULT {AMOUNT_SCALE}")
+    
+    def _migrate_chain_events(self, cursor: sqlite3.Cursor):
+        """Schema version 2: chain_events keeps raw on-chain amounts; unknown investors wait for attribution
+        
+        chain_events.amount held the event amount as a REAL in stablecoin
+        units; it becomes the raw uint256 as TEXT. Rows indexed before are
+        scaled back from the stored float, so they keep its rounding.
+        Investments the indexer had filed under the placeholder user 0 are
+        removed and their events attributed like new ones (see
+        _attribute_chain_events).
+        """
+        def raw_amount(amount):
+            if amount is None:
+                return None
+            return str(int(Decimal(repr(amount)).scaleb(STABLECOIN_DECIMALS).to_integral_value(ROUND_HALF_EVEN)))
+        
+        cursor.connection.create_function("raw_amount", 1, raw_amount, deterministic=True)
+        self._retype_columns(cursor, "chain_events", ("amount",), "REAL", "TEXT", "raw_amount")
+        
+        cursor.execute("""
+            UPDATE chain_events SET investment_id = NULL
+            WHERE investment_id IN (SELECT id FROM investments WHERE user_id = 0)
+        """)
+        cursor.execute("DELETE FROM investments WHERE user_id = 0")
+        if cursor.rowcount:
+            self._rebuild_aggregates(cursor)
+        cursor.execute("SELECT DISTINCT investor_address FROM chain_events WHERE transaction_id IS NULL")
+        self._attribute_chain_events(cursor, {row[0] for row in cursor.fetchall()})
+    
+    @staticmethod
+    def _retype_columns(cursor: sqlite3.Cursor, table: str, columns: Tuple[str, ...],
+                        old_type: str, new_type: str, convert: str):
+        """Change `columns` of `table` from old_type to new_type, converting values with SQL function `convert`
+        
+        SQLite cannot change a column type in place, so a table still
+        declaring any of the columns as old_type is copied into a retyped twin
+        that then takes its name, with its indexes and AUTOINCREMENT counter
+        carried over. Tables already converted are left alone.
+        """
+        info = cursor.execute(f"PRAGMA table_info({table})").fetchall()
+        if not any(row[1] in columns and row[2].upper() == old_type for row in info):
+            return
+        create_sql = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()[0]
+        index_sqls = [row[0] for row in cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+        )]
+        sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone() \
+            if "AUTOINCREMENT" in create_sql.upper() else None
+        
+        retyped = re.sub(rf"\b({'|'.join(columns)})\s+{old_type}\b", rf"\1 {new_type}", create_sql,
+                         flags=re.IGNORECASE)
+        cursor.execute(re.sub(rf"^CREATE TABLE\s+\"?{table}\"?", f"CREATE TABLE {table}_migrating", retyped))
+        names = [row[1] for row in info]
+        cursor.execute(f"""
+            INSERT INTO {table}_migrating ({", ".join(names)})
+            SELECT {", ".join(f"{convert}({name})" if name in columns else name for name in names)}
+            FROM {table}
+        """)
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_migrating RENAME TO {table}")
+        for index_sql in index_sqls:
+            cursor.execute(index_sql)
+        if sequence is not None:
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, sequence[0]))
+    
+    @staticmethod
+    def _build_where(filters: List[tuple]) -> Tuple[str, list]:
+        """Build a WHERE clause from (condition, value) pairs, skipping None values
+        
+        A tuple value supplies the parameters of a multi-placeholder condition.
+        """
+        conditions = []
+        params = []
+        for condition, value in filters:
+            if value is None:
+                continue
+            conditions.append(condition)
+            if isinstance(value, tuple):
+                params.extend(value)
+            else:
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+    
+    def _fetch_page(self, select_sql: str, alias: str, filters: List[tuple],
+                    limit: int, cursor: Optional[str] = None,
+                    raw_rows: bool = False) -> Tuple[List[dict], Optional[str]]:
+        """Run a keyset-paginated query ordered newest first
+        
+        `filters` is a list of (condition, value) pairs; pairs whose value is
+        None are skipped. Returns the page of rows and the cursor for the next
+        page (None on the last page). With `raw_rows` the rows stay
+        sqlite3.Row objects, for responses that encode them directly.
+        """
+        filters = list(filters)
+        if cursor:
+            created_at, row_id = decode_cursor(cursor)
+            filters.append((f"({alias}.created_at, {alias}.id) < (?, ?)", (created_at, row_id)))
+        
+        where, params = self._build_where(filters)
+        params.append(limit + 1)
+        
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                {select_sql}
+                {where}
+                ORDER BY {alias}.created_at DESC, {alias}.id DESC
+                LIMIT ?
+            """, params).fetchall()
+        
+        if not raw_rows:
+            rows = [dict(row) for row in rows]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        return rows, next_cursor
+    
+    def _iter_rows(self, select_sql: str, alias: str, filters: List[tuple],
+                   batch_size: int = EXPORT_BATCH_SIZE,
+                   order_by: Tuple[str, ...] = ("created_at", "id")) -> Iterator:
+        """Stream a filtered query in `order_by` order (oldest first), for exports of any size
+        
+        Yields the column names, then lists of up to `batch_size` sqlite3.Row
+        objects read with fetchmany, so memory does not grow with the result.
+        The connection is taken from the pool directly rather than through
+        get_connection: a streaming response may resume the generator on a
+        different thread each time. It goes back to the pool when the
+        generator finishes or is closed.
+        """
+        where, params = self._build_where(filters)
+        conn = self.pool.acquire()
+        cursor = None
+        try:
+            cursor = conn.execute(f"""
+                {select_sql}
+                {where}
+                ORDER BY {", ".join(f"{alias}.{column}" for column in order_by)}
+            """, params)
+            yield tuple(column[0] for column in cursor.description)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            if cursor is not None:
+                cursor.close()
+            self.pool.release(conn)
+    
+    def iter_ledger_rows(self, table: str, columns: List[str], after_id: int = 0,
+                         batch_size: int = EXPORT_BATCH_SIZE) -> Iterator:
+        """Stream rows of a ledger table with id > `after_id`, in id order, money in major units (see _iter_rows)"""
+        if table not in LEDGER_TABLES:
+            raise ValueError(f"Unknown ledger table: {table}")
+        money = MINOR_UNIT_COLUMNS[table]
+        select = ", ".join(major_units(f"l.{column}") if column in money else f"l.{column}" for column in columns)
+        return self._iter_rows(f"SELECT {select} FROM {table} l",
+                               "l", [("l.id > ?", after_id)], batch_size, order_by=("id",))
     
     def create_user(self, email: str, username: str, hashed_password: str) -> Optional[dict]:
         """Create a new user"""
@@ -241,37 +976,377 @@ class Database:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    def get_users_page(self, limit: int = 100, cursor: Optional[str] = None,
+                       created_after: Optional[str] = None,
+                       created_before: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of users, newest first"""
+        return self._fetch_page("""
+            SELECT u.id, u.email, u.username, u.hashed_password, u.created_at
+            FROM users u
+        """, "u", [
+            ("u.created_at >= ?", created_after),
+            ("u.created_at < ?", created_before),
+        ], limit, cursor)
+    
+    def count_users(self) -> int:
+        """Get the total number of users"""
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    
+    def get_user_summaries(self, limit: Optional[int] = None,
+                           cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get users with payment access and per-user activity totals
+        
+        Counts and sums for transactions, bills and investments are computed
+        with one grouped pass per table, restricted to the requested page of
+        users (newest first). Returns the page and the cursor for the next one.
+        """
+        filters = []
+        if cursor:
+            filters.append(("(created_at, id) < (?, ?)", decode_cursor(cursor)))
+        where, params = self._build_where(filters)
+        params.append(-1 if limit is None else limit + 1)
+        
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                WITH page AS (
+                    SELECT id, email, username, hashed_password, created_at
+                    FROM users
+                    {where}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                ),
+                inv AS (
+                    SELECT user_id, COUNT(*) AS investment_count, SUM(amount) AS total_invested
+                    FROM investments
+                    WHERE user_id IN (SELECT id FROM page)
+                    GROUP BY user_id
+                ),
+                trans AS (
+                    SELECT user_id, COUNT(*) AS transaction_count
+                    FROM transactions
+                    WHERE user_id IN (SELECT id FROM page)
+                    GROUP BY user_id
+                ),
+                bills AS (
+                    SELECT user_id, COUNT(*) AS bill_count
+                    FROM transaction_bills
+                    WHERE user_id IN (SELECT id FROM page)
+                    GROUP BY user_id
+                )
+                SELECT p.id, p.email, p.username, p.hashed_password, p.created_at,
+                       pa.id AS pa_id, pa.access_level, pa.can_invest, pa.can_withdraw,
+                       pa.can_transfer, pa.payment_status, pa.created_at AS pa_created_at,
+                       COALESCE(trans.transaction_count, 0) AS transaction_count,
+                       COALESCE(bills.bill_count, 0) AS bill_count,
+                       COALESCE(inv.investment_count, 0) AS investment_count,
+                       {major_units("COALESCE(inv.total_invested, 0)", "total_invested")}
+                FROM page p
+                LEFT JOIN payment_access pa ON pa.user_id = p.id
+                LEFT JOIN inv ON inv.user_id = p.id
+                LEFT JOIN trans ON trans.user_id = p.id
+                LEFT JOIN bills ON bills.user_id = p.id
+                ORDER BY p.created_at DESC, p.id DESC
+            """, params).fetchall()
+            
+            summaries = []
+            for row in rows:
+                payment_access = None
+                if row['pa_id'] is not None:
+                    payment_access = {
+                        "id": row['pa_id'],
+                        "user_id": row['id'],
+                        "access_level": row['access_level'],
+                        "can_invest": row['can_invest'],
+                        "can_withdraw": row['can_withdraw'],
+                        "can_transfer": row['can_transfer'],
+                        "payment_status": row['payment_status'],
+                        "created_at": row['pa_created_at']
+                    }
+                summaries.append({
+                    "id": row['id'],
+                    "email": row['email'],
+                    "username": row['username'],
+                    "hashed_password": row['hashed_password'],
+                    "created_at": row['created_at'],
+                    "payment_access": payment_access,
+                    "transaction_count": row['transaction_count'],
+                    "bill_count": row['bill_count'],
+                    "investment_count": row['investment_count'],
+                    "total_invested": row['total_invested']
+                })
+        
+        next_cursor = None
+        if limit is not None and len(summaries) > limit:
+            summaries = summaries[:limit]
+            next_cursor = encode_cursor(summaries[-1]['created_at'], summaries[-1]['id'])
+        return summaries, next_cursor
+    
     def record_investment(self, user_id: int, bond_id: int, investor_address: str,
                          amount: float, timestamp: str, transaction_hash: Optional[str] = None) -> dict:
         """Record an investment"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             created_at = datetime.now().isoformat()
+            units = to_minor_units(amount)
             
             cursor.execute("""
-                INSERT INTO investments 
+                INSERT INTO investments
                 (user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at))
+            """, (user_id, bond_id, investor_address, units, timestamp, transaction_hash, created_at))
             
             investment_id = cursor.lastrowid
+            self._apply_investment_aggregates(cursor, [(bond_id, investor_address, units)], created_at)
+            self._attribute_chain_events(cursor, {investor_address})
             return {
                 "id": investment_id,
                 "user_id": user_id,
                 "bond_id": bond_id,
                 "investor_address": investor_address,
-                "amount": amount,
+                "amount": from_minor_units(units),
                 "timestamp": timestamp,
                 "transaction_hash": transaction_hash,
                 "created_at": created_at
             }
     
+    def record_investments(self, user_id: int, investments: List[dict]) -> List[dict]:
+        """Record many investments, each with a completed transaction and bill, in one transaction
+        
+        Each dict carries bond_id, bond_name, investor_address, amount,
+        timestamp and transaction_hash. Rows are written with one executemany
+        per table and a single commit; the returned records add id,
+        transaction_id and bill_id in input order.
+        """
+        if not investments:
+            return []
+        units = [to_minor_units(inv['amount']) for inv in investments]
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            created_at = datetime.now().isoformat()
+            
+            cursor.executemany("""
+                INSERT INTO investments
+                (user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(user_id, inv['bond_id'], inv['investor_address'], amount, inv['timestamp'],
+                   inv['transaction_hash'], created_at) for inv, amount in zip(investments, units)])
+            investment_ids = self._inserted_ids(cursor, len(investments))
+            self._apply_investment_aggregates(
+                cursor, [(inv['bond_id'], inv['investor_address'], amount) for inv, amount in zip(investments, units)],
+                created_at
+            )
+            
+            cursor.executemany("""
+                INSERT INTO transactions
+                (user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at)
+                VALUES (?, 'investment', ?, ?, 'completed', ?, ?, ?, ?)
+            """, [(user_id, inv['bond_id'], amount, inv['timestamp'], inv['transaction_hash'],
+                   f"Investment in {inv['bond_name']}", created_at) for inv, amount in zip(investments, units)])
+            transaction_ids = self._inserted_ids(cursor, len(investments))
+            
+            cursor.executemany("""
+                INSERT INTO transaction_bills
+                (transaction_id, user_id, bond_name, amount, transaction_type, status,
+                 timestamp, tax_amount, fee_amount, net_amount, created_at)
+                VALUES (?, ?, ?, ?, 'investment', 'completed', ?, 0, 0, ?, ?)
+            """, [(transaction_id, user_id, inv['bond_name'], amount, inv['timestamp'], amount, created_at)
+                  for transaction_id, inv, amount in zip(transaction_ids, investments, units)])
+            bill_ids = self._inserted_ids(cursor, len(investments))
+            self._attribute_chain_events(cursor, {inv['investor_address'] for inv in investments})
+            
+            return [
+                {
+                    "id": investment_id,
+                    "user_id": user_id,
+                    "bond_id": inv['bond_id'],
+                    "investor_address": inv['investor_address'],
+                    "amount": from_minor_units(amount),
+                    "timestamp": inv['timestamp'],
+                    "transaction_hash": inv['transaction_hash'],
+                    "created_at": created_at,
+                    "transaction_id": transaction_id,
+                    "bill_id": bill_id,
+                }
+                for inv, amount, investment_id, transaction_id, bill_id
+                in zip(investments, units, investment_ids, transaction_ids, bill_ids)
+            ]
+    
+    @staticmethod
+    def _inserted_ids(cursor: sqlite3.Cursor, count: int) -> range:
+        """Row ids of the `count` rows the last executemany inserted
+        
+        The write transaction holds SQLite's write lock, so rows inserted by
+        one executemany get consecutive ids ending at last_insert_rowid().
+        """
+        last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return range(last_id - count + 1, last_id + 1)
+    
+    def _apply_investment_aggregates(self, cursor: sqlite3.Cursor, investments: List[tuple], updated_at: str):
+        """Fold new (bond_id, investor_address, amount) investments into the bond and platform aggregates
+        
+        Amounts are in minor units. Must run on the cursor that inserted the investments so both land in
+        the same transaction.
+        """
+        bond_totals: Dict[int, list] = {}  # bond_id -> [total_invested, investment_count, new investors]
+        for bond_id, investor_address, amount in investments:
+            totals = bond_totals.setdefault(bond_id, [0, 0, 0])
+            totals[0] += amount
+            totals[1] += 1
+        
+        for bond_id, investor_address in dict.fromkeys((bond_id, address) for bond_id, address, _ in investments):
+            cursor.execute("""
+                INSERT OR IGNORE INTO bond_investors (bond_id, investor_address) VALUES (?, ?)
+            """, (bond_id, investor_address))
+            bond_totals[bond_id][2] += cursor.rowcount
+        
+        new_platform_investors = 0
+        for investor_address in dict.fromkeys(address for _, address, _ in investments):
+            cursor.execute("""
+                INSERT OR IGNORE INTO platform_investors (investor_address) VALUES (?)
+            """, (investor_address,))
+            new_platform_investors += cursor.rowcount
+        
+        cursor.executemany("""
+            INSERT INTO bond_aggregates (bond_id, total_invested, investment_count, investor_count, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(bond_id) DO UPDATE SET
+                total_invested = total_invested + excluded.total_invested,
+                investment_count = investment_count + excluded.investment_count,
+                investor_count = investor_count + excluded.investor_count,
+                updated_at = excluded.updated_at
+        """, [(bond_id, total, count, new_investors, updated_at)
+              for bond_id, (total, count, new_investors) in bond_totals.items()])
+        
+        cursor.execute("""
+            INSERT INTO platform_aggregates (id, total_invested, investment_count, investor_count, updated_at)
+            VALUES (1, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                total_invested = total_invested + excluded.total_invested,
+                investment_count = investment_count + excluded.investment_count,
+                investor_count = investor_count + excluded.investor_count,
+                updated_at = excluded.updated_at
+        """, (sum(amount for _, _, amount in investments), len(investments), new_platform_investors, updated_at))
+    
+    def _rebuild_aggregates(self, cursor: sqlite3.Cursor):
+        """Recompute all investment aggregates from the investments table"""
+        updated_at = datetime.now().isoformat()
+        cursor.execute("DELETE FROM bond_investors")
+        cursor.execute("DELETE FROM platform_investors")
+        cursor.execute("DELETE FROM bond_aggregates")
+        cursor.execute("DELETE FROM platform_aggregates")
+        
+        cursor.execute("""
+            INSERT INTO bond_investors (bond_id, investor_address)
+            SELECT DISTINCT bond_id, investor_address FROM investments
+        """)
+        cursor.execute("""
+            INSERT INTO platform_investors (investor_address)
+            SELECT DISTINCT investor_address FROM investments
+        """)
+        cursor.execute("""
+            INSERT INTO bond_aggregates (bond_id, total_invested, investment_count, investor_count, updated_at)
+            SELECT bond_id, SUM(amount), COUNT(*), COUNT(DISTINCT investor_address), ?
+            FROM investments
+            GROUP BY bond_id
+        """, (updated_at,))
+        cursor.execute("""
+            INSERT INTO platform_aggregates (id, total_invested, investment_count, investor_count, updated_at)
+            SELECT 1, COALESCE(SUM(amount), 0), COUNT(*), COUNT(DISTINCT investor_address), ?
+            FROM investments
+        """, (updated_at,))
+    
+    def rebuild_aggregates(self) -> dict:
+        """Recompute investment aggregates from scratch and return the platform totals"""
+        with self.get_connection() as conn:
+            self._rebuild_aggregates(conn.cursor())
+        return self.get_platform_aggregate()
+    
+    def verify_aggregates(self) -> List[dict]:
+        """Compare stored aggregates with the investments table
+        
+        Returns one entry per drifted value; an empty list means no drift.
+        Totals are integer minor units, so they must match exactly; drifted
+        totals are reported in major units.
+        """
+        fields = ("total_invested", "investment_count", "investor_count")
+        with self.get_connection() as conn:
+            stored = {
+                row['bond_id']: dict(row)
+                for row in conn.execute("SELECT * FROM bond_aggregates").fetchall()
+            }
+            actual = {
+                row['bond_id']: dict(row)
+                for row in conn.execute("""
+                    SELECT bond_id, SUM(amount) AS total_invested, COUNT(*) AS investment_count,
+                           COUNT(DISTINCT investor_address) AS investor_count
+                    FROM investments
+                    GROUP BY bond_id
+                """).fetchall()
+            }
+            stored_platform = conn.execute("SELECT * FROM platform_aggregates WHERE id = 1").fetchone()
+            actual_platform = conn.execute("""
+                SELECT COALESCE(SUM(amount), 0) AS total_invested, COUNT(*) AS investment_count,
+                       COUNT(DISTINCT investor_address) AS investor_count
+                FROM investments
+            """).fetchone()
+        
+        def entry(bond_id: Optional[int], field: str, stored_value: int, actual_value: int) -> dict:
+            if field == "total_invested":
+                stored_value, actual_value = from_minor_units(stored_value), from_minor_units(actual_value)
+            return {"bond_id": bond_id, "field": field, "stored": stored_value, "actual": actual_value}
+        
+        drift = []
+        for bond_id in sorted(set(stored) | set(actual)):
+            for field in fields:
+                stored_value = stored.get(bond_id, {}).get(field, 0)
+                actual_value = actual.get(bond_id, {}).get(field, 0)
+                if stored_value != actual_value:
+                    drift.append(entry(bond_id, field, stored_value, actual_value))
+        for field in fields:
+            stored_value = stored_platform[field] if stored_platform else 0
+            if stored_value != actual_platform[field]:
+                drift.append(entry(None, field, stored_value, actual_platform[field]))
+        return drift
+    
+    def get_bond_aggregate(self, bond_id: int) -> dict:
+        """Get total invested, investment count and investor count for a bond"""
+        with self.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT bond_id, {major_units("total_invested")}, investment_count, investor_count
+                FROM bond_aggregates WHERE bond_id = ?
+            """, (bond_id,)).fetchone()
+            if row:
+                return dict(row)
+            return {"bond_id": bond_id, "total_invested": 0, "investment_count": 0, "investor_count": 0}
+    
+    def get_all_bond_aggregates(self) -> dict:
+        """Get aggregates for every bond with investments, keyed by bond ID"""
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT bond_id, {major_units("total_invested")}, investment_count, investor_count
+                FROM bond_aggregates
+            """).fetchall()
+            return {row['bond_id']: dict(row) for row in rows}
+    
+    def get_platform_aggregate(self) -> dict:
+        """Get platform-wide total invested, investment count and investor count"""
+        with self.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT {major_units("total_invested")}, investment_count, investor_count
+                FROM platform_aggregates WHERE id = 1
+            """).fetchone()
+            if row:
+                return dict(row)
+            return {"total_invested": 0, "investment_count": 0, "investor_count": 0}
+    
     def get_user_investments(self, user_id: int) -> List[dict]:
         """Get all investments for a user"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at
+            cursor.execute(f"""
+                SELECT id, user_id, bond_id, investor_address, {major_units("amount")}, timestamp,
+                       transaction_hash, created_at
                 FROM investments WHERE user_id = ?
                 ORDER BY created_at DESC
             """, (user_id,))
@@ -279,6 +1354,17 @@ class Database:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    def get_user_holdings(self, user_id: int) -> List[dict]:
+        """Get a user's investments summed per bond, ordered by bond ID"""
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT bond_id, {major_units("SUM(amount)", "invested")}, COUNT(*) AS investment_count
+                FROM investments WHERE user_id = ?
+                GROUP BY bond_id
+                ORDER BY bond_id
+            """, (user_id,)).fetchall()
+            return [dict(row) for row in rows]
+    
     def get_investments_by_user_id(self, user_id: int) -> List[dict]:
         """Get all investments for a user by user ID (alias for get_user_investments)"""
         return self.get_user_investments(user_id)
@@ -287,8 +1373,9 @@ class Database:
         """Get all investments for an address"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at
+            cursor.execute(f"""
+                SELECT id, user_id, bond_id, investor_address, {major_units("amount")}, timestamp,
+                       transaction_hash, created_at
                 FROM investments WHERE investor_address = ?
                 ORDER BY created_at DESC
             """, (investor_address,))
@@ -300,8 +1387,9 @@ class Database:
         """Get all investments for a bond"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at
+            cursor.execute(f"""
+                SELECT id, user_id, bond_id, investor_address, {major_units("amount")}, timestamp,
+                       transaction_hash, created_at
                 FROM investments WHERE bond_id = ?
                 ORDER BY created_at DESC
             """, (bond_id,))
@@ -313,8 +1401,9 @@ class Database:
         """Get all investments"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at
+            cursor.execute(f"""
+                SELECT id, user_id, bond_id, investor_address, {major_units("amount")}, timestamp,
+                       transaction_hash, created_at
                 FROM investments
                 ORDER BY created_at DESC
             """)
@@ -322,6 +1411,74 @@ class Database:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    INVESTMENT_LISTING = f"""
+        SELECT i.id, i.user_id, i.bond_id, i.investor_address, {major_units("i.amount")}, i.timestamp,
+               i.transaction_hash, i.created_at
+        FROM investments i
+    """
+    
+    @staticmethod
+    def _investment_filters(user_id: Optional[int] = None, bond_id: Optional[int] = None,
+                            investor_address: Optional[str] = None,
+                            created_after: Optional[str] = None,
+                            created_before: Optional[str] = None) -> List[tuple]:
+        return [
+            ("i.user_id = ?", user_id),
+            ("i.bond_id = ?", bond_id),
+            ("i.investor_address = ?", investor_address),
+            ("i.created_at >= ?", created_after),
+            ("i.created_at < ?", created_before),
+        ]
+    
+    def get_investments_page(self, limit: int = 100, cursor: Optional[str] = None,
+                             user_id: Optional[int] = None, bond_id: Optional[int] = None,
+                             investor_address: Optional[str] = None,
+                             created_after: Optional[str] = None,
+                             created_before: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of investments, newest first"""
+        return self._fetch_page(self.INVESTMENT_LISTING, "i", self._investment_filters(
+            user_id, bond_id, investor_address, created_after, created_before
+        ), limit, cursor)
+    
+    def iter_investments(self, batch_size: int = EXPORT_BATCH_SIZE, **filters) -> Iterator:
+        """Stream matching investments oldest first (see _iter_rows)"""
+        return self._iter_rows(self.INVESTMENT_LISTING, "i", self._investment_filters(**filters), batch_size)
+    
+    def get_investment_totals(self, user_id: Optional[int] = None, bond_id: Optional[int] = None,
+                              investor_address: Optional[str] = None,
+                              created_after: Optional[str] = None,
+                              created_before: Optional[str] = None) -> dict:
+        """Get count, sum and distinct investor count of matching investments"""
+        where, params = self._build_where(self._investment_filters(
+            user_id, bond_id, investor_address, created_after, created_before
+        ))
+        with self.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT COUNT(*) AS investment_count,
+                       {major_units("COALESCE(SUM(i.amount), 0)", "total_invested")},
+                       COUNT(DISTINCT i.investor_address) AS investor_count
+                FROM investments i
+                {where}
+            """, params).fetchone()
+            return dict(row)
+    
+    def get_investments_for_users(self, user_ids: List[int]) -> List[dict]:
+        """Get all investments belonging to any of the given users"""
+        if not user_ids:
+            return []
+        placeholders = ", ".join("?" for _ in user_ids)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, user_id, bond_id, investor_address, {major_units("amount")}, timestamp,
+                       transaction_hash, created_at
+                FROM investments WHERE user_id IN ({placeholders})
+                ORDER BY created_at DESC
+            """, list(user_ids))
+            
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+    
     def create_payment_access(self, user_id: int) -> dict:
         """Create payment access record for user"""
         with self.get_connection() as conn:
@@ -413,6 +1570,30 @@ class Database:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    def get_payment_access_page(self, limit: int = 100, cursor: Optional[str] = None,
+                                payment_status: Optional[str] = None,
+                                access_level: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of payment access records, newest first"""
+        return self._fetch_page("""
+            SELECT pa.id, pa.user_id, u.username, u.email, pa.access_level,
+                   pa.can_invest, pa.can_withdraw, pa.can_transfer, pa.payment_status, pa.created_at
+            FROM payment_access pa
+            JOIN users u ON pa.user_id = u.id
+        """, "pa", [
+            ("pa.payment_status = ?", payment_status),
+            ("pa.access_level = ?", access_level),
+        ], limit, cursor)
+    
+    def count_payment_access(self, payment_status: Optional[str] = None,
+                             access_level: Optional[str] = None) -> int:
+        """Count payment access records matching the filters"""
+        where, params = self._build_where([
+            ("pa.payment_status = ?", payment_status),
+            ("pa.access_level = ?", access_level),
+        ])
+        with self.get_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM payment_access pa {where}", params).fetchone()[0]
+    
     def record_transaction(self, user_id: int, trans_type: str, amount: float, 
                           bond_id: Optional[int] = None, status: str = 'pending',
                           transaction_hash: Optional[str] = None, description: Optional[str] = None) -> dict:
@@ -421,12 +1602,13 @@ class Database:
             cursor = conn.cursor()
             timestamp = datetime.now().isoformat()
             created_at = datetime.now().isoformat()
+            units = to_minor_units(amount)
             
             cursor.execute("""
-                INSERT INTO transactions 
+                INSERT INTO transactions
                 (user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (user_id, trans_type, bond_id, amount, status, timestamp, transaction_hash, description, created_at))
+            """, (user_id, trans_type, bond_id, units, status, timestamp, transaction_hash, description, created_at))
             
             transaction_id = cursor.lastrowid
             return {
@@ -434,7 +1616,7 @@ class Database:
                 "user_id": user_id,
                 "type": trans_type,
                 "bond_id": bond_id,
-                "amount": amount,
+                "amount": from_minor_units(units),
                 "status": status,
                 "timestamp": timestamp,
                 "transaction_hash": transaction_hash,
@@ -442,25 +1624,26 @@ class Database:
                 "created_at": created_at
             }
     
-    def get_user_transactions(self, user_id: int) -> List[dict]:
-        """Get all transactions for a user"""
+    def get_user_transactions(self, user_id: int, raw_rows: bool = False) -> List[dict]:
+        """Get all transactions for a user, as sqlite3.Row objects with `raw_rows`"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at
+            cursor.execute(f"""
+                SELECT id, user_id, type, bond_id, {major_units("amount")}, status, timestamp, transaction_hash,
+                       description, created_at
                 FROM transactions WHERE user_id = ?
                 ORDER BY created_at DESC
             """, (user_id,))
             
             rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return rows if raw_rows else [dict(row) for row in rows]
     
     def get_all_transactions(self) -> List[dict]:
         """Get all transactions"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT t.id, t.user_id, u.username, u.email, t.type, t.bond_id, t.amount, 
+            cursor.execute(f"""
+                SELECT t.id, t.user_id, u.username, u.email, t.type, t.bond_id, {major_units("t.amount")},
                        t.status, t.timestamp, t.transaction_hash, t.description, t.created_at
                 FROM transactions t
                 JOIN users u ON t.user_id = u.id
@@ -470,6 +1653,59 @@ class Database:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    TRANSACTION_LISTING = f"""
+        SELECT t.id, t.user_id, u.username, u.email, t.type, t.bond_id, {major_units("t.amount")},
+               t.status, t.timestamp, t.transaction_hash, t.description, t.created_at
+        FROM transactions t
+        JOIN users u ON t.user_id = u.id
+    """
+    
+    @staticmethod
+    def _transaction_filters(user_id: Optional[int] = None, bond_id: Optional[int] = None,
+                             status: Optional[str] = None, trans_type: Optional[str] = None,
+                             created_after: Optional[str] = None,
+                             created_before: Optional[str] = None) -> List[tuple]:
+        return [
+            ("t.user_id = ?", user_id),
+            ("t.bond_id = ?", bond_id),
+            ("t.status = ?", status),
+            ("t.type = ?", trans_type),
+            ("t.created_at >= ?", created_after),
+            ("t.created_at < ?", created_before),
+        ]
+    
+    def get_transactions_page(self, limit: int = 100, cursor: Optional[str] = None,
+                              user_id: Optional[int] = None, bond_id: Optional[int] = None,
+                              status: Optional[str] = None, trans_type: Optional[str] = None,
+                              created_after: Optional[str] = None,
+                              created_before: Optional[str] = None,
+                              raw_rows: bool = False) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of transactions with user details, newest first"""
+        return self._fetch_page(self.TRANSACTION_LISTING, "t", self._transaction_filters(
+            user_id, bond_id, status, trans_type, created_after, created_before
+        ), limit, cursor, raw_rows)
+    
+    def iter_transactions(self, batch_size: int = EXPORT_BATCH_SIZE, **filters) -> Iterator:
+        """Stream matching transactions with user details, oldest first (see _iter_rows)"""
+        return self._iter_rows(self.TRANSACTION_LISTING, "t", self._transaction_filters(**filters), batch_size)
+    
+    def get_transaction_status_counts(self, user_id: Optional[int] = None, bond_id: Optional[int] = None,
+                                      status: Optional[str] = None, trans_type: Optional[str] = None,
+                                      created_after: Optional[str] = None,
+                                      created_before: Optional[str] = None) -> dict:
+        """Count matching transactions per status"""
+        where, params = self._build_where(self._transaction_filters(
+            user_id, bond_id, status, trans_type, created_after, created_before
+        ))
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT t.status, COUNT(*) AS count
+                FROM transactions t
+                {where}
+                GROUP BY t.status
+            """, params).fetchall()
+            return {row['status']: row['count'] for row in rows}
+    
     def create_transaction_bill(self, transaction_id: Optional[int], user_id: int, 
                                bond_name: Optional[str], amount: float, trans_type: str,
                                status: str = 'pending', tax_amount: float = 0.0, 
@@ -479,16 +1715,18 @@ class Database:
             cursor = conn.cursor()
             timestamp = datetime.now().isoformat()
             created_at = datetime.now().isoformat()
-            net_amount = amount - tax_amount - fee_amount
+            units = [to_minor_units(value) for value in (amount, tax_amount, fee_amount)]
+            units.append(units[0] - units[1] - units[2])  # Net amount, exact in minor units
             
             cursor.execute("""
-                INSERT INTO transaction_bills 
-                (transaction_id, user_id, bond_name, amount, transaction_type, status, 
+                INSERT INTO transaction_bills
+                (transaction_id, user_id, bond_name, amount, transaction_type, status,
                  timestamp, tax_amount, fee_amount, net_amount, created_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (transaction_id, user_id, bond_name, amount, trans_type, status,
-                  timestamp, tax_amount, fee_amount, net_amount, created_at))
+            """, (transaction_id, user_id, bond_name, units[0], trans_type, status,
+                  timestamp, units[1], units[2], units[3], created_at))
             
+            amount, tax_amount, fee_amount, net_amount = map(from_minor_units, units)
             return {
                 "id": cursor.lastrowid,
                 "transaction_id": transaction_id,
@@ -508,9 +1746,10 @@ class Database:
         """Get all bills for a user"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, transaction_id, user_id, bond_name, amount, transaction_type, status,
-                       timestamp, tax_amount, fee_amount, net_amount, created_at
+            cursor.execute(f"""
+                SELECT id, transaction_id, user_id, bond_name, {major_units("amount")}, transaction_type, status,
+                       timestamp, {major_units("tax_amount")}, {major_units("fee_amount")},
+                       {major_units("net_amount")}, created_at
                 FROM transaction_bills WHERE user_id = ?
                 ORDER BY created_at DESC
             """, (user_id,))
@@ -522,10 +1761,11 @@ class Database:
         """Get all transaction bills"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT tb.id, tb.transaction_id, tb.user_id, u.username, u.email, tb.bond_name, 
-                       tb.amount, tb.transaction_type, tb.status, tb.timestamp, tb.tax_amount, 
-                       tb.fee_amount, tb.net_amount, tb.created_at
+            cursor.execute(f"""
+                SELECT tb.id, tb.transaction_id, tb.user_id, u.username, u.email, tb.bond_name,
+                       {major_units("tb.amount")}, tb.transaction_type, tb.status, tb.timestamp,
+                       {major_units("tb.tax_amount")}, {major_units("tb.fee_amount")},
+                       {major_units("tb.net_amount")}, tb.created_at
                 FROM transaction_bills tb
                 JOIN users u ON tb.user_id = u.id
                 ORDER BY tb.created_at DESC
@@ -534,10 +1774,481 @@ class Database:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    BILL_LISTING = f"""
+        SELECT tb.id, tb.transaction_id, tb.user_id, u.username, u.email, tb.bond_name,
+               {major_units("tb.amount")}, tb.transaction_type, tb.status, tb.timestamp,
+               {major_units("tb.tax_amount")}, {major_units("tb.fee_amount")},
+               {major_units("tb.net_amount")}, tb.created_at
+        FROM transaction_bills tb
+        JOIN users u ON tb.user_id = u.id
+    """
+    
+    @staticmethod
+    def _bill_filters(user_id: Optional[int] = None, status: Optional[str] = None,
+                      trans_type: Optional[str] = None, created_after: Optional[str] = None,
+                      created_before: Optional[str] = None) -> List[tuple]:
+        return [
+            ("tb.user_id = ?", user_id),
+            ("tb.status = ?", status),
+            ("tb.transaction_type = ?", trans_type),
+            ("tb.created_at >= ?", created_after),
+            ("tb.created_at < ?", created_before),
+        ]
+    
+    def get_bills_page(self, limit: int = 100, cursor: Optional[str] = None,
+                       user_id: Optional[int] = None, status: Optional[str] = None,
+                       trans_type: Optional[str] = None, created_after: Optional[str] = None,
+                       created_before: Optional[str] = None,
+                       raw_rows: bool = False) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of transaction bills with user details, newest first"""
+        return self._fetch_page(self.BILL_LISTING, "tb", self._bill_filters(
+            user_id, status, trans_type, created_after, created_before
+        ), limit, cursor, raw_rows)
+    
+    def iter_bills(self, batch_size: int = EXPORT_BATCH_SIZE, **filters) -> Iterator:
+        """Stream matching transaction bills with user details, oldest first (see _iter_rows)"""
+        return self._iter_rows(self.BILL_LISTING, "tb", self._bill_filters(**filters), batch_size)
+    
+    def get_bills_summary(self, user_id: Optional[int] = None, status: Optional[str] = None,
+                          trans_type: Optional[str] = None, created_after: Optional[str] = None,
+                          created_before: Optional[str] = None) -> dict:
+        """Get count and amount/tax/fee/net totals of matching bills"""
+        where, params = self._build_where(self._bill_filters(
+            user_id, status, trans_type, created_after, created_before
+        ))
+        with self.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT COUNT(*) AS total_bills,
+                       {major_units("COALESCE(SUM(tb.amount), 0)", "total_amount")},
+                       {major_units("COALESCE(SUM(tb.tax_amount), 0)", "total_tax")},
+                       {major_units("COALESCE(SUM(tb.fee_amount), 0)", "total_fee")},
+                       {major_units("COALESCE(SUM(tb.net_amount), 0)", "total_net")}
+                FROM transaction_bills tb
+                {where}
+            """, params).fetchone()
+            return dict(row)
+    
+    BOND_COLUMNS = """
+        id, name, issuer, face_value, coupon_rate, maturity_date, issue_date,
+        description, minimum_investment, bond_token_address, created_at, updated_at,
+        coupon_frequency, day_count, currency_scale
+    """
+    
+    # BOND_COLUMNS as read back, money in major units
+    BOND_SELECT = f"""
+        id, name, issuer, {major_units("face_value")}, coupon_rate, maturity_date, issue_date,
+        description, {major_units("minimum_investment")}, bond_token_address, created_at, updated_at,
+        coupon_frequency, day_count, currency_scale
+    """
+    
+    # Bond fields that may be changed through update_bond
+    BOND_UPDATABLE_FIELDS = (
+        "name", "issuer", "face_value", "coupon_rate", "maturity_date", "issue_date",
+        "description", "minimum_investment", "bond_token_address", "coupon_frequency", "day_count",
+        "currency_scale",
+    )
+    
+    def _bump_bond_catalog_version(self, cursor: sqlite3.Cursor):
+        cursor.execute("""
+            INSERT INTO app_metadata (key, value) VALUES ('bond_catalog_version', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+        """)
+    
+    def get_bond_catalog_version(self) -> int:
+        """Get the bond catalog version, incremented on every bond write"""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT value FROM app_metadata WHERE key = 'bond_catalog_version'
+            """).fetchone()
+            return row[0] if row else 0
+    
+    def save_bond(self, bond: dict, overwrite: bool = True) -> bool:
+        """Insert a bond, or replace an existing one when `overwrite` is set
+        
+        Returns True when the catalog changed.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            now = datetime.now().isoformat()
+            values = (
+                bond['id'], bond['name'], bond['issuer'], to_minor_units(bond['face_value']), bond['coupon_rate'],
+                bond['maturity_date'], bond['issue_date'], bond.get('description'),
+                to_minor_units(bond['minimum_investment']), bond.get('bond_token_address'), now, now,
+                bond.get('coupon_frequency', 2), bond.get('day_count', 'ACT/ACT'),
+                bond.get('currency_scale', AMOUNT_SCALE)
+            )
+            
+            if overwrite:
+                cursor.execute(f"""
+                    INSERT INTO bonds ({self.BOND_COLUMNS})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        name = excluded.name, issuer = excluded.issuer,
+                        face_value = excluded.face_value, coupon_rate = excluded.coupon_rate,
+                        maturity_date = excluded.maturity_date, issue_date = excluded.issue_date,
+                        description = excluded.description,
+                        minimum_investment = excluded.minimum_investment,
+                        bond_token_address = excluded.bond_token_address,
+                        updated_at = excluded.updated_at,
+                        coupon_frequency = excluded.coupon_frequency, day_count = excluded.day_count,
+                        currency_scale = excluded.currency_scale
+                """, values)
+            else:
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO bonds ({self.BOND_COLUMNS})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, values)
+            
+            if cursor.rowcount == 0:
+                return False
+            self._delete_coupon_schedule(cursor, bond['id'])
+            self._bump_bond_catalog_version(cursor)
+            return True
+    
+    def update_bond(self, bond_id: int, **fields) -> Optional[dict]:
+        """Update bond columns; returns the updated bond or None if it does not exist"""
+        unknown = set(fields) - set(self.BOND_UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot update bond fields: {', '.join(sorted(unknown))}")
+        
+        fields = {
+            name: to_minor_units(value) if name in MINOR_UNIT_COLUMNS["bonds"] else value
+            for name, value in fields.items()
+        }
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if fields:
+                assignments = ", ".join(f"{name} = ?" for name in fields)
+                cursor.execute(f"""
+                    UPDATE bonds SET {assignments}, updated_at = ?
+                    WHERE id = ?
+                """, list(fields.values()) + [datetime.now().isoformat(), bond_id])
+                if cursor.rowcount:
+                    self._delete_coupon_schedule(cursor, bond_id)
+                    self._bump_bond_catalog_version(cursor)
+            return self.get_bond(bond_id)
+    
+    def delete_bond(self, bond_id: int) -> bool:
+        """Delete a bond; returns False if it does not exist"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM bonds WHERE id = ?", (bond_id,))
+            if cursor.rowcount == 0:
+                return False
+            self._delete_coupon_schedule(cursor, bond_id)
+            self._bump_bond_catalog_version(cursor)
+            return True
+    
+    def get_bond(self, bond_id: int) -> Optional[dict]:
+        """Get a bond by ID"""
+        with self.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT {self.BOND_SELECT} FROM bonds WHERE id = ?
+            """, (bond_id,)).fetchone()
+            if row:
+                return dict(row)
+            return None
+    
+    def get_all_bonds(self) -> List[dict]:
+        """Get all bonds ordered by ID"""
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT {self.BOND_SELECT} FROM bonds ORDER BY id
+            """).fetchall()
+            return [dict(row) for row in rows]
+    
+    def search_bonds(self, issuer: Optional[str] = None,
+                     min_coupon_rate: Optional[float] = None, max_coupon_rate: Optional[float] = None,
+                     matures_after: Optional[str] = None, matures_before: Optional[str] = None) -> List[dict]:
+        """Get bonds matching issuer, coupon rate and maturity filters"""
+        where, params = self._build_where([
+            ("issuer = ?", issuer),
+            ("coupon_rate >= ?", min_coupon_rate),
+            ("coupon_rate <= ?", max_coupon_rate),
+            ("maturity_date >= ?", matures_after),
+            ("maturity_date < ?", matures_before),
+        ])
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT {self.BOND_SELECT} FROM bonds
+                {where}
+                ORDER BY id
+            """, params).fetchall()
+            return [dict(row) for row in rows]
+    
+    # ==================== COUPON SCHEDULES ====================
+    
+    def _delete_coupon_schedule(self, cursor: sqlite3.Cursor, bond_id: int):
+        """Drop a bond's stored schedule so it is rebuilt from the new terms"""
+        cursor.execute("DELETE FROM coupon_schedules WHERE bond_id = ?", (bond_id,))
+    
+    def get_coupon_schedules(self) -> Dict[int, dict]:
+        """Get every stored coupon schedule row, keyed by bond ID"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT bond_id, coupon_rate, coupon_frequency, day_count, issue_date, first_period_start,
+                       payment_dates, amounts
+                FROM coupon_schedules
+            """).fetchall()
+            return {row['bond_id']: dict(row) for row in rows}
+    
+    def save_coupon_schedules(self, schedules: List[dict]):
+        """Store coupon schedule rows, replacing any existing schedule for the same bond"""
+        if not schedules:
+            return
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO coupon_schedules
+                    (bond_id, coupon_rate, coupon_frequency, day_count, issue_date, first_period_start,
+                     payment_dates, amounts)
+                SELECT :bond_id, :coupon_rate, :coupon_frequency, :day_count, :issue_date, :first_period_start,
+                       :payment_dates, :amounts
+                WHERE EXISTS (SELECT 1 FROM bonds WHERE id = :bond_id)
+            """, schedules)
+    
+    # ==================== CHAIN EVENT INDEX ====================
+    
+    def get_indexer_checkpoint(self) -> Optional[int]:
+        """Get the last block fully ingested by the event indexer"""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT value FROM app_metadata WHERE key = 'indexer_last_block'
+            """).fetchone()
+            return row[0] if row else None
+    
+    def _set_indexer_checkpoint(self, cursor: sqlite3.Cursor, block_number: int):
+        cursor.execute("""
+            INSERT INTO app_metadata (key, value) VALUES ('indexer_last_block', ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """, (block_number,))
+    
+    def get_chain_block_hashes(self, limit: Optional[int] = None) -> List[Tuple[int, str]]:
+        """Get stored (block_number, block_hash) pairs, newest first"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT block_number, block_hash FROM chain_blocks
+                ORDER BY block_number DESC
+                LIMIT ?
+            """, (-1 if limit is None else limit,)).fetchall()
+            return [(row[0], row[1]) for row in rows]
+    
+    def _chain_bond_ids(self, cursor: sqlite3.Cursor) -> dict:
+        cursor.execute("""
+            SELECT cb.bond_token_address, COALESCE(b.id, cb.chain_bond_id + ?)
+            FROM chain_bonds cb
+            LEFT JOIN bonds b ON lower(b.bond_token_address) = cb.bond_token_address
+        """, (CHAIN_BOND_ID_OFFSET,))
+        return {row[0]: row[1] for row in cursor.fetchall()}
+    
+    def get_chain_bonds(self) -> dict:
+        """Map known bond token addresses (lowercase) to catalog bond ids
+        
+        A catalog bond with a matching bond_token_address wins; otherwise the
+        on-chain bondId is shifted by CHAIN_BOND_ID_OFFSET.
+        """
+        with self.get_connection() as conn:
+            return self._chain_bond_ids(conn.cursor())
+    
+    def _get_investors_by_address(self, cursor: sqlite3.Cursor, addresses: set) -> dict:
+        """Resolve investor addresses to (user_id, stored spelling) of the last investment from them
+        
+        Matches both the given and the lowercase spelling so the
+        investor_address index is used; the result is keyed by lowercase
+        address and omits unknown addresses.
+        """
+        spellings = list({spelling for address in addresses for spelling in (address, address.lower())})
+        user_ids = {}
+        for start in range(0, len(spellings), 500):
+            chunk = spellings[start:start + 500]
+            cursor.execute(f"""
+                SELECT investor_address, user_id FROM investments
+                WHERE investor_address IN ({", ".join("?" * len(chunk))})
+                ORDER BY id
+            """, chunk)
+            for address, user_id in cursor.fetchall():
+                user_ids[address.lower()] = (user_id, address)
+        return user_ids
+    
+    def _record_chain_event(self, cursor: sqlite3.Cursor, user_id: int, investor_address: str, bond_id: int,
+                            event: str, tx_hash: str, amount: str, created_at: str) -> Tuple[Optional[int], int]:
+        """Write the investment (for InvestmentMade) and transaction history row of a user's on-chain event
+        
+        `amount` is the raw uint256, converted to minor units with half-even
+        rounding. An InvestmentMade whose transaction was already self-reported
+        through POST /api/invest reuses that investment. Returns the ids of the
+        investment created, if any, and of the transaction.
+        """
+        units = token_to_minor_units(int(amount), STABLECOIN_DECIMALS)
+        investment_id = None
+        if event == "InvestmentMade":
+            cursor.execute("""
+                SELECT id FROM investments WHERE transaction_hash = ? AND bond_id = ?
+            """, (tx_hash, bond_id))
+            if cursor.fetchone() is None:
+                cursor.execute("""
+                    INSERT INTO investments
+                    (user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (user_id, bond_id, investor_address, units, created_at, tx_hash, created_at))
+                investment_id = cursor.lastrowid
+                self._apply_investment_aggregates(cursor, [(bond_id, investor_address, units)], created_at)
+        
+        trans_type, description = CHAIN_TRANSACTION_TYPES[event]
+        cursor.execute("""
+            INSERT INTO transactions
+            (user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at)
+            VALUES (?, ?, ?, ?, 'completed', ?, ?, ?, ?)
+        """, (user_id, trans_type, bond_id, units, created_at, tx_hash, description, created_at))
+        return investment_id, cursor.lastrowid
+    
+    def _attribute_chain_events(self, cursor: sqlite3.Cursor, addresses: set) -> int:
+        """Attribute indexed events from `addresses` that are now known investors
+        
+        Events from an address no user has invested from are stored in
+        chain_events only. Once a user records an investment from the address,
+        its events get the investments and transactions apply_chain_events
+        would have written, as new rows so id-ordered readers pick them up.
+        Returns the number of events attributed.
+        """
+        lowered = sorted({address.lower() for address in addresses})
+        pending = []
+        for start in range(0, len(lowered), 500):
+            chunk = lowered[start:start + 500]
+            cursor.execute(f"""
+                SELECT id, lower(investor_address), bond_id, event, tx_hash, amount
+                FROM chain_events
+                WHERE transaction_id IS NULL AND lower(investor_address) IN ({", ".join("?" * len(chunk))})
+            """, chunk)
+            pending.extend(cursor.fetchall())
+        if not pending:
+            return 0
+        
+        investors = self._get_investors_by_address(cursor, {row[1] for row in pending})
+        created_at = datetime.now().isoformat()
+        attributed = 0
+        for event_id, address, bond_id, event, tx_hash, amount in sorted(pending, key=lambda row: row[0]):
+            if address not in investors:
+                continue
+            user_id, investor_address = investors[address]
+            investment_id, transaction_id = self._record_chain_event(
+                cursor, user_id, investor_address, bond_id, event, tx_hash, amount, created_at
+            )
+            cursor.execute("""
+                UPDATE chain_events SET investor_address = ?, investment_id = ?, transaction_id = ?
+                WHERE id = ?
+            """, (investor_address, investment_id, transaction_id, event_id))
+            attributed += 1
+        return attributed
+    
+    def apply_chain_events(self, events: List[dict], bonds: List[dict],
+                           block_hashes: dict, last_block: int, keep_blocks: int) -> dict:
+        """Ingest one block range of decoded contract events in a single transaction
+        
+        Each event dict carries tx_hash, log_index, block_number, block_hash,
+        contract_address (a bond token, lowercase), event (a key of
+        CHAIN_TRANSACTION_TYPES), investor_address and amount, the raw uint256;
+        bond ids are resolved after the range's BondCreated rows are stored.
+        Events already ingested are skipped. Events from known investors get
+        their investment and transaction rows (see _record_chain_event); those
+        from addresses no user has invested from are only stored in
+        chain_events until _attribute_chain_events links them.
+        The checkpoint moves to `last_block` and block hashes older than
+        `keep_blocks` are pruned.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            created_at = datetime.now().isoformat()
+            
+            cursor.executemany("""
+                INSERT OR IGNORE INTO chain_bonds
+                (bond_token_address, chain_bond_id, bond_name, issuer, block_number)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(bond['bond_token_address'], bond['chain_bond_id'], bond['bond_name'],
+                   bond['issuer'], bond['block_number']) for bond in bonds])
+            
+            bond_ids = self._chain_bond_ids(cursor)
+            new_events = events
+            if events:
+                cursor.execute("""
+                    SELECT tx_hash, log_index FROM chain_events WHERE block_number BETWEEN ? AND ?
+                """, (events[0]['block_number'], events[-1]['block_number']))
+                seen = set(cursor.fetchall())
+                new_events = [e for e in events if (e['tx_hash'], e['log_index']) not in seen]
+            
+            known_investors = self._get_investors_by_address(cursor, {e['investor_address'] for e in new_events})
+            
+            rows = []
+            investments = 0
+            for event in new_events:
+                bond_id = bond_ids[event['contract_address']]
+                investment_id = transaction_id = None
+                investor_address = event['investor_address']
+                known = known_investors.get(investor_address.lower())
+                if known:
+                    # Reuse the spelling already on file so aggregates count one investor
+                    user_id, investor_address = known
+                    investment_id, transaction_id = self._record_chain_event(
+                        cursor, user_id, investor_address, bond_id, event['event'],
+                        event['tx_hash'], str(event['amount']), created_at
+                    )
+                    investments += investment_id is not None
+                
+                rows.append((event['tx_hash'], event['log_index'], event['block_number'], event['block_hash'],
+                             event['contract_address'], event['event'], investor_address,
+                             bond_id, str(event['amount']), investment_id, transaction_id, created_at))
+            
+            cursor.executemany("""
+                INSERT INTO chain_events
+                (tx_hash, log_index, block_number, block_hash, contract_address, event,
+                 investor_address, bond_id, amount, investment_id, transaction_id, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            
+            cursor.executemany("""
+                INSERT OR REPLACE INTO chain_blocks (block_number, block_hash) VALUES (?, ?)
+            """, list(block_hashes.items()))
+            cursor.execute("DELETE FROM chain_blocks WHERE block_number <= ?", (last_block - keep_blocks,))
+            self._set_indexer_checkpoint(cursor, last_block)
+            
+            return {"events": len(rows), "investments": investments, "bonds": len(bonds)}
+    
+    def rewind_chain_events(self, fork_block: int) -> int:
+        """Undo everything ingested above `fork_block` after a chain reorganisation
+        
+        Removes the investments and transactions the indexer created from those
+        blocks, rebuilds the aggregates and moves the checkpoint back. Returns
+        the number of events removed.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM investments WHERE id IN (
+                    SELECT investment_id FROM chain_events
+                    WHERE block_number > ? AND investment_id IS NOT NULL
+                )
+            """, (fork_block,))
+            cursor.execute("""
+                DELETE FROM transactions WHERE id IN (
+                    SELECT transaction_id FROM chain_events
+                    WHERE block_number > ? AND transaction_id IS NOT NULL
+                )
+            """, (fork_block,))
+            cursor.execute("DELETE FROM chain_events WHERE block_number > ?", (fork_block,))
+            removed = cursor.rowcount
+            cursor.execute("DELETE FROM chain_bonds WHERE block_number > ?", (fork_block,))
+            cursor.execute("DELETE FROM chain_blocks WHERE block_number > ?", (fork_block,))
+            self._set_indexer_checkpoint(cursor, fork_block)
+            self._rebuild_aggregates(cursor)
+            return removed
+    
     def delete_database(self):
         """Delete database file (for testing)"""
-        if os.path.exists(self.db_file):
-            os.remove(self.db_file)
+        self.pool.close()
+        for path in (self.db_file, self.db_file + "-wal", self.db_file + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.pool = ConnectionPool(self.db_file, max_size=self.pool_size, pragmas=self.pragmas)
+        self.journal_mode = self._set_journal_mode()
 
 
 # Global database instance
@@ -555,5 +2266,7 @@ def get_db() -> Database:
 def init_db_instance():
     """Initialize database instance"""
     global _db
+    if _db is not None:
+        _db.close()
     _db = Database()
     return _db
@@ -0,0 +1,271 @@
+"""
+Contract event indexer for Bond Investment Platform
+Ingests BondPlatform and BondToken logs into SQLite through eth_getLogs
+
+Usage:
+    python event_indexer.py --once   # catch up to the confirmed head and exit
+    python event_indexer.py          # keep following the chain
+"""
+
+import argparse
+import sys
+import time
+from typing import Optional, List, Tuple
+
+from eth_utils import keccak, to_checksum_address
+
+from blockchain_utils import BlockchainClient, RPCError, decode_result
+from database import Database, DATABASE_FILE, CHAIN_TRANSACTION_TYPES
+from config import (
+    BLOCKCHAIN_RPC_URL, BOND_PLATFORM_CONTRACT_ADDRESS,
+    INDEXER_START_BLOCK, INDEXER_CONFIRMATIONS, INDEXER_INITIAL_RANGE, INDEXER_MIN_RANGE,
+    INDEXER_MAX_RANGE, INDEXER_TARGET_LOGS, INDEXER_REORG_DEPTH, INDEXER_POLL_INTERVAL
+)
+
+# Event name -> (canonical signature, ABI types of the non-indexed fields)
+EVENTS = {
+    "BondCreated": ("BondCreated(uint256,address,string,string)", ["string", "string"]),
+    "InvestmentMade": ("InvestmentMade(address,uint256,uint256)", ["uint256", "uint256"]),
+    "InterestPaid": ("InterestPaid(address,uint256)", ["uint256"]),
+    "PrincipalRedeemed": ("PrincipalRedeemed(address,uint256)", ["uint256"]),
+}
+
+EVENT_TOPICS = {name: "0x" + keccak(text=signature).hex() for name, (signature, _) in EVENTS.items()}
+EVENTS_BY_TOPIC = {topic: name for name, topic in EVENT_TOPICS.items()}
+
+# Fragments of the errors nodes return when an eth_getLogs range holds too many results
+RANGE_TOO_LARGE_HINTS = ("more than", "too many", "limit", "exceed", "range", "response size")
+
+
+def topic_to_address(topic: str) -> str:
+    """Extract the checksummed address from a 32-byte indexed topic"""
+    return to_checksum_address("0x" + topic[-40:])
+
+
+def decode_log(log: dict) -> Tuple[str, tuple]:
+    """Decode a log into (event name, non-indexed values)"""
+    name = EVENTS_BY_TOPIC[log["topics"][0]]
+    return name, decode_result(EVENTS[name][1], log.get("data"))
+
+
+def is_range_too_large(error: RPCError) -> bool:
+    """Whether an eth_getLogs error asks for a smaller block range"""
+    message = (error.message or "").lower()
+    return error.code == -32005 or any(hint in message for hint in RANGE_TOO_LARGE_HINTS)
+
+
+class EventIndexer:
+    """Resumable eth_getLogs indexer for the bond contracts
+
+    Each step fetches one block range of logs together with the hash of its
+    last block, decodes them and hands them to Database.apply_chain_events,
+    which ingests the range and moves the checkpoint in one transaction. The
+    range grows or shrinks towards `target_logs` logs per request and is
+    halved whenever the node rejects it as too large. Before every step the
+    stored hash of the checkpoint block is compared with the node; on a
+    mismatch the database is rewound to the newest block both still agree on.
+    """
+
+    def __init__(self, db: Database, client: BlockchainClient, platform_address: str,
+                 start_block: int = INDEXER_START_BLOCK, confirmations: int = INDEXER_CONFIRMATIONS,
+                 initial_range: int = INDEXER_INITIAL_RANGE, min_range: int = INDEXER_MIN_RANGE,
+                 max_range: int = INDEXER_MAX_RANGE, target_logs: int = INDEXER_TARGET_LOGS,
+                 reorg_depth: int = INDEXER_REORG_DEPTH):
+        self.db = db
+        self.client = client
+        self.platform_address = platform_address.lower()
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.block_range = initial_range
+        self.min_range = min_range
+        self.max_range = max_range
+        self.target_logs = target_logs
+        self.reorg_depth = reorg_depth
+        self.stats = {"requests": 0, "logs": 0, "events": 0, "investments": 0,
+                      "bonds": 0, "range_splits": 0, "reorgs": 0, "rewound_events": 0}
+
+    def _checkpoint(self) -> int:
+        checkpoint = self.db.get_indexer_checkpoint()
+        return self.start_block - 1 if checkpoint is None else checkpoint
+
+    def _check_reorg(self, checkpoint: int) -> int:
+        """Rewind past blocks the node no longer agrees with; returns the checkpoint to resume from"""
+        stored = self.db.get_chain_block_hashes(self.reorg_depth)
+        if not stored:
+            return checkpoint
+
+        latest = self.client.batch([("eth_getBlockByNumber", [hex(stored[0][0]), False])])[0]
+        self.stats["requests"] += 1
+        if not isinstance(latest, RPCError) and latest and latest["hash"] == stored[0][1]:
+            return checkpoint
+
+        blocks = self.client.batch([("eth_getBlockByNumber", [hex(number), False]) for number, _ in stored])
+        self.stats["requests"] += 1
+
+        # Newest stored block whose hash still matches; beyond the retained
+        # window the whole window is replayed
+        fork_block = stored[-1][0] - 1
+        for (number, block_hash), block in zip(stored, blocks):
+            if not isinstance(block, RPCError) and block and block["hash"] == block_hash:
+                fork_block = number
+                break
+
+        self.stats["reorgs"] += 1
+        self.stats["rewound_events"] += self.db.rewind_chain_events(fork_block)
+        return fork_block
+
+    def _get_logs(self, from_block: int, to_block: int, addresses: List[str],
+                  topics: List[str]) -> Tuple[list, Optional[str]]:
+        """Fetch logs and the hash of `to_block` in one batch request"""
+        log_filter = {
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "address": addresses,
+            "topics": [topics],
+        }
+        logs, block = self.client.batch([
+            ("eth_getLogs", [log_filter]),
+            ("eth_getBlockByNumber", [hex(to_block), False]),
+        ])
+        self.stats["requests"] += 1
+        if isinstance(logs, RPCError):
+            raise logs
+        if isinstance(block, RPCError):
+            raise block
+        return logs, block["hash"] if block else None
+
+    def index_range(self, from_block: int, to_block: int) -> Optional[dict]:
+        """Ingest logs for [from_block, to_block]
+
+        Returns the apply_chain_events counts plus the number of logs fetched,
+        or None when the node's view changed mid-request and the range must be
+        retried.
+        """
+        known_tokens = self.db.get_chain_bonds()
+        token_topics = [EVENT_TOPICS[name] for name in CHAIN_TRANSACTION_TYPES]
+        logs, end_hash = self._get_logs(from_block, to_block, [self.platform_address] + list(known_tokens),
+                                        [EVENT_TOPICS["BondCreated"]] + token_topics)
+
+        bonds = []
+        for log in logs:
+            if log["address"].lower() != self.platform_address or log["topics"][0] != EVENT_TOPICS["BondCreated"]:
+                continue
+            bond_name, issuer = decode_log(log)[1]
+            bonds.append({
+                "bond_token_address": topic_to_address(log["topics"][2]).lower(),
+                "chain_bond_id": int(log["topics"][1], 16),
+                "bond_name": bond_name,
+                "issuer": issuer,
+                "block_number": int(log["blockNumber"], 16),
+            })
+
+        # Tokens created inside this range were not part of the address filter
+        new_tokens = [bond["bond_token_address"] for bond in bonds if bond["bond_token_address"] not in known_tokens]
+        if new_tokens:
+            extra_logs, extra_hash = self._get_logs(from_block, to_block, new_tokens, token_topics)
+            if extra_hash != end_hash:
+                return None
+            logs = logs + extra_logs
+
+        block_hashes = {to_block: end_hash}
+        events = []
+        for log in sorted(logs, key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16))):
+            block_number = int(log["blockNumber"], 16)
+            if block_hashes.setdefault(block_number, log["blockHash"]) != log["blockHash"]:
+                return None
+            name, values = decode_log(log)
+            if name not in CHAIN_TRANSACTION_TYPES:
+                continue
+            events.append({
+                "tx_hash": log["transactionHash"],
+                "log_index": int(log["logIndex"], 16),
+                "block_number": block_number,
+                "block_hash": log["blockHash"],
+                "contract_address": log["address"].lower(),
+                "event": name,
+                "investor_address": topic_to_address(log["topics"][1]),
+                "amount": values[0],  # Raw uint256; converted to minor units on ingest
+            })
+
+        counts = self.db.apply_chain_events(events, bonds, block_hashes, to_block, self.reorg_depth)
+        counts["logs"] = len(logs)
+        return counts
+
+    def run_once(self) -> Optional[int]:
+        """Index the next block range
+
+        Returns the number of blocks advanced (0 when the range must be
+        retried), or None when already caught up with the confirmed head.
+        """
+        target = self.client.get_block_number() - self.confirmations
+        self.stats["requests"] += 1
+        checkpoint = self._check_reorg(self._checkpoint())
+        if checkpoint >= target:
+            return None
+
+        to_block = min(checkpoint + self.block_range, target)
+        try:
+            counts = self.index_range(checkpoint + 1, to_block)
+        except RPCError as e:
+            if not is_range_too_large(e) or self.block_range <= self.min_range:
+                raise
+            self.block_range = max(self.min_range, self.block_range // 2)
+            self.stats["range_splits"] += 1
+            return 0
+        if counts is None:
+            return 0
+
+        for key in ("logs", "events", "investments", "bonds"):
+            self.stats[key] += counts[key]
+
+        # Move towards target_logs per request, at most doubling or halving per step
+        scale = min(2.0, max(0.5, self.target_logs / max(counts["logs"], 1)))
+        if to_block - checkpoint == self.block_range:
+            self.block_range = int(min(self.max_range, max(self.min_range, self.block_range * scale)))
+        return to_block - checkpoint
+
+    def sync(self) -> dict:
+        """Index until caught up with the confirmed head; returns cumulative stats"""
+        while self.run_once() is not None:
+            pass
+        return dict(self.stats, checkpoint=self._checkpoint(), block_range=self.block_range)
+
+    def run_forever(self, poll_interval: float = INDEXER_POLL_INTERVAL):
+        """Follow the chain, polling for new blocks"""
+        while True:
+            self.sync()
+            time.sleep(poll_interval)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Index bond contract events into SQLite")
+    parser.add_argument("--db", default=DATABASE_FILE, help="SQLite database file")
+    parser.add_argument("--rpc-url", default=BLOCKCHAIN_RPC_URL, help="JSON-RPC endpoint")
+    parser.add_argument("--platform", default=BOND_PLATFORM_CONTRACT_ADDRESS, help="BondPlatform address")
+    parser.add_argument("--from-block", type=int, default=INDEXER_START_BLOCK, help="First block on a fresh database")
+    parser.add_argument("--once", action="store_true", help="Exit after catching up")
+    args = parser.parse_args()
+
+    if not args.platform:
+        print("BondPlatform address required (--platform or BOND_PLATFORM_CONTRACT_ADDRESS)")
+        return 2
+
+    db = Database(args.db)
+    db.init_db()
+    client = BlockchainClient(args.rpc_url)
+    indexer = EventIndexer(db, client, args.platform, start_block=args.from_block)
+    try:
+        if args.once:
+            stats = indexer.sync()
+            print(f"Indexed up to block {stats['checkpoint']}: {stats['events']} events, "
+                  f"{stats['investments']} new investments, {stats['bonds']} bonds, {stats['reorgs']} reorgs")
+        else:
+            indexer.run_forever()
+        return 0
+    finally:
+        client.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
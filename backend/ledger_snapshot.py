@@ -0,0 +1,274 @@
+"""
+Columnar snapshots of the ledger tables for offline analytics
+
+Copies investments, transactions and transaction_bills into typed columnar
+files partitioned by month of created_at, appending only rows past each
+table's id watermark on every run. Parquet (zstd) is written when pyarrow
+is installed; otherwise every column is an .npy file that NumPy can
+memory-map.
+
+Usage:
+    python ledger_snapshot.py                       # append new rows
+    python ledger_snapshot.py --full                # rebuild from scratch
+    python ledger_snapshot.py --format npy --dir /data/ledger --table transactions
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from config import SNAPSHOT_DIR, SNAPSHOT_FORMAT, SNAPSHOT_COMPRESSION, SNAPSHOT_BATCH_SIZE
+from database import Database, DATABASE_FILE, LEDGER_TABLES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional; snapshots fall back to .npy columns
+    pa = pq = None
+
+# Table -> (column, kind, nullable); kinds map to KIND_DTYPES
+LEDGER_SCHEMAS = {
+    "investments": (
+        ("id", "int", False), ("user_id", "int", False), ("bond_id", "int", False),
+        ("investor_address", "str", False), ("amount", "float", False), ("timestamp", "str", False),
+        ("transaction_hash", "str", True), ("created_at", "datetime", False),
+    ),
+    "transactions": (
+        ("id", "int", False), ("user_id", "int", False), ("type", "str", False), ("bond_id", "int", True),
+        ("amount", "float", False), ("status", "str", True), ("timestamp", "str", False),
+        ("transaction_hash", "str", True), ("description", "str", True), ("created_at", "datetime", False),
+    ),
+    "transaction_bills": (
+        ("id", "int", False), ("transaction_id", "int", True), ("user_id", "int", False),
+        ("bond_name", "str", True), ("amount", "float", False), ("transaction_type", "str", False),
+        ("status", "str", True), ("timestamp", "str", False), ("tax_amount", "float", True),
+        ("fee_amount", "float", True), ("net_amount", "float", True), ("created_at", "datetime", False),
+    ),
+}
+
+KIND_DTYPES = {"int": np.int64, "float": np.float64, "str": np.str_, "datetime": "datetime64[us]"}
+# Stored in place of NULL; the column's null mask says which values are real
+NULL_FILL = {"int": 0, "float": 0.0, "str": "", "datetime": None}
+# Null masks are read and written as extra columns named <column>.null
+NULL_SUFFIX = ".null"
+SNAPSHOT_FORMATS = ("parquet", "npy")
+MANIFEST_FILE = "manifest.json"
+
+
+def _to_columns(schema: Sequence[tuple], rows: List) -> Dict[str, np.ndarray]:
+    """Typed NumPy columns, plus a null mask per nullable column, from a batch of rows"""
+    columns = {}
+    for (name, kind, nullable), values in zip(schema, zip(*rows)):
+        if nullable:
+            mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+            if mask.any():
+                values = [NULL_FILL[kind] if value is None else value for value in values]
+            columns[name + NULL_SUFFIX] = mask
+        columns[name] = np.array(values, dtype=KIND_DTYPES[kind])
+    return columns
+
+
+class NpyParts:
+    """Each part is a directory holding one .npy file per column"""
+
+    extension = ""
+
+    def write(self, path: str, columns: Dict[str, np.ndarray], schema: Sequence[tuple]):
+        staging = path + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for name, values in columns.items():
+            np.save(os.path.join(staging, name + ".npy"), values)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(staging, path)
+
+    def read(self, path: str, names: List[str]) -> Dict[str, np.ndarray]:
+        return {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in names}
+
+
+class ParquetParts:
+    """Each part is one compressed Parquet file"""
+
+    extension = ".parquet"
+
+    def __init__(self, compression: str):
+        self.compression = compression
+
+    def write(self, path: str, columns: Dict[str, np.ndarray], schema: Sequence[tuple]):
+        arrays = []
+        for name, _, _ in schema:
+            mask = columns.get(name + NULL_SUFFIX)
+            arrays.append(pa.array(columns[name], mask=mask if mask is not None and mask.any() else None))
+        staging = path + ".tmp"
+        pq.write_table(pa.Table.from_arrays(arrays, names=[name for name, _, _ in schema]),
+                       staging, compression=self.compression)
+        os.replace(staging, path)
+
+    def read(self, path: str, names: List[str]) -> Dict[str, np.ndarray]:
+        table = pq.read_table(path, columns=[name for name in names if not name.endswith(NULL_SUFFIX)],
+                              memory_map=True)
+        columns = {}
+        for name in names:
+            if name.endswith(NULL_SUFFIX):
+                columns[name] = table.column(name[:-len(NULL_SUFFIX)]).is_null().to_numpy()
+            else:
+                columns[name] = table.column(name).to_numpy()
+        return columns
+
+
+class LedgerSnapshot:
+    """Incremental, month-partitioned columnar copy of the ledger tables
+
+    manifest.json records each table's id watermark and its part files;
+    parts are named by id range under <table>/month=YYYY-MM/, and the
+    manifest is only rewritten after a part is in place, so an interrupted
+    run is redone from the last watermark. Rows are appended, never
+    revisited: later updates to snapshotted rows (a transaction's status,
+    say) need a full rebuild.
+    """
+
+    def __init__(self, directory: str = SNAPSHOT_DIR, file_format: str = SNAPSHOT_FORMAT,
+                 compression: str = SNAPSHOT_COMPRESSION):
+        self.directory = directory
+        self.manifest = self._load_manifest()
+        if file_format == "auto":
+            file_format = self.manifest.get("format") or ("parquet" if pq is not None else "npy")
+        if file_format not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Snapshot format must be one of: auto, {', '.join(SNAPSHOT_FORMATS)}")
+        if self.manifest.get("format", file_format) != file_format:
+            raise ValueError(f"Snapshot in {directory} is {self.manifest['format']}; "
+                             f"write a {file_format} snapshot to a new directory")
+        if file_format == "parquet" and pq is None:
+            raise ValueError("Parquet snapshots need pyarrow; install it or use the npy format")
+        self.format = file_format
+        self.manifest["format"] = file_format
+        self.manifest.setdefault("tables", {})
+        self._parts = ParquetParts(compression) if file_format == "parquet" else NpyParts()
+
+    def _load_manifest(self) -> dict:
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def _table_state(self, table: str) -> dict:
+        if table not in LEDGER_SCHEMAS:
+            raise ValueError(f"Unknown ledger table: {table}")
+        return self.manifest["tables"].setdefault(table, {"watermark": 0, "parts": []})
+
+    def watermark(self, table: str) -> int:
+        """Highest id copied from `table` so far"""
+        return self._table_state(table)["watermark"]
+
+    def update(self, db: Database, tables: Sequence[str] = LEDGER_TABLES,
+               batch_size: int = SNAPSHOT_BATCH_SIZE) -> Dict[str, int]:
+        """Append rows past each table's watermark; returns rows appended per table"""
+        appended = {}
+        for table in tables:
+            state = self._table_state(table)
+            schema = LEDGER_SCHEMAS[table]
+            stream = db.iter_ledger_rows(table, [name for name, _, _ in schema], state["watermark"], batch_size)
+            next(stream)  # Column names, already known from the schema
+            appended[table] = 0
+            for rows in stream:
+                columns = _to_columns(schema, rows)
+                months = columns["created_at"].astype("datetime64[M]")
+                for month in np.unique(months):
+                    selected = months == month
+                    self._write_part(table, str(month), {
+                        name: values[selected] for name, values in columns.items()
+                    }, schema)
+                state["watermark"] = int(columns["id"][-1])
+                self._save_manifest()
+                appended[table] += len(rows)
+        return appended
+
+    def _write_part(self, table: str, month: str, columns: Dict[str, np.ndarray], schema: Sequence[tuple]):
+        ids = columns["id"]
+        relative = os.path.join(table, f"month={month}",
+                                f"part-{ids[0]:012d}-{ids[-1]:012d}{self._parts.extension}")
+        path = os.path.join(self.directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._parts.write(path, columns, schema)
+        self._table_state(table)["parts"].append({
+            "month": month, "path": relative, "rows": len(ids), "first_id": int(ids[0]), "last_id": int(ids[-1])
+        })
+
+    def reset(self, tables: Sequence[str] = LEDGER_TABLES):
+        """Drop the snapshot of `tables` so the next update copies them from id 0"""
+        for table in tables:
+            self._table_state(table)
+            shutil.rmtree(os.path.join(self.directory, table), ignore_errors=True)
+            self.manifest["tables"][table] = {"watermark": 0, "parts": []}
+        self._save_manifest()
+
+    def parts(self, table: str, months: Optional[Sequence[str]] = None) -> List[dict]:
+        """Manifest entries for `table`, optionally limited to months given as YYYY-MM"""
+        return [part for part in self._table_state(table)["parts"] if months is None or part["month"] in months]
+
+    def scan(self, table: str, columns: Optional[Sequence[str]] = None,
+             months: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield each part's columns without loading the whole table
+
+        npy parts are memory-mapped and Parquet parts read through a memory
+        map. Nullable columns come with a boolean "<column>.null" mask.
+        """
+        schema = LEDGER_SCHEMAS[table]
+        names = list(columns or [name for name, _, _ in schema])
+        nullable = {name for name, _, is_nullable in schema if is_nullable}
+        names += [name + NULL_SUFFIX for name in names if name in nullable]
+        for part in self.parts(table, months):
+            yield self._parts.read(os.path.join(self.directory, part["path"]), names)
+
+    def read(self, table: str, columns: Optional[Sequence[str]] = None,
+             months: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """All matching parts concatenated into in-memory arrays"""
+        chunks = list(self.scan(table, columns, months))
+        if not chunks:
+            kinds = {name: kind for name, kind, _ in LEDGER_SCHEMAS[table]}
+            return {name: np.empty(0, dtype=KIND_DTYPES[kinds[name]])
+                    for name in (columns or kinds)}
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write an incremental columnar snapshot of the ledger tables")
+    parser.add_argument("--db", default=DATABASE_FILE, help="SQLite database file")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument("--format", default=SNAPSHOT_FORMAT, choices=("auto",) + SNAPSHOT_FORMATS)
+    parser.add_argument("--table", action="append", choices=LEDGER_TABLES,
+                        help="Table to snapshot (repeatable); all ledger tables by default")
+    parser.add_argument("--full", action="store_true", help="Discard the tables' snapshots and copy everything")
+    args = parser.parse_args()
+
+    tables = args.table or LEDGER_TABLES
+    db = Database(args.db)
+    try:
+        snapshot = LedgerSnapshot(args.dir, args.format)
+        if args.full:
+            snapshot.reset(tables)
+        appended = snapshot.update(db, tables)
+        for table in tables:
+            print(f"{table:<18} +{appended[table]:>10,} rows  watermark {snapshot.watermark(table)}  "
+                  f"{len(snapshot.parts(table))} part(s)")
+        print(f"Snapshot ({snapshot.format}) written to {args.dir}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Local stand-in Ethereum JSON-RPC node for tests and benchmarks
+Serves single and batch JSON-RPC 2.0 requests from registered Python handlers
+"""
+
+import json
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+from eth_abi import encode
+
+from event_indexer import EVENT_TOPICS
+
+
+class MockRPCError(Exception):
+    """Raise from a handler to return a JSON-RPC error object"""
+    
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class MockRPCNode:
+    """Threaded HTTP server answering JSON-RPC methods with Python callables
+    
+    Handlers receive the request params list and return the JSON result.
+    `http_requests` and `rpc_calls` count POSTs and individual calls.
+    Setting `fail_next` makes the next N POSTs answer HTTP 503.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.handlers: Dict[str, Callable[[list], Any]] = {}
+        self.http_requests = 0
+        self.rpc_calls = 0
+        self.fail_next = 0
+        self._lock = threading.Lock()
+        node = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with node._lock:
+                    node.http_requests += 1
+                    failing = node.fail_next > 0
+                    if failing:
+                        node.fail_next -= 1
+                if failing:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                payload = json.loads(body)
+                if isinstance(payload, list):
+                    response = [node._dispatch(item) for item in payload]
+                else:
+                    response = node._dispatch(payload)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    def register(self, method: str, handler: Callable[[list], Any]):
+        """Answer `method` with handler(params)"""
+        self.handlers[method] = handler
+    
+    def _dispatch(self, request: dict) -> dict:
+        with self._lock:
+            self.rpc_calls += 1
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        handler = self.handlers.get(request.get("method"))
+        if handler is None:
+            response["error"] = {"code": -32601, "message": "Method not found"}
+            return response
+        try:
+            response["result"] = handler(request.get("params", []))
+        except MockRPCError as e:
+            response["error"] = {"code": e.code, "message": e.message}
+        return response
+    
+    def start(self) -> "MockRPCNode":
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class MockLogChain:
+    """In-memory chain of bond contract logs, served through a MockRPCNode
+    
+    Answers eth_blockNumber, eth_getBlockByNumber and eth_getLogs. Block
+    hashes derive from the block number and how many reorgs touched it, so
+    `reorg(from_block)` changes every hash from there on and drops the logs
+    of those blocks. eth_getLogs fails like real nodes do once a query
+    matches more than `max_logs` logs.
+    """
+    
+    def __init__(self, head: int = 0, max_logs: int = 10000):
+        self.head = head
+        self.max_logs = max_logs
+        self.blocks: Dict[int, List[dict]] = defaultdict(list)
+        self.reorg_points: List[int] = []
+        self._tx_counter = 0
+    
+    def attach(self, node: MockRPCNode) -> "MockLogChain":
+        node.register("eth_blockNumber", lambda params: hex(self.head))
+        node.register("eth_getBlockByNumber", self._get_block)
+        node.register("eth_getLogs", self._get_logs)
+        return self
+    
+    def block_hash(self, number: int) -> str:
+        fork = sum(1 for point in self.reorg_points if number >= point)
+        return f"0x{number:056x}{fork:08x}"
+    
+    def reorg(self, from_block: int):
+        """Replace every block from `from_block` on with empty ones"""
+        self.reorg_points.append(from_block)
+        for number in [n for n in self.blocks if n >= from_block]:
+            del self.blocks[number]
+    
+    def add_log(self, block: int, address: str, topics: List[str], data: bytes = b"",
+                tx_hash: str = None) -> str:
+        if tx_hash is None:
+            self._tx_counter += 1
+            tx_hash = f"0x{self._tx_counter:064x}"
+        self.blocks[block].append({"address": address, "topics": topics, "data": "0x" + data.hex(),
+                                   "transactionHash": tx_hash})
+        self.head = max(self.head, block)
+        return tx_hash
+    
+    def create_bond(self, block: int, platform: str, chain_bond_id: int, token: str,
+                    name: str = "Bond", issuer: str = "Treasury") -> str:
+        return self.add_log(block, platform, [EVENT_TOPICS["BondCreated"], f"0x{chain_bond_id:064x}",
+                                              "0x" + token[2:].lower().rjust(64, "0")],
+                            encode(["string", "string"], [name, issuer]))
+    
+    def token_event(self, block: int, token: str, event: str, investor: str, *amounts: int,
+                    tx_hash: str = None) -> str:
+        """Emit InvestmentMade/InterestPaid/PrincipalRedeemed from a bond token"""
+        return self.add_log(block, token, [EVENT_TOPICS[event], "0x" + investor[2:].lower().rjust(64, "0")],
+                            encode(["uint256"] * len(amounts), list(amounts)), tx_hash)
+    
+    def _get_block(self, params: list) -> Any:
+        number = int(params[0], 16)
+        if number > self.head:
+            return None
+        return {"number": hex(number), "hash": self.block_hash(number),
+                "parentHash": self.block_hash(number - 1) if number else "0x" + "0" * 64}
+    
+    def _get_logs(self, params: list) -> List[dict]:
+        log_filter = params[0]
+        from_block = int(log_filter["fromBlock"], 16)
+        to_block = min(int(log_filter["toBlock"], 16), self.head)
+        addresses = {address.lower() for address in log_filter.get("address", [])}
+        topics = set(log_filter.get("topics", [[]])[0])
+        
+        results = []
+        for number in range(from_block, to_block + 1):
+            for log_index, log in enumerate(self.blocks.get(number, ())):
+                if addresses and log["address"].lower() not in addresses:
+                    continue
+                if topics and log["topics"][0] not in topics:
+                    continue
+                results.append(dict(log, blockNumber=hex(number), blockHash=self.block_hash(number),
+                                    logIndex=hex(log_index)))
+                if len(results) > self.max_logs:
+                    raise MockRPCError(-32005, f"query returned more than {self.max_logs} results")
+        return results
@@ -3,8 +3,68 @@ Data models for the Bond Investment Platform
 Using Pydantic for FastAPI compatibility and data validation
 """
 
-from pydantic import BaseModel
-from typing import List, Optional
+from decimal import Decimal, ROUND_HALF_EVEN
+from pydantic import AfterValidator, BaseModel, PlainSerializer
+from typing import Annotated, Iterable, List, Optional, Union
+
+
+# Money is fixed-point: the database stores amounts as INTEGER minor units,
+# amount * 10**AMOUNT_SCALE, so totals are exact integer sums. Changing the
+# scale needs a schema migration.
+AMOUNT_SCALE = 2
+
+
+def to_minor_units(amount: Union[float, Decimal], scale: int = AMOUNT_SCALE) -> int:
+    """Convert an amount in major units to integer minor units, rounding half to even"""
+    return int(Decimal(str(amount)).scaleb(scale).quantize(Decimal(1), ROUND_HALF_EVEN))
+
+
+def from_minor_units(units: int, scale: int = AMOUNT_SCALE) -> float:
+    """Convert integer minor units back to an amount in major units"""
+    return units / 10 ** scale
+
+
+def sum_amounts(amounts: Iterable[Union[float, Decimal]], scale: int = AMOUNT_SCALE) -> float:
+    """Total major-unit amounts exactly in minor units, converting back only the result"""
+    return from_minor_units(sum(to_minor_units(amount, scale) for amount in amounts), scale)
+
+
+def token_to_minor_units(raw: int, decimals: int, scale: int = AMOUNT_SCALE) -> int:
+    """Convert an integer on-chain amount with `decimals` decimals to minor units, rounding half to even"""
+    if decimals <= scale:
+        return raw * 10 ** (scale - decimals)
+    divisor = 10 ** (decimals - scale)
+    units, remainder = divmod(raw, divisor)
+    if 2 * remainder > divisor or (2 * remainder == divisor and units % 2):
+        units += 1
+    return units
+
+
+def fits_scale(amount: Union[float, Decimal], scale: int) -> bool:
+    """Whether `amount` is a whole number of 10**-scale units, e.g. no fractional yen at scale 0"""
+    return Decimal(str(amount)).scaleb(scale) % 1 == 0
+
+
+def validate_currency_scale(scale: int, *amounts: Union[float, Decimal]):
+    """Raise ValueError for a bond currency scale the ledger cannot hold, or amounts finer than it"""
+    if not 0 <= scale <= AMOUNT_SCALE:
+        raise ValueError(f"currencyScale must be between 0 and {AMOUNT_SCALE}")
+    if not all(fits_scale(amount, scale) for amount in amounts):
+        raise ValueError(f"Amounts for this bond can have at most {scale} decimal places")
+
+
+def _fixed_point(amount: Decimal) -> Decimal:
+    if not amount.is_finite():
+        raise ValueError("Amount must be a finite number")
+    if not fits_scale(amount, AMOUNT_SCALE):
+        raise ValueError(f"Amount can have at most {AMOUNT_SCALE} decimal places")
+    return amount
+
+
+# An amount in major units, held as a Decimal and rejected if finer than
+# AMOUNT_SCALE decimals, so it converts to minor units exactly. Dumps and
+# JSON responses still carry it as a number.
+Amount = Annotated[Decimal, AfterValidator(_fixed_point), PlainSerializer(float, return_type=float)]
 
 
 class Bond(BaseModel):
@@ -12,33 +72,56 @@ class Bond(BaseModel):
     id: int
     name: str
     issuer: str
-    faceValue: float
+    faceValue: Amount
     couponRate: float  # In basis points (e.g., 450 = 4.5%)
     maturityDate: str  # ISO format datetime
     issueDate: str  # ISO format datetime
     description: str
-    minimumInvestment: float
+    minimumInvestment: Amount
     bondTokenAddress: str
+    couponFrequency: int = 2  # Coupon payments per year: 1, 2, 4 or 12
+    dayCount: str = "ACT/ACT"  # ACT/ACT, ACT/365, ACT/360 or 30/360
+    currencyScale: int = AMOUNT_SCALE  # Decimal places of the bond's currency, 0 to AMOUNT_SCALE
 
 
 class Investment(BaseModel):
     """Investment model"""
     bondId: int
     investorAddress: str
-    amount: float
+    amount: Amount
     timestamp: Optional[str] = None
     transactionHash: Optional[str] = None
     user_id: Optional[int] = None
     id: Optional[int] = None
 
 
+class InvestmentBatch(BaseModel):
+    """Many investments recorded in one request"""
+    investments: List[Investment]
+
+
+class Holding(BaseModel):
+    """A user's position in one bond, valued from its coupon schedule"""
+    bondId: int
+    invested: float
+    investmentCount: int
+    accruedInterest: float
+    projectedAnnualIncome: float  # Coupons due over the next 12 months
+    marketValue: float  # Mark-to-model value including accrued interest
+    nextPaymentDate: Optional[str] = None
+
+
 class Portfolio(BaseModel):
     """Portfolio model"""
     address: str
     investments: List[Investment]
     totalInvested: float
     totalValue: float
-    totalYield: float
+    totalYield: float  # Projected annual income as a percentage of total invested
+    accruedInterest: float = 0.0
+    projectedAnnualIncome: float = 0.0
+    holdings: List[Holding] = []
+    valuationDate: Optional[str] = None
 
 
 class YieldCalculation(BaseModel):
@@ -53,6 +136,77 @@ class YieldCalculation(BaseModel):
     investorAccruedInterest: Optional[float] = None
 
 
+class CouponPayment(BaseModel):
+    """One scheduled coupon payment"""
+    date: str  # ISO date
+    amount: float  # Per `investment` of face value
+
+
+class BondSchedule(BaseModel):
+    """Coupon schedule for a bond, scaled to an investment amount"""
+    bondId: int
+    couponFrequency: int
+    dayCount: str
+    investment: float
+    accruedInterest: float
+    nextPaymentDate: Optional[str] = None
+    payments: List[CouponPayment]
+
+
+class BondAnalytics(BaseModel):
+    """Price/yield risk measures for one bond, per 100 of face value"""
+    bondId: int
+    price: float  # Clean price
+    accruedInterest: float
+    dirtyPrice: float
+    yieldToMaturity: Optional[float] = None  # Annual rate in percentage; None once matured
+    macaulayDuration: Optional[float] = None  # Years
+    modifiedDuration: Optional[float] = None
+    convexity: Optional[float] = None
+    dv01: Optional[float] = None  # Price change for a 1bp yield move
+    yearsToMaturity: float
+
+
+class PositionAnalytics(BaseModel):
+    """One bond holding within a portfolio analytics rollup"""
+    bondId: int
+    notional: float  # Invested amount, treated as face value
+    marketValue: float
+    weight: float  # Share of portfolio market value
+    dv01: Optional[float] = None
+    analytics: BondAnalytics
+
+
+class PortfolioAnalytics(BaseModel):
+    """Market-value-weighted risk measures across a user's holdings"""
+    totalInvested: float
+    marketValue: float
+    yieldToMaturity: Optional[float] = None
+    macaulayDuration: Optional[float] = None
+    modifiedDuration: Optional[float] = None
+    convexity: Optional[float] = None
+    dv01: float
+    positions: List[PositionAnalytics]
+
+
+class RiskMeasure(BaseModel):
+    """Tail loss at one confidence level, as a positive amount"""
+    confidence: float
+    valueAtRisk: float
+    expectedShortfall: float
+
+
+class PortfolioRisk(BaseModel):
+    """Simulated horizon P&L distribution for a portfolio"""
+    value: float  # Model value today
+    expectedPnl: float
+    pnlStdDev: float
+    paths: int
+    horizonDays: int
+    seed: int
+    measures: List[RiskMeasure]
+
+
 class User(BaseModel):
     """User model"""
     id: int
@@ -103,13 +257,16 @@ class BondUpdate(BaseModel):
     """Bond update model for admin"""
     name: Optional[str] = None
     issuer: Optional[str] = None
-    faceValue: Optional[float] = None
+    faceValue: Optional[Amount] = None
     couponRate: Optional[float] = None
     maturityDate: Optional[str] = None
     issueDate: Optional[str] = None
     description: Optional[str] = None
-    minimumInvestment: Optional[float] = None
+    minimumInvestment: Optional[Amount] = None
     bondTokenAddress: Optional[str] = None
+    couponFrequency: Optional[int] = None
+    dayCount: Optional[str] = None
+    currencyScale: Optional[int] = None
 
 
 class PaymentAccess(BaseModel):
@@ -132,7 +289,7 @@ class TransactionHistory(BaseModel):
     user_id: int
     type: str  # 'investment', 'withdrawal', 'transfer', 'interest_payment'
     bond_id: Optional[int] = None
-    amount: float
+    amount: Amount
     status: str  # 'pending', 'completed', 'failed'
     timestamp: Optional[str] = None
     transaction_hash: Optional[str] = None
@@ -147,11 +304,11 @@ class TransactionBill(BaseModel):
     username: str
     email: str
     bond_name: Optional[str] = None
-    amount: float
+    amount: Amount
     transaction_type: str
     status: str
     timestamp: Optional[str] = None
-    tax_amount: float = 0.0
-    fee_amount: float = 0.0
-    net_amount: Optional[float] = None
+    tax_amount: Amount = 0.0
+    fee_amount: Amount = 0.0
+    net_amount: Optional[Amount] = None
 
@@ -0,0 +1,44 @@
+"""
+Verify or rebuild the incrementally maintained investment aggregates
+
+Usage:
+    python rebuild_aggregates.py            # report drift only
+    python rebuild_aggregates.py --rebuild  # recompute from the investments table
+"""
+
+import argparse
+import sys
+
+from database import Database, DATABASE_FILE
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verify or rebuild bond investment aggregates")
+    parser.add_argument("--db", default=DATABASE_FILE, help="SQLite database file")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute aggregates after verifying")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        drift = db.verify_aggregates()
+        if drift:
+            print(f"Found {len(drift)} drifted value(s):")
+            for entry in drift:
+                scope = f"bond {entry['bond_id']}" if entry['bond_id'] is not None else "platform"
+                print(f"  {scope:<12} {entry['field']:<18} stored={entry['stored']} actual={entry['actual']}")
+        else:
+            print("Aggregates are consistent with the investments table")
+
+        if args.rebuild:
+            platform = db.rebuild_aggregates()
+            print(f"Rebuilt aggregates: {platform['investment_count']} investments, "
+                  f"{platform['investor_count']} investors, total {platform['total_invested']}")
+            return 0
+
+        return 1 if drift else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Monte Carlo interest-rate risk for the Bond Investment Platform
+Simulates Vasicek short-rate scenarios and reprices scheduled bond cash flows across them
+"""
+
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import repeat
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from coupon_schedule import ScheduleSet
+from config import (
+    RISK_MEAN_REVERSION, RISK_LONG_RATE, RISK_VOLATILITY, RISK_INITIAL_RATE,
+    RISK_SCENARIO_CACHE_SIZE, RISK_WORKERS, RISK_START_METHOD, RISK_PARALLEL_THRESHOLD, RISK_CHUNK_ELEMENTS
+)
+
+
+class VasicekModel(NamedTuple):
+    """dr = a(b - r)dt + sigma dW, with rates as annual decimals"""
+    mean_reversion: float = RISK_MEAN_REVERSION  # a
+    long_rate: float = RISK_LONG_RATE  # b
+    volatility: float = RISK_VOLATILITY  # sigma
+    initial_rate: float = RISK_INITIAL_RATE  # r0
+
+    def simulate(self, horizon: float, paths: int, seed: int) -> np.ndarray:
+        """Short rate at `horizon` years on each path, drawn from the exact transition density"""
+        a, b, sigma, r0 = self
+        decay = np.exp(-a * horizon)
+        mean = r0 * decay + b * (1.0 - decay)
+        std = sigma * np.sqrt((1.0 - decay ** 2) / (2.0 * a))
+        return mean + std * np.random.default_rng(seed).standard_normal(paths)
+
+    def zero_coefficients(self, maturity: np.ndarray):
+        """ln A and B of the zero-coupon price P(r, tau) = A(tau) exp(-B(tau) r)"""
+        a, b, sigma, _ = self
+        B = (1.0 - np.exp(-a * maturity)) / a
+        log_a = (b - sigma ** 2 / (2 * a ** 2)) * (B - maturity) - sigma ** 2 * B ** 2 / (4 * a)
+        return log_a, B
+
+
+def _reprice(log_a: np.ndarray, B: np.ndarray, flows: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """Value per unit face of each bond on each path: sum of flows times A exp(-B r), shape (paths, bonds)"""
+    return np.einsum("pbw,bw->pb", np.exp(log_a[None] - B[None] * rates[:, None, None]), flows)
+
+
+class RiskEngine:
+    """Horizon P&L distributions for bond portfolios under simulated rate scenarios
+
+    Scenario sets (short rates at the horizon) are cached by seed, path count,
+    horizon and model, so repeated requests and different portfolios see the
+    same scenarios. Repricing is chunked over paths to bound memory, and
+    spread over a process pool once a request exceeds `parallel_threshold`
+    path x bond x cash-flow evaluations.
+    """
+
+    def __init__(self, model: VasicekModel = VasicekModel(), workers: int = RISK_WORKERS,
+                 parallel_threshold: int = RISK_PARALLEL_THRESHOLD, chunk_elements: int = RISK_CHUNK_ELEMENTS,
+                 cache_size: int = RISK_SCENARIO_CACHE_SIZE, start_method: str = RISK_START_METHOD):
+        self.model = model
+        self.workers = workers
+        self.start_method = start_method
+        self.parallel_threshold = parallel_threshold
+        self.chunk_elements = chunk_elements
+        self.cache_size = cache_size
+        self._scenarios: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+    def scenarios(self, horizon: float, paths: int, seed: int) -> np.ndarray:
+        """Short rates at the horizon, one per path, cached by (model, horizon, paths, seed)"""
+        key = (self.model, horizon, paths, seed)
+        with self._lock:
+            rates = self._scenarios.get(key)
+            if rates is not None:
+                self._scenarios.move_to_end(key)
+                self.hits += 1
+                return rates
+            self.misses += 1
+        rates = self.model.simulate(horizon, paths, seed)
+        rates.setflags(write=False)
+        with self._lock:
+            self._scenarios[key] = rates
+            while len(self._scenarios) > self.cache_size:
+                self._scenarios.popitem(last=False)
+        return rates
+
+    def bond_pnl(self, schedules: ScheduleSet, valuation_date: date, horizon_days: int,
+                 paths: int, seed: int) -> Dict[str, np.ndarray]:
+        """Per-bond value today and horizon P&L on every path, per unit of face
+
+        Coupons paid before the horizon are counted at face value; flows
+        after it are priced off the simulated short rate with Vasicek's
+        closed-form zero-coupon prices.
+        """
+        horizon = horizon_days / 365.0
+        remaining = schedules.remaining_flows(valuation_date)
+        times, flows = remaining["times"], remaining["flows"]
+
+        log_a, B = self.model.zero_coefficients(times)
+        base_value = (flows * np.exp(log_a - B * self.model.initial_rate)).sum(axis=1)
+
+        after = times > horizon
+        received = np.where(after, 0.0, flows).sum(axis=1)
+        log_a, B = self.model.zero_coefficients(np.where(after, times - horizon, 0.0))
+        future = np.where(after, flows, 0.0)
+
+        rates = self.scenarios(horizon, paths, seed)
+        values = self._reprice_paths(log_a, B, future, rates)
+        return {"bondId": schedules.ids, "value": base_value, "pnl": values + received - base_value}
+
+    def _reprice_paths(self, log_a: np.ndarray, B: np.ndarray, flows: np.ndarray, rates: np.ndarray) -> np.ndarray:
+        per_path = max(flows.size, 1)
+        step = max(self.chunk_elements // per_path, 1)
+        chunks = [rates[start:start + step] for start in range(0, len(rates), step)]
+        if self.workers > 1 and len(chunks) > 1 and per_path * len(rates) >= self.parallel_threshold:
+            pool = self._get_pool()
+            parts = list(pool.map(_reprice, repeat(log_a), repeat(B), repeat(flows), chunks))
+        else:
+            parts = [_reprice(log_a, B, flows, chunk) for chunk in chunks]
+        return np.concatenate(parts) if parts else np.zeros((0, len(flows)))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(self.start_method))
+            return self._pool
+
+    def portfolio_risk(self, schedules: ScheduleSet, notionals: Dict[int, float], valuation_date: date,
+                       horizon_days: int, paths: int, seed: int,
+                       confidence_levels: Sequence[float] = (0.95, 0.99)) -> dict:
+        """VaR and expected shortfall of a portfolio's horizon P&L
+
+        `notionals` maps bond ID to face amount held; bonds missing from
+        `schedules` are ignored. Losses are reported as positive amounts.
+        """
+        held = schedules.take(bond_id for bond_id, amount in notionals.items() if amount)
+        weights = np.array([notionals[bond_id] for bond_id in held.ids.tolist()], dtype=np.float64)
+        per_bond = self.bond_pnl(held, valuation_date, horizon_days, paths, seed)
+        pnl = per_bond["pnl"] @ weights if len(held) else np.zeros(paths)
+
+        return {
+            "value": float(per_bond["value"] @ weights) if len(held) else 0.0,
+            "expectedPnl": float(pnl.mean()),
+            "pnlStdDev": float(pnl.std()),
+            "paths": paths,
+            "horizonDays": horizon_days,
+            "seed": seed,
+            "measures": [self._tail_measures(pnl, level) for level in confidence_levels],
+        }
+
+    @staticmethod
+    def _tail_measures(pnl: np.ndarray, level: float) -> dict:
+        losses = -pnl
+        var = float(np.quantile(losses, level))
+        tail = losses[losses >= var]
+        return {
+            "confidence": level,
+            "valueAtRisk": var,
+            "expectedShortfall": float(tail.mean()) if len(tail) else var,
+        }
+
+    def cache_stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._scenarios), "max_size": self.cache_size,
+                    "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,122 @@
+"""
+Fast JSON encoding for the Bond Investment Platform
+msgspec Struct mirrors of the hot response models, a response class that encodes them directly,
+and NDJSON/CSV chunking for streamed exports
+"""
+
+import csv
+import io
+import sqlite3
+from typing import Any, Iterable, Iterator, List, Optional
+
+import msgspec
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from models import AMOUNT_SCALE, Bond
+
+
+class BondStruct(msgspec.Struct):
+    """Mirror of models.Bond"""
+    id: int
+    name: str
+    issuer: str
+    faceValue: float
+    couponRate: float
+    maturityDate: str
+    issueDate: str
+    description: str
+    minimumInvestment: float
+    bondTokenAddress: str
+    couponFrequency: int = 2
+    dayCount: str = "ACT/ACT"
+    currencyScale: int = AMOUNT_SCALE
+
+
+class InvestmentStruct(msgspec.Struct):
+    """Mirror of models.Investment"""
+    bondId: int
+    investorAddress: str
+    amount: float
+    timestamp: Optional[str] = None
+    transactionHash: Optional[str] = None
+    user_id: Optional[int] = None
+    id: Optional[int] = None
+
+
+class HoldingStruct(msgspec.Struct):
+    """Mirror of models.Holding"""
+    bondId: int
+    invested: float
+    investmentCount: int
+    accruedInterest: float
+    projectedAnnualIncome: float
+    marketValue: float
+    nextPaymentDate: Optional[str] = None
+
+
+class PortfolioStruct(msgspec.Struct):
+    """Mirror of models.Portfolio"""
+    address: str
+    investments: List[InvestmentStruct]
+    totalInvested: float
+    totalValue: float
+    totalYield: float
+    accruedInterest: float = 0.0
+    projectedAnnualIncome: float = 0.0
+    holdings: List[HoldingStruct] = []
+    valuationDate: Optional[str] = None
+
+
+def bond_struct(bond: Bond) -> BondStruct:
+    """Copy a validated Bond into its Struct mirror"""
+    return BondStruct(**bond.model_dump())
+
+
+def _enc_hook(obj: Any) -> Any:
+    """Encode types msgspec does not handle natively"""
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise NotImplementedError(f"Cannot encode objects of type {type(obj).__name__}")
+
+
+def encode(content: Any) -> bytes:
+    """JSON-encode Structs, dicts, lists, sqlite3.Row and Pydantic models"""
+    return msgspec.json.encode(content, enc_hook=_enc_hook)
+
+
+def ndjson_chunks(stream: Iterable) -> Iterator[bytes]:
+    """One NDJSON chunk per row batch from a Database export stream (column names first)"""
+    batches = iter(stream)
+    next(batches, None)
+    encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+    for rows in batches:
+        yield encoder.encode_lines(rows)
+
+
+def csv_chunks(stream: Iterable) -> Iterator[bytes]:
+    """A CSV header chunk, then one chunk per row batch from a Database export stream"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for index, rows in enumerate(stream):
+        if index == 0:
+            writer.writerow(rows)
+        else:
+            writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded by msgspec, skipping FastAPI's jsonable_encoder pass
+
+    Return an instance from an endpoint; content may mix Structs, plain
+    containers, sqlite3.Row results and Pydantic models.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode(content)
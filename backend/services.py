@@ -2,39 +2,227 @@
 Business logic services for the Bond Investment Platform
 """
 
-from typing import List, Optional, Dict
-from datetime import datetime, timedelta
-from models import Bond, Investment, YieldCalculation, User
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from typing import List, Optional, Dict, Tuple
+from datetime import date, datetime, timedelta
+from models import (
+    Bond, Investment, YieldCalculation, User, BondAnalytics, PositionAnalytics, PortfolioAnalytics,
+    PortfolioRisk, fits_scale, sum_amounts, to_minor_units, from_minor_units, validate_currency_scale
+)
 from passlib.context import CryptContext
 from database import get_db
+from yield_engine import BondArrays, calculate_yields, to_records
+from analytics import calculate_analytics, value_holdings
+from coupon_schedule import CouponSchedule, ScheduleSet, validate_coupon_terms
+from risk import RiskEngine
+from write_queue import GroupCommitWriter
+from serialization import BondStruct, HoldingStruct, InvestmentStruct, PortfolioStruct, bond_struct
+from blockchain_utils import InvestorStateReader, InvestorPosition, RPCError
+from config import (
+    BOND_CACHE_CHECK_INTERVAL, AUTH_HASH_WORKERS, AUTH_HASH_MAX_PENDING, STABLECOIN_DECIMALS,
+    ANALYTICS_CACHE_SIZE, PORTFOLIO_CACHE_SIZE, PORTFOLIO_CACHE_TTL, PORTFOLIO_MODEL_YIELD,
+    RISK_DEFAULT_PATHS, RISK_DEFAULT_HORIZON_DAYS, RISK_MAX_PATHS
+)
 
 
 class BondService:
-    """Service for managing bonds"""
+    """Service for managing bonds
     
-    def __init__(self):
+    Bonds live in the `bonds` table. Each worker keeps a read-through copy of
+    the catalog in `self.bonds` and reloads it when the catalog version stamp
+    in the database changes, checking at most once per `check_interval` seconds.
+    """
+    
+    # Bond model field -> bonds table column
+    FIELD_COLUMNS = {
+        "id": "id",
+        "name": "name",
+        "issuer": "issuer",
+        "faceValue": "face_value",
+        "couponRate": "coupon_rate",
+        "maturityDate": "maturity_date",
+        "issueDate": "issue_date",
+        "description": "description",
+        "minimumInvestment": "minimum_investment",
+        "bondTokenAddress": "bond_token_address",
+        "couponFrequency": "coupon_frequency",
+        "dayCount": "day_count",
+        "currencyScale": "currency_scale",
+    }
+    
+    def __init__(self, check_interval: float = BOND_CACHE_CHECK_INTERVAL):
+        self.db = get_db()
+        self.check_interval = check_interval
         self.bonds: Dict[int, Bond] = {}
+        self._arrays: Optional[Tuple[Dict[int, Bond], BondArrays]] = None
+        self._structs: Optional[Tuple[Dict[int, Bond], List[BondStruct]]] = None
+        self._schedules: Optional[Tuple[Dict[int, Bond], ScheduleSet]] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def _bond_from_row(self, row: dict) -> Bond:
+        return Bond(**{field: row[column] for field, column in self.FIELD_COLUMNS.items()})
+    
+    def _row_from_bond(self, bond: Bond) -> dict:
+        data = bond.model_dump()
+        return {column: data[field] for field, column in self.FIELD_COLUMNS.items()}
+    
+    def _refresh(self, force: bool = False):
+        """Reload the cached catalog if another writer changed it"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            version = self.db.get_bond_catalog_version()
+            if force or version != self._version:
+                # Swap in a new dict so readers never see a half-built catalog
+                self.bonds = {
+                    row['id']: self._bond_from_row(row) for row in self.db.get_all_bonds()
+                }
+                self._version = version
+            self._checked_at = time.monotonic()
+    
+    def seed_bonds(self, bonds: List[Bond]):
+        """Add bonds that are not in the catalog yet, leaving existing ones untouched"""
+        for bond in bonds:
+            self.db.save_bond(self._row_from_bond(bond), overwrite=False)
+        self._refresh(force=True)
     
     def add_bond(self, bond: Bond):
-        """Add a bond to the service"""
-        self.bonds[bond.id] = bond
+        """Add a bond to the catalog, replacing any bond with the same ID"""
+        validate_coupon_terms(bond.couponFrequency, bond.dayCount)
+        validate_currency_scale(bond.currencyScale, bond.faceValue, bond.minimumInvestment)
+        self.db.save_bond(self._row_from_bond(bond))
+        self._refresh(force=True)
+    
+    def update_bond(self, bond_id: int, updates: dict) -> Optional[Bond]:
+        """Update bond fields; returns the updated bond or None if it does not exist"""
+        fields = {
+            self.FIELD_COLUMNS[field]: value
+            for field, value in updates.items()
+            if field != "id" and value is not None
+        }
+        if "coupon_frequency" in fields or "day_count" in fields:
+            current = self.get_bond(bond_id)
+            if current:
+                validate_coupon_terms(fields.get("coupon_frequency", current.couponFrequency),
+                                      fields.get("day_count", current.dayCount))
+        if {"currency_scale", "face_value", "minimum_investment"} & set(fields):
+            current = self.get_bond(bond_id)
+            if current:
+                validate_currency_scale(fields.get("currency_scale", current.currencyScale),
+                                        fields.get("face_value", current.faceValue),
+                                        fields.get("minimum_investment", current.minimumInvestment))
+        row = self.db.update_bond(bond_id, **fields)
+        self._refresh(force=True)
+        return self._bond_from_row(row) if row else None
+    
+    def delete_bond(self, bond_id: int) -> bool:
+        """Delete a bond; returns False if it does not exist"""
+        deleted = self.db.delete_bond(bond_id)
+        self._refresh(force=True)
+        return deleted
     
     def get_bond(self, bond_id: int) -> Optional[Bond]:
         """Get a bond by ID"""
+        self._refresh()
         return self.bonds.get(bond_id)
     
     def get_all_bonds(self) -> List[Bond]:
         """Get all bonds"""
+        self._refresh()
         return list(self.bonds.values())
+    
+    def get_bond_map(self) -> Dict[int, Bond]:
+        """Get the cached catalog keyed by bond ID; treat it as read-only"""
+        self._refresh()
+        return self.bonds
+    
+    def get_bond_arrays(self) -> BondArrays:
+        """Get the catalog as columnar arrays, rebuilt only when the catalog reloads"""
+        self._refresh()
+        bonds = self.bonds
+        cached = self._arrays
+        if cached is None or cached[0] is not bonds:
+            cached = self._arrays = (bonds, BondArrays.from_bonds(bonds.values()))
+        return cached[1]
+    
+    def get_bond_structs(self) -> List[BondStruct]:
+        """Get all bonds as msgspec Structs for fast encoding, rebuilt only when the catalog reloads"""
+        self._refresh()
+        bonds = self.bonds
+        cached = self._structs
+        if cached is None or cached[0] is not bonds:
+            cached = self._structs = (bonds, [bond_struct(bond) for bond in bonds.values()])
+        return cached[1]
+    
+    def get_coupon_schedules(self) -> ScheduleSet:
+        """Get coupon schedules in catalog order, aligned with get_bond_arrays()
+        
+        Schedules are stored with the catalog and only built for bonds whose
+        stored schedule is missing (new or updated bonds) or stale.
+        """
+        self._refresh()
+        bonds = self.bonds
+        cached = self._schedules
+        if cached is None or cached[0] is not bonds:
+            stored = self.db.get_coupon_schedules()
+            schedules, built = [], []
+            for bond in bonds.values():
+                row = stored.get(bond.id)
+                schedule = CouponSchedule.from_row(row) if row else None
+                if schedule is None or not schedule.matches(bond):
+                    schedule = CouponSchedule.build(bond)
+                    built.append(schedule.to_row())
+                schedules.append(schedule)
+            self.db.save_coupon_schedules(built)
+            cached = self._schedules = (bonds, ScheduleSet(schedules))
+        return cached[1]
+    
+    def get_coupon_schedule(self, bond_id: int) -> Optional[CouponSchedule]:
+        """Get one bond's coupon schedule"""
+        return self.get_coupon_schedules().get(bond_id)
+    
+    def search_bonds(self, issuer: Optional[str] = None,
+                     min_coupon_rate: Optional[float] = None, max_coupon_rate: Optional[float] = None,
+                     matures_after: Optional[str] = None, matures_before: Optional[str] = None) -> List[Bond]:
+        """Get bonds matching issuer, coupon rate (basis points) and maturity filters"""
+        rows = self.db.search_bonds(
+            issuer=issuer, min_coupon_rate=min_coupon_rate, max_coupon_rate=max_coupon_rate,
+            matures_after=matures_after, matures_before=matures_before
+        )
+        return [self._bond_from_row(row) for row in rows]
 
 
 class InvestmentService:
     """Service for managing investments"""
     
-    def __init__(self):
+    def __init__(self, write_queue: Optional[GroupCommitWriter] = None):
         # Use persistent database for investments when available
         self.db = get_db()
+        # Single investments go through the group-commit writer when one is given
+        self.write_queue = write_queue
         self.investments: List[Investment] = []
+        self._change_listeners = []
+    
+    def add_change_listener(self, listener):
+        """Register a callable invoked with a user ID whenever that user's investments change"""
+        self._change_listeners.append(listener)
+    
+    def _notify_change(self, user_id: int):
+        for listener in self._change_listeners:
+            listener(user_id)
     
     def record_investment(self, investment: Investment, user_id: Optional[int] = None) -> dict:
         """Record an investment. Persist to DB when possible.
@@ -47,8 +235,8 @@ class InvestmentService:
             investment.timestamp = datetime.now().isoformat()
 
         if user_id is not None and self.db:
-            # Persist to DB
-            record = self.db.record_investment(
+            # Persist to DB; through the write queue this blocks until the shared commit
+            fields = dict(
                 user_id=user_id,
                 bond_id=investment.bondId,
                 investor_address=investment.investorAddress,
@@ -56,12 +244,64 @@ class InvestmentService:
                 timestamp=investment.timestamp,
                 transaction_hash=investment.transactionHash
             )
+            if self.write_queue is not None:
+                record = self.write_queue.submit(self.db.record_investment, **fields).result()
+            else:
+                record = self.db.record_investment(**fields)
+            self._notify_change(user_id)
             return record
 
         # Fallback: in-memory
         self.investments.append(investment)
         return investment.model_dump()
     
+    def record_investments(self, investments: List[Investment], user_id: int,
+                           bonds: Dict[int, Bond]) -> List[dict]:
+        """Validate and record a batch of investments for one user
+        
+        Rows are checked against `bonds` (the cached catalog) and the valid
+        ones are written together, each with a transaction and bill, in one
+        database transaction. Returns one result per input row, in order,
+        with status "recorded" and the stored record or "rejected" and an error.
+        """
+        now = datetime.now().isoformat()
+        results: List[Optional[dict]] = []
+        accepted = []
+        for index, investment in enumerate(investments):
+            bond = bonds.get(investment.bondId)
+            if bond is None:
+                results.append({"index": index, "status": "rejected", "error": "Bond not found"})
+            elif investment.amount < bond.minimumInvestment:
+                results.append({"index": index, "status": "rejected",
+                                "error": f"Investment amount must be at least ${bond.minimumInvestment}"})
+            elif not fits_scale(investment.amount, bond.currencyScale):
+                results.append({"index": index, "status": "rejected",
+                                "error": f"Investment amount can have at most {bond.currencyScale} decimal places"})
+            else:
+                results.append(None)
+                accepted.append((index, investment, bond))
+        
+        if self.db:
+            records = self.db.record_investments(user_id, [
+                {
+                    "bond_id": investment.bondId,
+                    "bond_name": bond.name,
+                    "investor_address": investment.investorAddress,
+                    "amount": investment.amount,
+                    "timestamp": investment.timestamp or now,
+                    "transaction_hash": investment.transactionHash,
+                }
+                for _, investment, bond in accepted
+            ])
+        else:
+            records = [self.record_investment(investment) for _, investment, _ in accepted]
+        
+        for (index, _, _), record in zip(accepted, records):
+            results[index] = {"index": index, "status": "recorded", "investment": record}
+        if records and self.db:
+            self._notify_change(user_id)
+        return results
+    
     def get_user_investments(self, address: str) -> List[Investment]:
         """Get all investments for a user address (by wallet address)."""
         results: List[Investment] = []
@@ -118,6 +358,83 @@ class InvestmentService:
 
         return [inv for inv in self.investments if inv.bondId == bond_id]
     
+    def get_bond_investments_page(self, bond_id: int, limit: int = 100, cursor: Optional[str] = None,
+                                  created_after: Optional[str] = None,
+                                  created_before: Optional[str] = None) -> Tuple[List[Investment], Optional[str]]:
+        """Get one page of investments for a bond, newest first, and the next cursor"""
+        if self.db:
+            rows, next_cursor = self.db.get_investments_page(
+                limit=limit, cursor=cursor, bond_id=bond_id,
+                created_after=created_after, created_before=created_before
+            )
+            results = [
+                Investment(
+                    bondId=r['bond_id'],
+                    investorAddress=r['investor_address'],
+                    amount=r['amount'],
+                    timestamp=r['timestamp'],
+                    transactionHash=r.get('transaction_hash')
+                )
+                for r in rows
+            ]
+            return results, next_cursor
+        
+        return [inv for inv in self.investments if inv.bondId == bond_id][:limit], None
+    
+    @staticmethod
+    def _summarize(investments: List[Investment]) -> dict:
+        return {
+            "total_invested": sum_amounts(inv.amount for inv in investments),
+            "investment_count": len(investments),
+            "investor_count": len(set(inv.investorAddress for inv in investments))
+        }
+    
+    def get_user_holdings(self, user_id: int) -> List[dict]:
+        """Get a user's total invested and investment count per bond, ordered by bond ID"""
+        if self.db:
+            return self.db.get_user_holdings(user_id)
+        
+        holdings: Dict[int, dict] = {}
+        for inv in self.investments:
+            if inv.user_id == user_id:
+                holding = holdings.setdefault(inv.bondId, {"bond_id": inv.bondId, "invested": 0, "investment_count": 0})
+                holding["invested"] += to_minor_units(inv.amount)
+                holding["investment_count"] += 1
+        for holding in holdings.values():
+            holding["invested"] = from_minor_units(holding["invested"])
+        return [holdings[bond_id] for bond_id in sorted(holdings)]
+    
+    def get_bond_totals(self, bond_id: int, created_after: Optional[str] = None,
+                        created_before: Optional[str] = None) -> dict:
+        """Get total invested, investment count and investor count for a bond.
+        
+        Unfiltered totals come from the maintained aggregate; a created_at range
+        is summed over the matching investments instead.
+        """
+        if self.db:
+            if created_after or created_before:
+                return self.db.get_investment_totals(
+                    bond_id=bond_id, created_after=created_after, created_before=created_before
+                )
+            return self.db.get_bond_aggregate(bond_id)
+        
+        return self._summarize([inv for inv in self.investments if inv.bondId == bond_id])
+    
+    def get_all_bond_totals(self) -> Dict[int, dict]:
+        """Get totals for every bond with investments, keyed by bond ID."""
+        if self.db:
+            return self.db.get_all_bond_aggregates()
+        
+        bond_ids = set(inv.bondId for inv in self.investments)
+        return {bond_id: self.get_bond_totals(bond_id) for bond_id in bond_ids}
+    
+    def get_platform_totals(self) -> dict:
+        """Get platform-wide total invested, investment count and investor count."""
+        if self.db:
+            return self.db.get_platform_aggregate()
+        
+        return self._summarize(self.investments)
+    
     def get_all_investments(self) -> List[Investment]:
         """Get all investments (persisted when DB available)."""
         results: List[Investment] = []
@@ -140,10 +457,66 @@ class InvestmentService:
 
 
 class YieldCalculator:
-    """Service for calculating bond yields"""
+    """Service for calculating bond yields
+    
+    With an InvestorStateReader, investor yield and accrued interest come
+    from the bond token's on-chain state; without one (or when the read
+    fails) they fall back to the bond-level figures. Given coupon schedules,
+    accrued interest is the interest accrued since the last coupon payment.
+    """
+    
+    def __init__(self, reader: Optional[InvestorStateReader] = None, decimals: int = STABLECOIN_DECIMALS):
+        self.reader = reader
+        self.unit = 10 ** decimals
     
-    def calculate_yield(self, bond: Bond, investor_address: Optional[str] = None) -> YieldCalculation:
+    def calculate_yield(self, bond: Bond, investor_address: Optional[str] = None,
+                        schedule: Optional[CouponSchedule] = None) -> YieldCalculation:
         """Calculate yield for a bond"""
+        result = self._bond_yield(bond, schedule)
+        
+        # If investor address provided, calculate investor-specific yield
+        if investor_address:
+            position = None
+            if self.reader:
+                pair = (bond.bondTokenAddress, investor_address)
+                position = self._read_positions([pair]).get(pair)
+            self._apply_investor_position(result, bond, position)
+        
+        return result
+    
+    def calculate_yields(self, arrays: BondArrays, schedules: Optional[ScheduleSet] = None) -> List[dict]:
+        """Bond-level yields for many bonds in one vectorized pass, as YieldCalculation dicts
+        
+        `schedules` must list the same bonds in the same order as `arrays`.
+        """
+        now = datetime.now()
+        accrued = schedules.accrued(now) if schedules is not None else None
+        records = to_records(calculate_yields(arrays, now, accrued))
+        for record in records:
+            record["investorYield"] = None
+            record["investorAccruedInterest"] = None
+        return records
+    
+    def calculate_investor_yields(self, bonds: List[Bond], investor_address: str,
+                                  schedules: Optional[ScheduleSet] = None) -> List[YieldCalculation]:
+        """Calculate investor-specific yields for many bonds with one batched chain read"""
+        pairs = [(bond.bondTokenAddress, investor_address) for bond in bonds]
+        positions = self._read_positions(pairs) if self.reader else {}
+        results = []
+        for bond, pair in zip(bonds, pairs):
+            result = self._bond_yield(bond, schedules.get(bond.id) if schedules is not None else None)
+            self._apply_investor_position(result, bond, positions.get(pair))
+            results.append(result)
+        return results
+    
+    def _read_positions(self, pairs: List[Tuple[str, str]]) -> dict:
+        try:
+            return self.reader.read_positions(pairs)[1]
+        except (RPCError, requests.RequestException, ValueError):
+            # Chain unavailable: callers fall back to bond-level figures
+            return {}
+    
+    def _bond_yield(self, bond: Bond, schedule: Optional[CouponSchedule] = None) -> YieldCalculation:
         # Parse dates
         maturity_date = datetime.fromisoformat(bond.maturityDate.replace('Z', '+00:00'))
         issue_date = datetime.fromisoformat(bond.issueDate.replace('Z', '+00:00'))
@@ -158,14 +531,18 @@ class YieldCalculator:
         example_investment = 1000.0
         annual_interest = (example_investment * bond.couponRate) / 10000
         
-        # Calculate accrued interest (simplified - assumes daily accrual)
-        days_since_issue = (datetime.now() - issue_date).days
-        accrued_interest = (annual_interest * days_since_issue) / 365
+        if schedule is not None:
+            # Interest accrued since the last scheduled coupon
+            accrued_interest = example_investment * schedule.accrued()
+        else:
+            # Calculate accrued interest (simplified - assumes daily accrual)
+            days_since_issue = (datetime.now() - issue_date).days
+            accrued_interest = (annual_interest * days_since_issue) / 365
         
         # Current yield equals coupon rate for bonds at par
         current_yield = coupon_rate_pct
         
-        result = YieldCalculation(
+        return YieldCalculation(
             bondId=bond.id,
             couponRate=coupon_rate_pct,
             currentYield=current_yield,
@@ -173,29 +550,327 @@ class YieldCalculator:
             accruedInterest=accrued_interest,
             daysToMaturity=days_to_maturity
         )
+    
+    def _apply_investor_position(self, result: YieldCalculation, bond: Bond,
+                                 position: Optional[InvestorPosition]):
+        if position is None or position.invested == 0:
+            # No on-chain position available: use the bond-level figures
+            result.investorYield = result.couponRate
+            result.investorAccruedInterest = result.accruedInterest
+            return
         
-        # If investor address provided, calculate investor-specific yield
-        if investor_address:
-            # In production, this would query the blockchain for actual token balance
-            # For now, we'll use a simplified calculation
-            investor_yield = coupon_rate_pct
-            investor_accrued = accrued_interest
-            
-            result.investorYield = investor_yield
-            result.investorAccruedInterest = investor_accrued
+        # Interest earned to date (claimed + accrued) on principal, annualized over the time since issue
+        issue_date = datetime.fromisoformat(bond.issueDate.replace('Z', '+00:00'))
+        days_held = max((datetime.now() - issue_date).days, 1)
+        earned = position.claimed_interest + position.accrued_interest
+        result.investorYield = earned / position.invested * 100 * 365 / days_held
+        result.investorAccruedInterest = position.accrued_interest / self.unit
+
+
+class BondAnalyticsService:
+    """Memoized YTM, duration, convexity and DV01 over the bond catalog
+    
+    Results are cached per (bond terms, clean price, valuation date) in an
+    LRU of `cache_size` entries; only misses go through the vectorized solver.
+    """
+    
+    PAR = 100.0
+    
+    def __init__(self, cache_size: int = ANALYTICS_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, BondAnalytics]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def analyze(self, schedules: ScheduleSet, prices: Optional[List[float]] = None,
+                valuation_date: Optional[date] = None) -> List[BondAnalytics]:
+        """Analytics for every bond in `schedules` at its clean price (par by default)"""
+        valuation_date = valuation_date or date.today()
+        if prices is None:
+            prices = [self.PAR] * len(schedules)
+        elif len(prices) != len(schedules):
+            raise ValueError("prices must match the number of bonds")
         
-        return result
+        keys = [
+            (schedule.key, float(price), valuation_date)
+            for schedule, price in zip(schedules.schedules, prices)
+        ]
+        results: List[Optional[BondAnalytics]] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for index, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.append(index)
+                else:
+                    self._cache.move_to_end(key)
+                    results[index] = cached
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        
+        if missing:
+            subset = ScheduleSet(schedules.schedules[i] for i in missing)
+            columns = calculate_analytics(subset, np.array([prices[i] for i in missing], dtype=np.float64),
+                                          valuation_date)
+            computed = [
+                BondAnalytics(**{name: None if isinstance(value, float) and math.isnan(value) else value
+                                 for name, value in record.items()})
+                for record in to_records(columns)
+            ]
+            with self._lock:
+                for index, analytics in zip(missing, computed):
+                    results[index] = analytics
+                    self._cache[keys[index]] = analytics
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+    
+    def analyze_portfolio(self, schedules: ScheduleSet, holdings: List[dict],
+                          valuation_date: Optional[date] = None) -> PortfolioAnalytics:
+        """Roll holdings up into market-value-weighted portfolio measures, valuing bonds at par
+        
+        `holdings` are per-bond totals as returned by InvestmentService.get_user_holdings.
+        """
+        notionals = {holding["bond_id"]: holding["invested"] for holding in holdings}
+        
+        held = schedules.take(notionals)
+        analytics = self.analyze(held, valuation_date=valuation_date)
+        market_values = [notionals[a.bondId] * a.dirtyPrice / self.PAR for a in analytics]
+        market_value = sum(market_values)
+        
+        positions = []
+        for item, value in zip(analytics, market_values):
+            notional = notionals[item.bondId]
+            positions.append(PositionAnalytics(
+                bondId=item.bondId,
+                notional=notional,
+                marketValue=value,
+                weight=value / market_value if market_value else 0.0,
+                dv01=item.dv01 * notional / self.PAR if item.dv01 is not None else None,
+                analytics=item
+            ))
+        
+        def weighted(field: str) -> Optional[float]:
+            pairs = [(getattr(p.analytics, field), p.marketValue) for p in positions
+                     if getattr(p.analytics, field) is not None]
+            total = sum(value for _, value in pairs)
+            return sum(measure * value for measure, value in pairs) / total if total else None
+        
+        return PortfolioAnalytics(
+            totalInvested=sum_amounts(notionals.values()),
+            marketValue=market_value,
+            yieldToMaturity=weighted("yieldToMaturity"),
+            macaulayDuration=weighted("macaulayDuration"),
+            modifiedDuration=weighted("modifiedDuration"),
+            convexity=weighted("convexity"),
+            dv01=sum(p.dv01 for p in positions if p.dv01 is not None),
+            positions=positions
+        )
+    
+    def cache_stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._cache), "max_size": self.cache_size,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class PortfolioValuationService:
+    """Values a user's holdings from the coupon schedules, cached per user
+    
+    Holdings come from one per-bond aggregate query and are valued in a
+    single vectorized pass. Entries are dropped when the user records an
+    investment, when the bond catalog changes or after `ttl` seconds.
+    """
+    
+    def __init__(self, investment_service: InvestmentService, bond_service: BondService,
+                 cache_size: int = PORTFOLIO_CACHE_SIZE, ttl: float = PORTFOLIO_CACHE_TTL,
+                 model_yield: Optional[float] = PORTFOLIO_MODEL_YIELD):
+        self.investment_service = investment_service
+        self.bond_service = bond_service
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.model_yield = model_yield
+        # user_id -> (expires_at, schedules, valuation date, PortfolioStruct)
+        self._cache: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        investment_service.add_change_listener(self.invalidate)
+    
+    def invalidate(self, user_id: int):
+        """Forget a user's cached valuation"""
+        with self._lock:
+            self._cache.pop(user_id, None)
+    
+    def get_portfolio(self, user_id: int, address: str) -> PortfolioStruct:
+        """Get the user's valued portfolio as a PortfolioStruct, ready for FastJSONResponse"""
+        schedules = self.bond_service.get_coupon_schedules()
+        today = date.today()
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry and entry[0] > time.monotonic() and entry[1] is schedules and entry[2] == today:
+                self._cache.move_to_end(user_id)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+        
+        portfolio = self._value(user_id, address, schedules, today)
+        with self._lock:
+            self._cache[user_id] = (time.monotonic() + self.ttl, schedules, today, portfolio)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return portfolio
+    
+    def _value(self, user_id: int, address: str, schedules: ScheduleSet, today: date) -> PortfolioStruct:
+        holdings = self.investment_service.get_user_holdings(user_id)
+        held = schedules.take(holding["bond_id"] for holding in holdings)
+        invested = {holding["bond_id"]: holding["invested"] for holding in holdings}
+        notional = np.array([invested[bond_id] for bond_id in held.ids.tolist()], dtype=np.float64)
+        valued = {
+            record["bondId"]: record
+            for record in to_records(value_holdings(held, notional, today, self.model_yield))
+        }
+        
+        results = []
+        for holding in holdings:
+            # Bonds removed from the catalog are carried at cost
+            record = valued.get(holding["bond_id"], {})
+            next_payment = record.get("nextPaymentDate")
+            results.append(HoldingStruct(
+                bondId=holding["bond_id"],
+                invested=holding["invested"],
+                investmentCount=holding["investment_count"],
+                accruedInterest=record.get("accruedInterest", 0.0),
+                projectedAnnualIncome=record.get("projectedAnnualIncome", 0.0),
+                marketValue=record.get("marketValue", holding["invested"]),
+                nextPaymentDate=next_payment.isoformat() if next_payment else None,
+            ))
+        
+        total_invested = sum_amounts(invested.values())
+        income = sum(holding.projectedAnnualIncome for holding in results)
+        return PortfolioStruct(
+            address=address,
+            investments=self._investment_records(user_id),
+            totalInvested=total_invested,
+            totalValue=sum(holding.marketValue for holding in results),
+            totalYield=income / total_invested * 100 if total_invested else 0.0,
+            accruedInterest=sum(holding.accruedInterest for holding in results),
+            projectedAnnualIncome=income,
+            holdings=results,
+            valuationDate=today.isoformat(),
+        )
+    
+    def _investment_records(self, user_id: int) -> List[InvestmentStruct]:
+        """The user's investments as InvestmentStruct mirrors, without per-row model validation"""
+        if not self.investment_service.db:
+            return [InvestmentStruct(**inv.model_dump()) for inv in self.investment_service.investments if inv.user_id == user_id]
+        return [
+            InvestmentStruct(row["bond_id"], row["investor_address"], row["amount"], row["timestamp"],
+                             row["transaction_hash"], row["user_id"], row["id"])
+            for row in self.investment_service.db.get_investments_by_user_id(user_id)
+        ]
+    
+    def cache_stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._cache), "max_size": self.cache_size,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class PortfolioRiskService:
+    """Monte Carlo VaR and expected shortfall for user and platform portfolios"""
+    
+    def __init__(self, engine: RiskEngine, investment_service: InvestmentService, bond_service: BondService,
+                 max_paths: int = RISK_MAX_PATHS):
+        self.engine = engine
+        self.investment_service = investment_service
+        self.bond_service = bond_service
+        self.max_paths = max_paths
+    
+    def user_risk(self, user_id: int, paths: int = RISK_DEFAULT_PATHS,
+                  horizon_days: int = RISK_DEFAULT_HORIZON_DAYS, seed: int = 0) -> PortfolioRisk:
+        """Risk of one user's holdings, each bond held at its invested amount"""
+        notionals = {h["bond_id"]: h["invested"] for h in self.investment_service.get_user_holdings(user_id)}
+        return self._risk(notionals, paths, horizon_days, seed)
+    
+    def platform_risk(self, paths: int = RISK_DEFAULT_PATHS,
+                      horizon_days: int = RISK_DEFAULT_HORIZON_DAYS, seed: int = 0) -> PortfolioRisk:
+        """Risk of everything invested through the platform"""
+        notionals = {
+            bond_id: totals["total_invested"]
+            for bond_id, totals in self.investment_service.get_all_bond_totals().items()
+        }
+        return self._risk(notionals, paths, horizon_days, seed)
+    
+    def _risk(self, notionals: Dict[int, float], paths: int, horizon_days: int, seed: int) -> PortfolioRisk:
+        if not 1 <= paths <= self.max_paths:
+            raise ValueError(f"paths must be between 1 and {self.max_paths}")
+        if horizon_days < 1:
+            raise ValueError("horizon_days must be positive")
+        report = self.engine.portfolio_risk(self.bond_service.get_coupon_schedules(), notionals,
+                                            date.today(), horizon_days, paths, seed)
+        return PortfolioRisk(**report)
+
+
+class AuthBusyError(Exception):
+    """Raised when the password hashing pool already has its maximum of pending work"""
 
 
 class UserService:
-    """Service for managing users and authentication"""
+    """Service for managing users and authentication
+    
+    bcrypt is CPU-bound, so the async methods run it on a bounded worker pool
+    and reject new work once `max_pending` hashes are queued or running.
+    """
     
     # Bcrypt has a 72-byte password limit
     MAX_PASSWORD_BYTES = 72
     
-    def __init__(self):
+    def __init__(self, hash_workers: int = AUTH_HASH_WORKERS, max_pending: int = AUTH_HASH_MAX_PENDING):
         self.db = get_db()
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.hash_workers = hash_workers
+        self.max_pending = max_pending
+        self._hash_executor = ThreadPoolExecutor(max_workers=hash_workers, thread_name_prefix="bcrypt")
+        self._hash_lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._completed = 0
+        self._change_listeners = []
+    
+    async def _run_hash(self, func, *args):
+        """Run a hashing function on the worker pool, failing fast when saturated"""
+        with self._hash_lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise AuthBusyError("Authentication service is busy, please retry")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._hash_executor, func, *args)
+        finally:
+            with self._hash_lock:
+                self._pending -= 1
+                self._completed += 1
+    
+    def add_change_listener(self, listener):
+        """Register a callable invoked with a user ID whenever that user changes"""
+        self._change_listeners.append(listener)
+    
+    def _notify_change(self, user_id: int):
+        for listener in self._change_listeners:
+            listener(user_id)
+    
+    def hash_pool_stats(self) -> dict:
+        """Get password hashing pool metrics"""
+        with self._hash_lock:
+            return {
+                "workers": self.hash_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected
+            }
     
     def _truncate_password(self, password: str) -> str:
         """Truncate password to 72 bytes (bcrypt limit)"""
@@ -215,8 +890,15 @@ class UserService:
         truncated = self._truncate_password(plain_password)
         return self.pwd_context.verify(truncated, hashed_password)
     
-    def create_user(self, email: str, username: str, password: str) -> User:
-        """Create a new user"""
+    async def hash_password_async(self, password: str) -> str:
+        """Hash a password on the worker pool"""
+        return await self._run_hash(self.hash_password, password)
+    
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the worker pool"""
+        return await self._run_hash(self.verify_password, plain_password, hashed_password)
+    
+    def _check_new_user(self, email: str, username: str):
         # Check if email already exists
         if self.db.get_user_by_email(email):
             raise ValueError("Email already registered")
@@ -224,12 +906,11 @@ class UserService:
         # Check if username already exists
         if self.db.get_user_by_username(username):
             raise ValueError("Username already taken")
-        
-        # Hash password (automatically truncated to 72 bytes)
-        hashed_password = self.hash_password(password)
-        
+    
+    def _store_user(self, email: str, username: str, hashed_password: str) -> User:
         # Create user in database
         user_data = self.db.create_user(email, username, hashed_password)
+        self._notify_change(user_data["id"])
         
         return User(
             id=user_data["id"],
@@ -239,6 +920,20 @@ class UserService:
             created_at=user_data["created_at"]
         )
     
+    def create_user(self, email: str, username: str, password: str) -> User:
+        """Create a new user"""
+        self._check_new_user(email, username)
+        
+        # Hash password (automatically truncated to 72 bytes)
+        hashed_password = self.hash_password(password)
+        return self._store_user(email, username, hashed_password)
+    
+    async def create_user_async(self, email: str, username: str, password: str) -> User:
+        """Create a new user, hashing the password on the worker pool"""
+        self._check_new_user(email, username)
+        hashed_password = await self.hash_password_async(password)
+        return self._store_user(email, username, hashed_password)
+    
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         user_data = self.db.get_user_by_email(email)
@@ -277,6 +972,17 @@ class UserService:
             return None
         
         return user
+    
+    async def authenticate_user_async(self, email: str, password: str) -> Optional[User]:
+        """Authenticate a user, verifying the password on the worker pool"""
+        user = self.get_user_by_email(email)
+        if not user:
+            return None
+        
+        if not await self.verify_password_async(password, user.hashed_password):
+            return None
+        
+        return user
 
 
 
@@ -0,0 +1,90 @@
+"""
+Bond analytics test for Bond Investment Platform
+Tests YTM, duration, convexity and DV01 against closed-form identities
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from analytics import calculate_analytics, price_from_yield
+from bond_fixtures import make_bond
+from coupon_schedule import CouponSchedule, ScheduleSet
+from services import BondAnalyticsService
+
+print("=" * 80)
+print("BOND ANALYTICS TEST")
+print("=" * 80)
+
+VALUATION = date(2026, 1, 1)
+rng = random.Random(11)
+
+
+def schedules_for(bonds) -> ScheduleSet:
+    return ScheduleSet(CouponSchedule.build(bond) for bond in bonds)
+
+
+# Test 1: A bond priced at par yields its coupon on a coupon date
+print("\n[TEST 1] Par bonds...")
+par_bonds = schedules_for([make_bond(0, 500, datetime(2036, 1, 1)),
+                           make_bond(1, 300, datetime(2028, 1, 1), frequency=4)])
+columns = calculate_analytics(par_bonds, np.full(2, 100.0), VALUATION)
+assert np.allclose(columns["accruedInterest"], 0.0)
+assert np.allclose(columns["yieldToMaturity"], [5.0, 3.0], atol=1e-8)
+assert np.all(columns["macaulayDuration"] < [10.0, 2.0])
+assert np.allclose(columns["dv01"], columns["modifiedDuration"] * 100 * 1e-4)
+print(f"✓ YTM equals coupon at par: {columns['yieldToMaturity'].round(6).tolist()}")
+
+# A zero-coupon bond's Macaulay duration is its maturity
+zero = calculate_analytics(schedules_for([make_bond(2, 0, datetime(2031, 1, 1))]), np.array([80.0]), VALUATION)
+assert abs(zero["macaulayDuration"][0] - 5.0) < 1e-9
+print("✓ Zero-coupon duration equals maturity")
+
+# Test 2: Solving for yield inverts pricing, including off-market prices the bisection handles
+print("\n[TEST 2] Price/yield round trip...")
+bonds = [make_bond(i, rng.randint(0, 1500), datetime(2026, 1, 1) + timedelta(days=rng.randint(180, 10000)),
+                   rng.choice([1, 2, 4, 12]), rng.choice(["ACT/ACT", "ACT/365", "ACT/360", "30/360"]))
+         for i in range(500)]
+arrays = schedules_for(bonds)
+prices = np.array([rng.uniform(60.0, 160.0) for _ in bonds])
+columns = calculate_analytics(arrays, prices, VALUATION)
+assert np.all(np.isfinite(columns["yieldToMaturity"]))
+repriced = price_from_yield(arrays, columns["yieldToMaturity"], VALUATION)
+assert np.allclose(repriced, prices, rtol=1e-7), np.abs(repriced - prices).max()
+print(f"✓ {len(bonds)} bonds reprice within tolerance")
+
+# Duration and convexity match central differences of the price/yield curve
+up = price_from_yield(arrays, columns["yieldToMaturity"] + 0.01, VALUATION) + columns["accruedInterest"]
+down = price_from_yield(arrays, columns["yieldToMaturity"] - 0.01, VALUATION) + columns["accruedInterest"]
+assert np.allclose((down - up) / 2, columns["dv01"], rtol=1e-4)
+assert np.allclose((up + down - 2 * columns["dirtyPrice"]) / (columns["dirtyPrice"] * 1e-8), columns["convexity"], rtol=1e-3)
+print("✓ DV01 and convexity match a ±1bp reprice")
+
+# Test 3: Service memoizes per (bond, price, date) and rolls up portfolios
+print("\n[TEST 3] Service...")
+service = BondAnalyticsService(cache_size=100)
+matured = schedules_for([make_bond(9, 500, datetime(2025, 12, 1))])
+assert service.analyze(matured, valuation_date=VALUATION)[0].yieldToMaturity is None
+first = service.analyze(par_bonds, [100.0, 99.0], VALUATION)
+again = service.analyze(par_bonds, [100.0, 99.0], VALUATION)
+assert first == again
+assert service.cache_stats()["hits"] == 2 and service.cache_stats()["misses"] == 3
+service.analyze(par_bonds, [100.0, 98.0], VALUATION)
+assert service.cache_stats()["misses"] == 4
+print(f"✓ Cache stats: {service.cache_stats()}")
+
+holdings = [
+    {"bond_id": 0, "invested": 3000.7, "investment_count": 2},
+    {"bond_id": 1, "invested": 1000.2, "investment_count": 1},
+]
+portfolio = service.analyze_portfolio(par_bonds, holdings, VALUATION)
+assert portfolio.totalInvested == 4000.9  # 3000.7 + 1000.2 is 4000.8999999999996 in floats
+assert abs(portfolio.marketValue - 4000.9) < 1e-6
+assert abs(portfolio.yieldToMaturity - (3000.7 * 5.0 + 1000.2 * 3.0) / 4000.9) < 1e-6
+assert abs(portfolio.dv01 - sum(p.analytics.dv01 * p.notional / 100 for p in portfolio.positions)) < 1e-12
+print(f"✓ Portfolio YTM {portfolio.yieldToMaturity:.4f}%, duration {portfolio.modifiedDuration:.4f}")
+
+print("\n" + "=" * 80)
+print("BOND ANALYTICS TEST COMPLETE")
+print("=" * 80)
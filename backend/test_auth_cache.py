@@ -0,0 +1,121 @@
+"""
+Auth cache test for Bond Investment Platform
+Tests cached token claims and users in get_current_user: hits, expiry, eviction and invalidation
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import auth
+import database
+from auth import TTLCache, create_access_token, get_auth_cache_stats, get_current_user, invalidate_user, \
+    set_user_service
+from database import Database
+from services import UserService
+
+print("=" * 80)
+print("AUTH CACHE TEST")
+print("=" * 80)
+
+database._db = Database(os.path.join(tempfile.mkdtemp(), "auth_cache_test.db"))
+db = database._db
+user_id = db.create_user("cache@example.com", "cache", "hash")["id"]
+
+user_service = UserService()
+set_user_service(user_service)
+lookups = []
+load_user = user_service.get_user_by_id
+user_service.get_user_by_id = lambda uid: lookups.append(uid) or load_user(uid)
+
+
+def current_user(token: str):
+    return asyncio.run(get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)))
+
+
+def rename(username: str):
+    with db.get_connection() as conn:
+        conn.execute("UPDATE users SET username = ? WHERE id = ?", (username, user_id))
+
+
+token = create_access_token({"sub": user_id})
+
+# Test 1: The first request decodes and loads, later ones hit both caches
+print("\n[TEST 1] Hits and misses...")
+assert current_user(token).username == "cache"
+assert current_user(token).username == "cache"
+assert current_user(token).username == "cache"
+stats = get_auth_cache_stats()
+assert (stats["tokens"]["hits"], stats["tokens"]["misses"]) == (2, 1)
+assert (stats["users"]["hits"], stats["users"]["misses"]) == (2, 1)
+assert lookups == [user_id]
+assert abs(stats["users"]["hit_rate"] - 2 / 3) < 1e-9
+print("✓ One token decode and one user lookup for three requests")
+
+# Test 2: Entries never outlive the token's exp claim
+print("\n[TEST 2] Expiry...")
+cache = TTLCache(max_size=10, ttl=60)
+cache.set("capped", 1, expires_at=time.time() + 0.1)
+cache.set("ttl", 2)
+assert cache.get("capped") == 1
+time.sleep(0.15)
+assert cache.get("capped") is None and cache.get("ttl") == 2
+assert cache.stats()["size"] == 1
+short = TTLCache(max_size=10, ttl=0.1)
+short.set("key", 1, expires_at=time.time() + 60)
+time.sleep(0.15)
+assert short.get("key") is None
+print("✓ An entry expires at the earlier of its TTL and its deadline")
+
+expiring = create_access_token({"sub": user_id}, expires_delta=timedelta(seconds=1))
+assert current_user(expiring).id == user_id
+assert auth._token_cache._entries[expiring][0] <= time.time() + 1
+time.sleep(2.1)
+try:
+    current_user(expiring)
+    raise AssertionError("expired token should be rejected")
+except HTTPException as e:
+    assert e.status_code == 401
+print("✓ A cached token is rejected once its exp has passed")
+
+# Test 3: The least recently used entry is evicted at max_size
+print("\n[TEST 3] LRU eviction...")
+cache = TTLCache(max_size=3, ttl=60)
+for key in "abc":
+    cache.set(key, key)
+cache.get("a")
+cache.set("d", "d")
+assert cache.get("b") is None
+assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+assert cache.stats()["size"] == 3
+print("✓ Adding a fourth entry evicts the least recently used one")
+
+# Test 4: invalidate_user makes the next request reload the user
+print("\n[TEST 4] invalidate_user...")
+rename("renamed")
+assert current_user(token).username == "cache"
+invalidate_user(user_id)
+assert current_user(token).username == "renamed"
+assert lookups == [user_id, user_id]
+print("✓ A cached user is served until invalidated, then reloaded")
+
+# Test 5: Installing a user service starts from empty caches
+print("\n[TEST 5] set_user_service...")
+assert get_auth_cache_stats()["tokens"]["size"] and get_auth_cache_stats()["users"]["size"]
+set_user_service(UserService())
+stats = get_auth_cache_stats()
+assert stats["tokens"]["size"] == 0 and stats["users"]["size"] == 0
+rename("after_reset")
+assert current_user(token).username == "after_reset"
+print("✓ set_user_service clears both caches")
+
+db.close()
+
+print("\n" + "=" * 80)
+print("ALL AUTH CACHE TESTS PASSED")
+print("=" * 80)
@@ -0,0 +1,210 @@
+"""
+JSON-RPC batching test for Bond Investment Platform
+Tests BlockchainClient session reuse, batch demultiplexing and read caching against a local
+stand-in node, and the AsyncBlockchainClient retry and concurrency behaviour
+"""
+
+import asyncio
+import threading
+import time
+from eth_abi import encode
+from blockchain_utils import (
+    BlockchainClient, AsyncBlockchainClient, InvestorStateReader, InvestorPosition, RPCError,
+    BOND_TOKEN_FUNCTIONS, compile_function, split_signature
+)
+from models import Bond
+from services import YieldCalculator
+from mock_rpc_node import MockRPCNode, MockRPCError
+
+print("=" * 80)
+print("BLOCKCHAIN CLIENT BATCH TEST")
+print("=" * 80)
+
+BALANCES = {f"0x{i:040x}": i * 1000 for i in range(250)}
+
+
+def get_balance(params):
+    address = params[0]
+    if address not in BALANCES:
+        raise MockRPCError(-32000, "unknown account")
+    return hex(BALANCES[address])
+
+
+def eth_call(params):
+    # Echo the calldata back so results can be matched to requests
+    return params[0]["data"]
+
+
+with MockRPCNode() as node:
+    node.register("eth_getBalance", get_balance)
+    node.register("eth_call", eth_call)
+    client = BlockchainClient(node.url, max_batch_size=100)
+
+    # Test 1: Single requests still work
+    print("\n[TEST 1] Single request...")
+    assert client.get_balance("0x" + "0" * 39 + "5") == 5000
+    print("✓ get_balance returns decoded balance")
+
+    # Test 2: Batch results are demultiplexed in call order
+    print("\n[TEST 2] Batched balance lookups...")
+    node.http_requests = 0
+    addresses = list(BALANCES)
+    balances = client.get_balances(addresses)
+    assert balances == [BALANCES[a] for a in addresses]
+    print(f"✓ {len(addresses)} balances fetched in {node.http_requests} HTTP requests")
+    assert node.http_requests == 3
+
+    # Test 3: Errors are reported per request
+    print("\n[TEST 3] Per-request errors...")
+    results = client.get_balances([addresses[1], "0xunknown", addresses[2]])
+    assert results[0] == 1000 and results[2] == 2000
+    assert isinstance(results[1], RPCError) and results[1].code == -32000
+    print(f"✓ Failed call isolated: {results[1]}")
+
+    results = client.batch([("eth_call", [{"to": "0xabc", "data": f"0x{i:02x}"}, "latest"]) for i in range(5)]
+                           + [("eth_unsupported", [])])
+    assert results[:5] == [f"0x{i:02x}" for i in range(5)]
+    assert isinstance(results[5], RPCError) and results[5].code == -32601
+    print("✓ Unknown method reported without failing the batch")
+
+    # Test 4: Single-request errors still raise
+    print("\n[TEST 4] Single request error...")
+    try:
+        client.get_balance("0xunknown")
+        raise AssertionError("expected RPCError")
+    except RPCError as e:
+        print(f"✓ Raised {e}")
+
+    client.close()
+
+    # Test 5: Async client matches the sync surface
+    print("\n[TEST 5] Async client...")
+
+    async def run_async():
+        async with AsyncBlockchainClient(node.url, max_batch_size=100, retry_backoff=0.01) as async_client:
+            assert await async_client.get_balance(addresses[7]) == 7000
+            balances = await asyncio.gather(*(async_client.get_balance(a) for a in addresses[:50]))
+            assert balances == [BALANCES[a] for a in addresses[:50]]
+            assert await async_client.get_balances(addresses) == [BALANCES[a] for a in addresses]
+            print("✓ Concurrent and batched lookups match")
+
+            node.fail_next = 2
+            node.http_requests = 0
+            assert await async_client.get_balance(addresses[3]) == 3000
+            assert node.http_requests == 3
+            print("✓ Retried through two HTTP 503 responses")
+
+            try:
+                await async_client.get_balance("0xunknown")
+                raise AssertionError("expected RPCError")
+            except RPCError as e:
+                print(f"✓ RPC errors raise without retry: {e}")
+
+    asyncio.run(run_async())
+
+    # Test 6: Investor state reads are batched and cached per block
+    print("\n[TEST 6] Investor state reader...")
+    TOKEN = "0x" + "0a" * 20
+    SELECTORS = {"0x" + function.selector.hex(): field
+                 for field, function in enumerate(InvestorStateReader.POSITION_FUNCTIONS)}
+    positions = {f"0x{i:040x}": (1000 * 10 ** 18 * (i + 1), 10 * 10 ** 18, 5 * 10 ** 18) for i in range(60)}
+
+    def position_call(params):
+        call = params[0]
+        if call["to"].lower() != TOKEN:
+            raise MockRPCError(-32000, "execution reverted")
+        investor = "0x" + call["data"][-40:]
+        return "0x" + encode(["uint256"], [positions[investor][SELECTORS[call["data"][:10]]]]).hex()
+
+    node.register("eth_call", position_call)
+    node.register("eth_blockNumber", lambda params: hex(100))
+    reader = InvestorStateReader(client)
+    pairs = [(TOKEN, investor) for investor in positions]
+    node.http_requests = 0
+    block, result = reader.read_positions(pairs)
+    assert block == 100
+    assert result[(TOKEN, "0x" + "0" * 39 + "1")] == InvestorPosition(*positions["0x" + "0" * 39 + "1"])
+    print(f"✓ {len(pairs) * 3} view calls read in {node.http_requests} HTTP requests")
+    assert node.http_requests == 3
+
+    node.http_requests = 0
+    reader.read_positions(pairs[:10])
+    assert node.http_requests == 1 and reader.stats()["hits"] == 10
+    print("✓ Repeat reads at the same block served from cache")
+
+    _, result = reader.read_positions([("0x" + "ff" * 20, pairs[0][1])])
+    assert list(result.values()) == [None]
+    print("✓ Reverted calls yield None")
+
+    bond = Bond(id=1, name="Test", issuer="Treasury", faceValue=1000000, couponRate=500,
+                maturityDate="2030-01-01T00:00:00", issueDate="2025-01-01T00:00:00",
+                description="", minimumInvestment=100, bondTokenAddress=TOKEN)
+    calculator = YieldCalculator(reader)
+    on_chain = calculator.calculate_yield(bond, pairs[0][1])
+    assert on_chain.investorAccruedInterest == 5.0
+    assert on_chain.investorYield > 0
+    off_chain = YieldCalculator().calculate_yield(bond, pairs[0][1])
+    assert off_chain.investorYield == off_chain.couponRate
+    yields = calculator.calculate_investor_yields([bond, bond.model_copy(update={"bondTokenAddress": "0x" + "ff" * 20})],
+                                                  pairs[1][1])
+    assert yields[0].investorAccruedInterest == 5.0 and yields[1].investorYield == yields[1].couponRate
+    print(f"✓ Investor yield from chain state: {on_chain.investorYield:.4f}%")
+
+# Test 7: ABI encoding matches eth_abi and well-known selectors
+print("\n[TEST 7] ABI encoding...")
+holder = "0x" + "12" * 20
+call_data = BlockchainClient("http://unused").encode_function_call("balanceOf(address)", holder)
+assert call_data == "0x70a08231" + encode(["address"], [holder]).hex()
+assert compile_function("transfer(address, uint256)").selector.hex() == "a9059cbb"
+assert compile_function("balanceOf(address)") is compile_function("balanceOf(address)")
+assert split_signature("f((uint256,address),bytes32[])") == ("f", ("(uint256,address)", "bytes32[]"))
+print(f"✓ balanceOf call data: {call_data[:10]}...")
+
+bond_info = ("Alpha", "Treasury", 10 ** 24, 500, 1900000000, 1700000000, 10 ** 21, True)
+get_bond_info = BOND_TOKEN_FUNCTIONS["getBondInfo"]
+assert get_bond_info.decode_output("0x" + encode(list(get_bond_info.outputs), list(bond_info)).hex()) == bond_info
+print("✓ getBondInfo output decodes")
+
+# Test 8: Block-aware read cache
+print("\n[TEST 8] Read cache...")
+with MockRPCNode() as node:
+    head = [10]
+    node.register("eth_blockNumber", lambda params: hex(head[0]))
+
+    def slow_balance(params):
+        time.sleep(0.05)
+        return hex(int(params[0], 16) + int(params[1], 16) if params[1] != "latest" else head[0])
+
+    node.register("eth_getBalance", slow_balance)
+    client = BlockchainClient(node.url, head_poll_interval=0.0)
+    address = "0x" + "0" * 39 + "1"
+
+    node.rpc_calls = 0
+    assert client.get_balance(address, hex(5)) == 6
+    assert client.get_balance(address, hex(5)) == 6
+    assert node.rpc_calls == 1
+    print("✓ Block-pinned reads served from cache")
+
+    node.rpc_calls = 0
+    assert client.get_balance(address) == 10
+    assert client.get_balance(address) == 10
+    assert node.rpc_calls == 3  # read + piggybacked head probe, then a standalone head check
+    head[0] = 11
+    assert client.get_balance(address) == 11
+    print("✓ Latest reads reused until a new block is observed")
+
+    node.rpc_calls = 0
+    threads = [threading.Thread(target=client.get_balance, args=(address, hex(7))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert node.rpc_calls == 1
+    stats = client.cache_stats()
+    print(f"✓ Concurrent identical reads deduplicated: {stats}")
+    assert stats["coalesced"] >= 1 and stats["saved_rpcs"] == stats["hits"] + stats["coalesced"]
+    client.close()
+
+print("\n" + "=" * 80)
+print("BLOCKCHAIN CLIENT BATCH TEST COMPLETE")
+print("=" * 80)
@@ -0,0 +1,87 @@
+"""
+Bond catalog test for Bond Investment Platform
+Tests the SQLite-backed catalog, version-stamped reloads across workers and seed-if-absent
+"""
+
+import os
+import tempfile
+import time
+
+import database
+from database import Database
+from models import Bond
+from services import BondService
+
+print("=" * 80)
+print("BOND CATALOG TEST")
+print("=" * 80)
+
+CHECK_INTERVAL = 0.2
+path = os.path.join(tempfile.mkdtemp(), "bond_catalog_test.db")
+
+
+def make_bond(bond_id: int, name: str, minimum: float = 100.0) -> Bond:
+    return Bond(id=bond_id, name=name, issuer="Treasury", faceValue=1_000_000.0, couponRate=400,
+                maturityDate="2036-01-01T00:00:00", issueDate="2026-01-01T00:00:00", description="",
+                minimumInvestment=minimum, bondTokenAddress="0x" + "0" * 40)
+
+
+def open_worker() -> BondService:
+    """A BondService with its own Database on the shared file, as in a separate worker process"""
+    database._db = Database(path)
+    return BondService(check_interval=CHECK_INTERVAL)
+
+
+SEED = [make_bond(0, "Seed Zero"), make_bond(1, "Seed One")]
+worker_a = open_worker()
+worker_b = open_worker()
+worker_a.seed_bonds(SEED)
+worker_b.seed_bonds(SEED)
+
+# Test 1: Both workers read the persisted catalog
+print("\n[TEST 1] Persisted catalog...")
+assert [bond.name for bond in worker_b.get_all_bonds()] == ["Seed Zero", "Seed One"]
+assert worker_a.get_bond_map().keys() == worker_b.get_bond_map().keys() == {0, 1}
+print("✓ Seeding twice stores each bond once; both workers see it")
+
+# Test 2: An edit through one worker reaches the other once check_interval has passed
+print("\n[TEST 2] Version-stamped reload...")
+version = worker_a.db.get_bond_catalog_version()
+cached = worker_b.get_bond_map()
+worker_a.update_bond(0, {"name": "Edited Zero", "minimumInvestment": 250.0})
+worker_a.add_bond(make_bond(2, "Added Two"))
+assert worker_a.db.get_bond_catalog_version() > version
+assert worker_a.get_bond(0).name == "Edited Zero"
+assert worker_b.get_bond(0).name == "Seed Zero" and worker_b.get_bond(2) is None
+time.sleep(CHECK_INTERVAL * 1.5)
+assert worker_b.get_bond(0).name == "Edited Zero" and worker_b.get_bond(0).minimumInvestment == 250.0
+assert worker_b.get_bond(2).name == "Added Two"
+assert worker_b.get_bond_map() is not cached
+print("✓ Worker B serves its cached copy until check_interval, then reloads the edit")
+
+cached = worker_b.get_bond_map()
+time.sleep(CHECK_INTERVAL * 1.5)
+assert worker_b.get_bond_map() is cached
+print("✓ An unchanged version stamp keeps the cached catalog")
+
+assert worker_b.delete_bond(2)
+time.sleep(CHECK_INTERVAL * 1.5)
+assert worker_a.get_bond(2) is None
+print("✓ Deletes propagate the same way")
+
+# Test 3: Seeding again never overwrites an admin edit
+print("\n[TEST 3] Seed if absent...")
+worker_c = open_worker()
+worker_c.seed_bonds(SEED + [make_bond(3, "Seed Three")])
+assert worker_c.get_bond(0).name == "Edited Zero" and worker_c.get_bond(0).minimumInvestment == 250.0
+assert worker_c.get_bond(3).name == "Seed Three"
+time.sleep(CHECK_INTERVAL * 1.5)
+assert worker_a.get_bond(3).name == "Seed Three" and worker_a.get_bond(0).name == "Edited Zero"
+print("✓ A restart re-seeds missing bonds and keeps edited ones")
+
+for worker in (worker_a, worker_b, worker_c):
+    worker.db.close()
+
+print("\n" + "=" * 80)
+print("ALL BOND CATALOG TESTS PASSED")
+print("=" * 80)
@@ -142,6 +142,17 @@ if resp.status_code == 200:
     print(f"  Issue Date: {bond['issueDate']}")
     print(f"  Maturity Date: {bond['maturityDate']}")
 
+# Test 9: Batch yields match the single-bond endpoint
+print("\n[TEST 9] Calculating yields in batch...")
+resp = client.get('/api/yield', params={'bond_ids': '2,0,999'})
+print(f"Status: {resp.status_code}")
+batch = resp.json()
+assert [entry['bondId'] for entry in batch] == [2, 0]
+for entry in batch:
+    assert entry == client.get(f"/api/yield/{entry['bondId']}").json()
+print(f"✓ {len(batch)} batch yields match /api/yield/{{bond_id}}")
+assert client.get('/api/yield', params={'bond_ids': 'x'}).status_code == 400
+
 print("\n" + "=" * 80)
 print("ALL TESTS COMPLETED SUCCESSFULLY!")
 print("=" * 80)
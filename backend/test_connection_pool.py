@@ -0,0 +1,114 @@
+"""
+Connection pool test for Bond Investment Platform
+Tests pooled connection reuse, nesting, exhaustion and metrics
+"""
+
+import os
+import tempfile
+import threading
+
+from database import Database, PoolTimeoutError
+
+print("=" * 80)
+print("DATABASE CONNECTION POOL TEST")
+print("=" * 80)
+
+tmp_dir = tempfile.mkdtemp()
+db = Database(os.path.join(tmp_dir, "pool_test.db"), pool_size=2)
+
+# Test 1: Connections are reused instead of reopened
+print("\n[TEST 1] Reusing pooled connections...")
+for i in range(20):
+    db.get_user_by_id(i)
+stats = db.pool_stats()
+print(f"  Checkouts: {stats['checkouts']}, Connections created: {stats['created']}")
+assert stats["created"] == 1
+assert stats["in_use"] == 0
+print("✓ Sequential queries share one connection")
+
+# Test 2: Nested calls join the outer transaction
+print("\n[TEST 2] Nested get_connection on the same thread...")
+with db.get_connection() as outer:
+    with db.get_connection() as inner:
+        assert inner is outer
+    assert db.pool_stats()["in_use"] == 1
+print("✓ Nested call reuses the outer connection")
+
+try:
+    with db.get_connection() as conn:
+        conn.execute("""
+            INSERT INTO users (email, username, hashed_password, created_at)
+            VALUES ('rollback@example.com', 'rollback', 'x', '2026-01-01T00:00:00')
+        """)
+        raise RuntimeError("abort")
+except RuntimeError:
+    pass
+assert db.get_user_by_email("rollback@example.com") is None
+print("✓ Failed block is rolled back before the connection is returned")
+
+# Test 3: Concurrent callers are bounded by the pool size
+print("\n[TEST 3] Concurrent access from worker threads...")
+user = db.create_user("pool@example.com", "pooluser", "hash")
+errors = []
+
+
+def worker():
+    try:
+        for _ in range(50):
+            db.record_investment(user["id"], 0, "0xpool", 10.0, "2026-01-01T00:00:00")
+    except Exception as e:
+        errors.append(e)
+
+
+threads = [threading.Thread(target=worker) for _ in range(6)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+stats = db.pool_stats()
+print(f"  Pool size: {stats['size']}/{stats['max_size']}, waits: {stats['waits']}, "
+      f"max wait: {stats['wait_time_max_ms']:.2f} ms")
+assert not errors, errors
+assert stats["size"] <= 2
+assert len(db.get_user_investments(user["id"])) == 300
+print("✓ All writes recorded without exceeding the pool bound")
+
+# Test 4: Exhausted pool times out
+print("\n[TEST 4] Pool exhaustion...")
+db.pool.timeout = 0.2
+held = [db.pool.acquire(), db.pool.acquire()]
+try:
+    db.pool.acquire()
+    raise AssertionError("acquire should have timed out")
+except PoolTimeoutError:
+    print("✓ Acquire times out when all connections are borrowed")
+finally:
+    for conn in held:
+        db.pool.release(conn)
+assert db.pool_stats()["timeouts"] == 1
+
+# Test 5: Broken connections are replaced by the health check
+print("\n[TEST 5] Health check...")
+db.pool.health_check_interval = 0
+conn = db.pool.acquire()
+conn.close()
+with db.pool._cond:
+    db.pool._idle.append((conn, 0.0))
+assert db.get_user_by_id(user["id"]) is not None
+assert db.pool_stats()["discarded"] >= 1
+print("✓ Closed idle connection replaced on checkout")
+
+# Test 6: A recreated database file gets the configured journal mode again
+print("\n[TEST 6] Journal mode after delete_database...")
+assert db.journal_mode == "wal"
+db.delete_database()
+assert db.journal_mode == "wal"
+with db.get_connection() as conn:
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+print("✓ WAL re-applied to the new database file")
+
+db.close()
+
+print("\n" + "=" * 80)
+print("CONNECTION POOL TEST COMPLETE")
+print("=" * 80)
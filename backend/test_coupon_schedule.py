@@ -0,0 +1,91 @@
+"""
+Coupon schedule test for Bond Investment Platform
+Tests payment date generation, day counts, accrual and on-disk schedule invalidation
+"""
+
+import os
+import sqlite3
+import tempfile
+from datetime import date, datetime
+
+import numpy as np
+
+from bond_fixtures import make_bond
+from coupon_schedule import CouponSchedule, ScheduleSet
+from database import Database
+
+print("=" * 80)
+print("COUPON SCHEDULE TEST")
+print("=" * 80)
+
+
+# Test 1: Dates roll back from maturity, keeping month-end anchoring and a short first period
+print("\n[TEST 1] Payment dates...")
+semi = CouponSchedule.build(make_bond(0, 600, datetime(2026, 8, 31), issue=datetime(2024, 1, 15)))
+assert [str(d) for d in semi.dates] == ["2024-02-29", "2024-08-31", "2025-02-28", "2025-08-31",
+                                         "2026-02-28", "2026-08-31"]
+assert np.allclose(semi.amounts[1:], 0.03)
+assert np.isclose(semi.amounts[0], 0.03 * 45 / 182)  # Jan 15 -> Feb 29 of the Aug 31 -> Feb 29 period
+print(f"✓ Semi-annual: {len(semi.dates)} payments, short first coupon {semi.amounts[0]:.6f}")
+
+quarterly = CouponSchedule.build(make_bond(1, 600, datetime(2026, 3, 31), 4, "30/360", issue=datetime(2025, 3, 31)))
+assert [str(d) for d in quarterly.dates] == ["2025-06-30", "2025-09-30", "2025-12-31", "2026-03-31"]
+assert np.allclose(quarterly.amounts, 0.015)
+act_360 = CouponSchedule.build(make_bond(2, 600, datetime(2026, 1, 1), 1, "ACT/360", issue=datetime(2025, 1, 1)))
+assert np.isclose(act_360.amounts[0], 0.06 * 365 / 360)
+print("✓ 30/360 quarters pay rate/4; ACT/360 pays on actual days")
+
+# Test 2: Accrual, projections and next payments over a set match the single-bond path
+print("\n[TEST 2] Accrual...")
+schedules = ScheduleSet([semi, quarterly, act_360])
+on = date(2025, 11, 15)
+accrued = schedules.accrued(on)
+assert np.allclose(accrued, [semi.accrued(on), quarterly.accrued(on), act_360.accrued(on)])
+assert np.isclose(accrued[0], 0.03 * 76 / 181)  # Aug 31 -> Nov 15 of Aug 31 -> Feb 28
+assert np.isclose(accrued[1], 0.015 * 45 / 90)  # 30/360: Sep 30 -> Nov 15
+assert schedules.accrued(date(2027, 1, 1)).tolist() == [0.0, 0.0, 0.0]
+assert np.allclose(schedules.projected(on, date(2026, 3, 31)), [0.03, 0.03, 0.06 * 365 / 360])
+dates, amounts = schedules.next_payment(on)
+assert [str(d) for d in dates] == ["2026-02-28", "2025-12-31", "2026-01-01"]
+print(f"✓ Accrued per unit face on {on}: {accrued.round(6).tolist()}")
+
+# Test 3: Schedules persist with the catalog and are dropped when a bond is updated
+print("\n[TEST 3] Storage...")
+db = Database(os.path.join(tempfile.mkdtemp(), "schedule_test.db"))
+db.save_bond({"id": 0, "name": "Bond 0", "issuer": "Treasury", "face_value": 1e6, "coupon_rate": 600,
+              "maturity_date": "2026-08-31T00:00:00", "issue_date": "2024-01-15T00:00:00",
+              "minimum_investment": 100.0})
+db.save_coupon_schedules([semi.to_row(), quarterly.to_row()])  # Bond 1 is not in the catalog
+stored = db.get_coupon_schedules()
+assert list(stored) == [0]
+loaded = CouponSchedule.from_row(stored[0])
+assert (loaded.dates == semi.dates).all() and (loaded.amounts == semi.amounts).all()
+assert loaded.key == semi.key
+db.update_bond(0, coupon_frequency=4)
+assert db.get_coupon_schedules() == {}
+print("✓ Schedule round-trips through SQLite and is invalidated on update")
+db.close()
+
+# Databases created before coupon terms existed take the frequency from the description
+path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+legacy = sqlite3.connect(path)
+legacy.execute("""
+    CREATE TABLE bonds (id INTEGER PRIMARY KEY, name TEXT NOT NULL, issuer TEXT NOT NULL,
+        face_value REAL NOT NULL, coupon_rate REAL NOT NULL, maturity_date TEXT NOT NULL,
+        issue_date TEXT NOT NULL, description TEXT, minimum_investment REAL NOT NULL,
+        bond_token_address TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)
+""")
+for bond_id, description in enumerate(["with quarterly interest payments", "with annual interest payments",
+                                       "with semi-annual interest payments", None]):
+    legacy.execute("INSERT INTO bonds VALUES (?, 'B', 'I', 1, 100, '2030-01-01', '2020-01-01', ?, 1, NULL, '', '')",
+                   (bond_id, description))
+legacy.commit()
+legacy.close()
+db = Database(path)
+assert [row["coupon_frequency"] for row in db.get_all_bonds()] == [4, 1, 2, 2]
+print("✓ Legacy catalog migrated with frequencies from descriptions")
+db.close()
+
+print("\n" + "=" * 80)
+print("COUPON SCHEDULE TEST COMPLETE")
+print("=" * 80)
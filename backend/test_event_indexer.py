@@ -0,0 +1,183 @@
+"""
+Contract event indexer test for Bond Investment Platform
+Tests log ingestion, resumability, self-reported investment matching, reorg handling
+and attribution of events from addresses that later belong to a user
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from blockchain_utils import BlockchainClient
+from database import Database, SCHEMA_VERSION
+from event_indexer import EventIndexer
+from mock_rpc_node import MockRPCNode, MockLogChain
+
+print("=" * 80)
+print("CONTRACT EVENT INDEXER TEST")
+print("=" * 80)
+
+PLATFORM = "0x" + "ab" * 20
+TOKEN_A = "0x" + "0a" * 20
+TOKEN_B = "0x" + "0b" * 20
+ALICE = "0x" + "a1" * 20
+BOB = "0x" + "b2" * 20
+UNIT = 10 ** 18
+INTEREST = 2015 * 10 ** 15  # 2.015 exactly on chain, but 2.01499... as a float
+
+db = Database(os.path.join(tempfile.mkdtemp(), "indexer_test.db"))
+alice_id = db.create_user("indexer_alice@example.com", "indexer_alice", "hash")["id"]
+
+chain = MockLogChain(max_logs=5)
+chain.create_bond(1, PLATFORM, 0, TOKEN_A, "Alpha Bond", "Treasury")
+chain.token_event(2, TOKEN_A, "InvestmentMade", ALICE, 100 * UNIT, 100 * UNIT)
+chain.create_bond(3, PLATFORM, 1, TOKEN_B, "Beta Bond", "City")
+chain.token_event(3, TOKEN_B, "InvestmentMade", BOB, 40 * UNIT, 40 * UNIT)
+for block in range(4, 14):
+    chain.token_event(block, TOKEN_A, "InvestmentMade", BOB, 5 * UNIT, 5 * UNIT)
+chain.token_event(14, TOKEN_A, "InterestPaid", ALICE, INTEREST)
+chain.token_event(15, TOKEN_B, "PrincipalRedeemed", BOB, 40 * UNIT)
+self_reported = chain.token_event(16, TOKEN_A, "InvestmentMade", ALICE, 7 * UNIT, 7 * UNIT)
+chain.head = 20
+
+# Alice already reported her block-16 investment through the API
+db.record_investment(alice_id, 1, ALICE, 7.0, "2026-01-01T00:00:00", self_reported)
+
+with MockRPCNode() as node:
+    chain.attach(node)
+    client = BlockchainClient(node.url)
+
+    # Test 1: Catch up, adapting the range to the node's result limit
+    print("\n[TEST 1] Initial sync...")
+    indexer = EventIndexer(db, client, PLATFORM, start_block=0, confirmations=2,
+                           initial_range=50, target_logs=4)
+    stats = indexer.sync()
+    print(f"  Stats: {stats}")
+    assert stats["checkpoint"] == 18
+    assert stats["range_splits"] > 0
+    assert stats["bonds"] == 2
+    assert stats["events"] == 15
+    assert stats["investments"] == 1
+    assert db.get_bond_aggregate(1)["total_invested"] == 100.0 + 7.0
+    assert db.get_bond_aggregate(2)["total_invested"] == 0
+    assert not db.verify_aggregates()
+    print("✓ Bonds, investments and aggregates ingested")
+
+    with db.get_connection() as conn:
+        raw = conn.execute("SELECT amount FROM chain_events WHERE event = 'InterestPaid'").fetchone()[0]
+        assert conn.execute("SELECT COUNT(*) FROM investments WHERE user_id NOT IN (SELECT id FROM users)"
+                            ).fetchone()[0] == 0
+    assert raw == str(INTEREST)
+    print("✓ Raw uint256 amounts kept as TEXT; no investment without a user")
+
+    alice_investments = db.get_investments_by_user_id(alice_id)
+    assert len(alice_investments) == 2
+    assert sorted(i["amount"] for i in alice_investments) == [7.0, 100.0]
+    print("✓ Investor address resolved to user; self-reported investment not duplicated")
+
+    # Bob never used the API, so his events wait in chain_events
+    transactions = db.get_all_transactions()
+    assert sorted(t["type"] for t in transactions) == ["interest_payment", "investment", "investment"]
+    assert next(t for t in transactions if t["type"] == "interest_payment")["amount"] == 2.02
+    assert db.get_platform_aggregate()["investor_count"] == 1
+    print("✓ Transactions recorded for known investors, amounts rounded half-even from the raw value")
+
+    # Test 2: Resuming from the checkpoint does not re-ingest anything
+    print("\n[TEST 2] Resume...")
+    chain.token_event(19, TOKEN_B, "InvestmentMade", ALICE, 3 * UNIT, 3 * UNIT)
+    chain.head = 22
+    resumed = EventIndexer(db, client, PLATFORM, confirmations=2).sync()
+    assert resumed["checkpoint"] == 20
+    assert resumed["events"] == 1
+    assert len(db.get_all_transactions()) == 4
+    print("✓ Fresh indexer picked up from the stored checkpoint")
+
+    # Test 3: Reorg rewinds and re-ingests the replaced blocks
+    print("\n[TEST 3] Reorg...")
+    chain.reorg(15)
+    chain.token_event(17, TOKEN_B, "InvestmentMade", BOB, 11 * UNIT, 11 * UNIT)
+    chain.head = 24
+    indexer = EventIndexer(db, client, PLATFORM, confirmations=2)
+    stats = indexer.sync()
+    print(f"  Stats: {stats}")
+    assert stats["reorgs"] == 1
+    assert stats["rewound_events"] == 3
+    assert stats["checkpoint"] == 22
+    assert db.get_bond_aggregate(2)["total_invested"] == 0
+    assert len(db.get_all_transactions()) == 2
+    assert not db.verify_aggregates()
+    # The self-reported investment was not created by the indexer and survives
+    assert len(db.get_investments_by_user_id(alice_id)) == 2
+    print("✓ Orphaned events removed and the new fork ingested")
+
+    # Test 4: Bob's first API investment links his address and attributes his indexed events
+    print("\n[TEST 4] Attribution...")
+    bob_id = db.create_user("indexer_bob@example.com", "indexer_bob", "hash")["id"]
+    db.record_investment(bob_id, 2, BOB.lower(), 1.0, "2026-01-02T00:00:00")
+    bob_investments = db.get_investments_by_user_id(bob_id)
+    assert len(bob_investments) == 1 + 12
+    assert {i["investor_address"] for i in bob_investments} == {BOB.lower()}
+    assert db.get_bond_aggregate(1)["total_invested"] == 107.0 + 50.0
+    assert db.get_bond_aggregate(2)["total_invested"] == 1.0 + 40.0 + 11.0
+    assert db.get_bond_aggregate(2)["investor_count"] == 1
+    assert sorted(t["type"] for t in db.get_user_transactions(bob_id)) == ["investment"] * 12
+    assert not db.verify_aggregates()
+    print("✓ 12 pending on-chain investments attributed to Bob under one address spelling")
+
+    db.record_investment(bob_id, 2, BOB, 1.0, "2026-01-03T00:00:00")
+    assert len(db.get_investments_by_user_id(bob_id)) == 14
+    chain.token_event(23, TOKEN_B, "PrincipalRedeemed", BOB, 52 * UNIT)
+    chain.head = 26
+    indexer.sync()
+    assert sorted(t["type"] for t in db.get_user_transactions(bob_id)) == ["investment"] * 12 + ["withdrawal"]
+    print("✓ Attributed events are not replayed; later events go straight to Bob")
+
+    client.close()
+
+db.close()
+
+# Test 5: A database indexed by older code is upgraded
+print("\n[TEST 5] Upgrading an indexed database...")
+CAROL = "0x" + "c3" * 20
+path = os.path.join(tempfile.mkdtemp(), "indexer_legacy.db")
+Database(path).close()
+legacy = sqlite3.connect(path)
+legacy.executescript(f"""
+    DROP TABLE chain_events;
+    CREATE TABLE chain_events (id INTEGER PRIMARY KEY AUTOINCREMENT, tx_hash TEXT NOT NULL,
+        log_index INTEGER NOT NULL, block_number INTEGER NOT NULL, block_hash TEXT NOT NULL,
+        contract_address TEXT NOT NULL, event TEXT NOT NULL, investor_address TEXT, bond_id INTEGER,
+        amount REAL, investment_id INTEGER, transaction_id INTEGER, created_at TEXT NOT NULL,
+        UNIQUE (tx_hash, log_index));
+    INSERT INTO users (id, email, username, hashed_password, created_at)
+        VALUES (1, 'carol@example.com', 'carol', 'hash', '2026-01-01');
+    INSERT INTO investments (id, user_id, bond_id, investor_address, amount, timestamp, transaction_hash, created_at)
+        VALUES (1, 0, 5, '{CAROL}', 2500, '2026-01-01', '0xt1', '2026-01-01'),
+               (2, 1, 5, '{CAROL.lower()}', 100, '2026-01-02', NULL, '2026-01-02');
+    INSERT INTO chain_events (tx_hash, log_index, block_number, block_hash, contract_address, event,
+                              investor_address, bond_id, amount, investment_id, created_at)
+        VALUES ('0xt1', 0, 1, '0xb1', '{TOKEN_A}', 'InvestmentMade', '{CAROL}', 5, 25.0, 1, '2026-01-01'),
+               ('0xt2', 0, 2, '0xb2', '{TOKEN_A}', 'InterestPaid', '{CAROL}', 5, 0.125, NULL, '2026-01-01');
+    PRAGMA user_version = 1;
+""")
+legacy.close()
+
+db = Database(path)
+with db.get_connection() as conn:
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert {row[1]: row[2] for row in conn.execute("PRAGMA table_info(chain_events)")}["amount"] == "TEXT"
+    events = conn.execute("SELECT amount, investment_id, transaction_id FROM chain_events ORDER BY id").fetchall()
+    assert conn.execute("SELECT COUNT(*) FROM investments WHERE user_id = 0").fetchone()[0] == 0
+assert [row[0] for row in events] == [str(25 * UNIT), str(125 * 10 ** 15)]
+assert events[0][1] not in (None, 1) and all(row[2] for row in events)
+carol = db.get_investments_by_user_id(1)
+assert sorted(i["amount"] for i in carol) == [1.0, 25.0]
+assert {i["investor_address"] for i in carol} == {CAROL.lower()}
+assert sorted(t["type"] for t in db.get_user_transactions(1)) == ["interest_payment", "investment"]
+assert db.get_bond_aggregate(5)["total_invested"] == 26.0 and not db.verify_aggregates()
+db.close()
+print("✓ Amounts converted to raw TEXT; user 0 investments re-attributed to the address's user")
+
+print("\n" + "=" * 80)
+print("CONTRACT EVENT INDEXER TEST COMPLETE")
+print("=" * 80)
@@ -0,0 +1,61 @@
+"""
+Streaming export test for Bond Investment Platform
+Tests batched NDJSON/CSV exports and that the pooled connection is returned
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+
+from database import Database
+from serialization import csv_chunks, ndjson_chunks
+
+print("=" * 80)
+print("STREAMING EXPORT TEST")
+print("=" * 80)
+
+db = Database(os.path.join(tempfile.mkdtemp(), "export_test.db"))
+user_id = db.create_user("export@example.com", "exporter", "hash")["id"]
+for i in range(5):
+    db.record_transaction(user_id, "investment", 100.0 + i, bond_id=i % 2, status="completed",
+                          description=f'Buy, "lot" {i}')
+db.record_transaction(user_id, "withdrawal", 50.0, status="pending")
+
+# TEST 1: NDJSON matches the paginated listing, oldest first
+print("\nTEST 1: NDJSON export")
+chunks = list(ndjson_chunks(db.iter_transactions(batch_size=2, trans_type="investment")))
+lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+page, _ = db.get_transactions_page(limit=100, trans_type="investment")
+assert len(chunks) == 3
+assert lines == page[::-1]
+assert lines[0]["username"] == "exporter"
+print(f"✓ {len(lines)} rows in {len(chunks)} chunks, same rows as the listing")
+
+# TEST 2: CSV header and quoting
+print("\nTEST 2: CSV export")
+text = b"".join(csv_chunks(db.iter_transactions(batch_size=4))).decode()
+records = list(csv.DictReader(io.StringIO(text)))
+assert len(records) == 6
+assert records[0]["description"] == 'Buy, "lot" 0'
+assert records[-1]["type"] == "withdrawal" and records[-1]["bond_id"] == ""
+empty = b"".join(csv_chunks(db.iter_bills())).decode()
+assert empty.startswith("id,transaction_id,user_id,username") and empty.count("\n") == 1
+print("✓ Header always written; commas and quotes survive the round trip")
+
+# TEST 3: The connection goes back to the pool, also when a client stops early
+print("\nTEST 3: Connection release")
+assert db.pool_stats()["in_use"] == 0
+stream = ndjson_chunks(db.iter_investments(batch_size=1))
+list(stream)
+partial = ndjson_chunks(db.iter_transactions(batch_size=1))
+next(partial)
+assert db.pool_stats()["in_use"] == 1
+partial.close()
+assert db.pool_stats()["in_use"] == 0
+print("✓ No connections held after finished or abandoned exports")
+
+print("\n" + "=" * 80)
+print("ALL STREAMING EXPORT TESTS PASSED")
+print("=" * 80)
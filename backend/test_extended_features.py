@@ -208,6 +208,14 @@ resp = client.post('/api/invest',
 if resp.status_code != 200:
     print(f"    ✓ Correctly rejected: {resp.json()['detail']}")
 
+# Test 10: Shutdown drains the group-commit writer
+print("\n[TEST 10] Application shutdown...")
+with TestClient(app.app):
+    app.risk_engine._get_pool()  # Started lazily by the first large risk run
+assert app.write_queue is None or app.write_queue._closed
+assert app.risk_engine._pool is None
+print("✓ Lifespan shutdown closed the write queue and the risk engine's process pool")
+
 print("\n" + "=" * 80)
 print("ALL EXTENDED TESTS COMPLETED SUCCESSFULLY!")
 print("=" * 80)
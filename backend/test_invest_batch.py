@@ -0,0 +1,84 @@
+"""
+Bulk investment ingestion test for Bond Investment Platform
+Tests per-row validation, one-transaction inserts with linked transactions/bills, and aggregates
+"""
+
+import os
+import tempfile
+
+import database
+from database import Database
+from models import Bond, Investment
+from services import BondService, InvestmentService
+
+print("=" * 80)
+print("BULK INVESTMENT INGESTION TEST")
+print("=" * 80)
+
+database._db = Database(os.path.join(tempfile.mkdtemp(), "invest_batch_test.db"))
+db = database._db
+user_id = db.create_user("batch@example.com", "batcher", "hash")["id"]
+bond_service = BondService()
+for bond_id in (1, 2):
+    bond_service.add_bond(Bond(
+        id=bond_id, name=f"Treasury {bond_id}", issuer="Treasury", faceValue=1e6, couponRate=400,
+        maturityDate="2036-01-01T00:00:00", issueDate="2026-01-01T00:00:00", description="",
+        minimumInvestment=50.0, bondTokenAddress="0x" + str(bond_id) * 40
+    ))
+investment_service = InvestmentService()
+changed = []
+investment_service.add_change_listener(changed.append)
+db.record_investment(user_id, 1, "0xA", 100.0, "2026-01-02T00:00:00")
+
+batch = [
+    Investment(bondId=1, investorAddress="0xA", amount=500.0, transactionHash="0x01"),
+    Investment(bondId=9, investorAddress="0xA", amount=500.0),
+    Investment(bondId=2, investorAddress="0xB", amount=75.5, timestamp="2026-02-01T00:00:00"),
+    Investment(bondId=2, investorAddress="0xB", amount=10.0),
+    Investment(bondId=1, investorAddress="0xC", amount=60.0),
+]
+
+# TEST 1: Per-row results in input order
+print("\nTEST 1: Validation and per-row results")
+results = investment_service.record_investments(batch, user_id, bond_service.get_bond_map())
+assert [r["status"] for r in results] == ["recorded", "rejected", "recorded", "rejected", "recorded"]
+assert [r["index"] for r in results] == list(range(5))
+assert results[1]["error"] == "Bond not found"
+assert "at least" in results[3]["error"]
+assert changed == [user_id]
+print("✓ 3 recorded, 2 rejected (unknown bond, below minimum)")
+
+# TEST 2: Returned ids point at the stored rows, linked to their transaction and bill
+print("\nTEST 2: Stored investments, transactions and bills")
+stored = {row["id"]: row for row in db.get_user_investments(user_id)}
+transactions = {row["id"]: row for row in db.get_user_transactions(user_id)}
+bills = {row["id"]: row for row in db.get_user_bills(user_id)}
+for result, investment in zip(results, batch):
+    if result["status"] != "recorded":
+        continue
+    record = result["investment"]
+    assert stored[record["id"]]["amount"] == investment.amount
+    assert stored[record["id"]]["bond_id"] == investment.bondId
+    transaction = transactions[record["transaction_id"]]
+    assert (transaction["amount"], transaction["status"]) == (investment.amount, "completed")
+    assert bills[record["bill_id"]]["transaction_id"] == record["transaction_id"]
+    assert bills[record["bill_id"]]["net_amount"] == investment.amount
+assert results[2]["investment"]["timestamp"] == "2026-02-01T00:00:00"
+assert len(stored) == 4 and len(transactions) == 3 and len(bills) == 3
+print("✓ Every recorded row has its investment, transaction and bill")
+
+# TEST 3: Aggregates stay consistent
+print("\nTEST 3: Aggregates")
+assert db.verify_aggregates() == []
+totals = investment_service.get_bond_totals(1)
+assert (totals["total_invested"], totals["investment_count"], totals["investor_count"]) == (660.0, 3, 2)
+assert investment_service.get_platform_totals()["investor_count"] == 3
+print("✓ Bond and platform aggregates match the investments table")
+
+assert investment_service.record_investments(batch[1:2], user_id, bond_service.get_bond_map())[0]["status"] == "rejected"
+assert changed == [user_id]
+print("✓ A batch with no valid rows writes nothing and notifies no one")
+
+print("\n" + "=" * 80)
+print("ALL BULK INVESTMENT INGESTION TESTS PASSED")
+print("=" * 80)
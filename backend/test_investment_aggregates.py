@@ -0,0 +1,85 @@
+"""
+Investment aggregate and pagination test for Bond Investment Platform
+Tests incrementally maintained bond/platform totals and keyset paging
+"""
+
+import os
+import tempfile
+
+from database import Database
+
+print("=" * 80)
+print("INVESTMENT AGGREGATES & PAGINATION TEST")
+print("=" * 80)
+
+db = Database(os.path.join(tempfile.mkdtemp(), "aggregates_test.db"))
+user_a = db.create_user("agg_a@example.com", "agg_a", "hash")["id"]
+user_b = db.create_user("agg_b@example.com", "agg_b", "hash")["id"]
+
+# Test 1: Aggregates follow every recorded investment
+print("\n[TEST 1] Recording investments...")
+investments = [
+    (user_a, 0, "0xaaa", 100.0),
+    (user_a, 0, "0xaaa", 50.0),
+    (user_b, 0, "0xbbb", 25.5),
+    (user_b, 1, "0xbbb", 10.0),
+]
+for user_id, bond_id, address, amount in investments:
+    db.record_investment(user_id, bond_id, address, amount, "2026-01-01T00:00:00")
+
+bond_0 = db.get_bond_aggregate(0)
+platform = db.get_platform_aggregate()
+print(f"  Bond 0: {bond_0}")
+print(f"  Platform: {platform}")
+assert bond_0["total_invested"] == 175.5
+assert bond_0["investment_count"] == 3
+assert bond_0["investor_count"] == 2
+assert db.get_bond_aggregate(1)["investor_count"] == 1
+assert db.get_bond_aggregate(2)["investment_count"] == 0
+assert platform["investor_count"] == 2
+assert platform["investment_count"] == 4
+assert db.verify_aggregates() == []
+print("✓ Bond and platform totals match the investments table")
+
+# Test 2: Drift is reported and repaired
+print("\n[TEST 2] Detecting drift...")
+with db.get_connection() as conn:
+    conn.execute("UPDATE bond_aggregates SET investment_count = 99 WHERE bond_id = 0")
+drift = db.verify_aggregates()
+assert [(d["bond_id"], d["field"]) for d in drift] == [(0, "investment_count")]
+print(f"✓ Drift detected: {drift[0]}")
+db.rebuild_aggregates()
+assert db.verify_aggregates() == []
+print("✓ Rebuild restores consistency")
+
+# Test 3: Keyset pages cover every row exactly once
+print("\n[TEST 3] Paging investments with cursors...")
+for i in range(10):
+    db.record_investment(user_a, 2, f"0x{i:03x}", 1.0 + i, "2026-01-02T00:00:00")
+seen = []
+cursor = None
+while True:
+    page, cursor = db.get_investments_page(limit=3, cursor=cursor, bond_id=2)
+    seen.extend(row["id"] for row in page)
+    if cursor is None:
+        break
+assert len(seen) == 10 and len(set(seen)) == 10
+assert seen == sorted(seen, reverse=True)
+print(f"✓ {len(seen)} investments paged newest first without gaps or repeats")
+
+page, _ = db.get_investments_page(limit=100, user_id=user_b)
+assert len(page) == 2 and all(row["user_id"] == user_b for row in page)
+print("✓ Filters restrict the page")
+
+try:
+    db.get_investments_page(cursor="not-a-cursor")
+    raise AssertionError("invalid cursor should be rejected")
+except ValueError:
+    print("✓ Invalid cursor rejected")
+
+db.delete_database()
+db.close()
+
+print("\n" + "=" * 80)
+print("INVESTMENT AGGREGATES & PAGINATION TEST COMPLETE")
+print("=" * 80)
@@ -0,0 +1,99 @@
+"""
+Ledger snapshot test for Bond Investment Platform
+Tests month partitioning, id-watermark increments, null masks and memory-mapped aggregation
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from database import Database, major_units
+from ledger_snapshot import LedgerSnapshot, pq
+from models import to_minor_units
+
+print("=" * 80)
+print("LEDGER SNAPSHOT TEST")
+print("=" * 80)
+
+db = Database(os.path.join(tempfile.mkdtemp(), "snapshot_test.db"))
+user_id = db.create_user("snap@example.com", "snap", "hash")["id"]
+
+
+def add_transactions(rows):
+    with db.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO transactions
+            (user_id, type, bond_id, amount, status, timestamp, transaction_hash, description, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?)
+        """, [(user_id, kind, bond_id, to_minor_units(amount), status, created_at, description, created_at)
+              for kind, bond_id, amount, status, description, created_at in rows])
+
+
+add_transactions([
+    ("investment", 1, 100.0, "completed", "Buy", "2026-01-05T10:00:00"),
+    ("investment", 2, 250.0, "completed", None, "2026-01-31T23:59:59.999999"),
+    ("withdrawal", None, 40.0, "pending", "Cash out", "2026-02-01T00:00:00"),
+])
+db.record_investment(user_id, 1, "0x" + "b" * 40, 75.0, "2026-02-02T00:00:00")
+
+for file_format in ["npy"] + (["parquet"] if pq is not None else []):
+    print(f"\nFORMAT: {file_format}")
+    directory = tempfile.mkdtemp()
+    snapshot = LedgerSnapshot(directory, file_format)
+
+    # TEST 1: First run copies everything, one part per month
+    appended = snapshot.update(db, batch_size=2)
+    assert appended == {"investments": 1, "transactions": 3, "transaction_bills": 0}
+    assert snapshot.watermark("transactions") == 3
+    assert sorted({part["month"] for part in snapshot.parts("transactions")}) == ["2026-01", "2026-02"]
+    january = snapshot.read("transactions", months=["2026-01"])
+    assert january["amount"].tolist() == [100.0, 250.0]
+    assert january["description.null"].tolist() == [False, True]
+    assert january["created_at"].dtype == np.dtype("datetime64[us]")
+    print("✓ Full copy partitioned by month with typed columns and null masks")
+
+    # TEST 2: Later runs only append rows past the watermark, also after reopening
+    add_transactions([("investment", 1, 500.0, "completed", "Buy", "2026-03-01T09:00:00")])
+    assert LedgerSnapshot(directory).update(db) == {"investments": 0, "transactions": 1, "transaction_bills": 0}
+    snapshot = LedgerSnapshot(directory)
+    assert snapshot.format == file_format
+    assert snapshot.update(db)["transactions"] == 0
+    transactions = snapshot.read("transactions")
+    assert transactions["id"].tolist() == [1, 2, 3, 4]
+    assert transactions["bond_id.null"].tolist() == [False, False, True, False]
+    print("✓ Incremental runs append only new ids")
+
+    # TEST 3: Memory-mapped aggregation matches SQL
+    totals = {}
+    for part in snapshot.scan("transactions", columns=["type", "amount"]):
+        for kind in np.unique(part["type"]):
+            totals[str(kind)] = totals.get(str(kind), 0.0) + float(part["amount"][part["type"] == kind].sum())
+    with db.get_connection() as conn:
+        expected = dict(conn.execute(f"""
+            SELECT type, {major_units("SUM(amount)", "total")} FROM transactions GROUP BY type
+        """).fetchall())
+    assert totals == expected, (totals, expected)
+    assert snapshot.read("transaction_bills")["id"].size == 0
+    print(f"✓ Per-type totals from scanned parts match SQL: {totals}")
+
+    # TEST 4: Full rebuild
+    snapshot.reset(["transactions"])
+    assert snapshot.watermark("transactions") == 0 and snapshot.watermark("investments") == 1
+    assert snapshot.update(db, ["transactions"]) == {"transactions": 4}
+    print("✓ Reset table is copied again from id 0")
+
+# TEST 5: A snapshot keeps the format it was written in
+directory = tempfile.mkdtemp()
+LedgerSnapshot(directory, "npy").update(db)
+assert LedgerSnapshot(directory, "auto").format == "npy"
+try:
+    LedgerSnapshot(directory, "parquet")
+    raise AssertionError("format switch should be rejected")
+except ValueError as e:
+    assert "is npy" in str(e)
+print("\n✓ Reopening a snapshot in another format is rejected")
+
+print("\n" + "=" * 80)
+print("ALL LEDGER SNAPSHOT TESTS PASSED")
+print("=" * 80)
@@ -0,0 +1,159 @@
+"""
+Fixed-point amount test for Bond Investment Platform
+Tests the REAL to INTEGER minor-unit migration, exact SQL totals and per-bond currency scales
+"""
+
+import os
+import sqlite3
+import tempfile
+from decimal import Decimal
+
+import database
+from database import Database, SCHEMA_VERSION
+from models import Bond, Investment, to_minor_units
+from services import BondService, InvestmentService
+
+print("=" * 80)
+print("FIXED-POINT AMOUNT TEST")
+print("=" * 80)
+
+
+def column_types(db: Database, table: str) -> dict:
+    with db.get_connection() as conn:
+        return {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+# TEST 1: A database written with REAL amounts is migrated in place
+print("\nTEST 1: Migrating a REAL-amount database")
+path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+legacy = sqlite3.connect(path)
+legacy.executescript("""
+    CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL,
+        username TEXT UNIQUE NOT NULL, hashed_password TEXT NOT NULL, created_at TEXT NOT NULL);
+    CREATE TABLE investments (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+        bond_id INTEGER NOT NULL, investor_address TEXT NOT NULL, amount REAL NOT NULL,
+        timestamp TEXT NOT NULL, transaction_hash TEXT, created_at TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id));
+    CREATE INDEX idx_investment_address ON investments(investor_address);
+    CREATE TABLE transaction_bills (id INTEGER PRIMARY KEY AUTOINCREMENT, transaction_id INTEGER,
+        user_id INTEGER NOT NULL, bond_name TEXT, amount REAL NOT NULL, transaction_type TEXT NOT NULL,
+        status TEXT DEFAULT 'pending', timestamp TEXT NOT NULL, tax_amount REAL DEFAULT 0.0,
+        fee_amount REAL DEFAULT 0.0, net_amount REAL, created_at TEXT NOT NULL);
+    CREATE TABLE bond_aggregates (bond_id INTEGER PRIMARY KEY, total_invested REAL NOT NULL DEFAULT 0,
+        investment_count INTEGER NOT NULL DEFAULT 0, investor_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL);
+    CREATE TABLE platform_aggregates (id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_invested REAL NOT NULL DEFAULT 0, investment_count INTEGER NOT NULL DEFAULT 0,
+        investor_count INTEGER NOT NULL DEFAULT 0, updated_at TEXT NOT NULL);
+    CREATE TABLE bond_investors (bond_id INTEGER NOT NULL, investor_address TEXT NOT NULL,
+        PRIMARY KEY (bond_id, investor_address)) WITHOUT ROWID;
+    CREATE TABLE platform_investors (investor_address TEXT PRIMARY KEY) WITHOUT ROWID;
+
+    INSERT INTO users VALUES (1, 'old@example.com', 'old', 'hash', '2025-01-01T00:00:00');
+    INSERT INTO investments (user_id, bond_id, investor_address, amount, timestamp, created_at) VALUES
+        (1, 0, '0xa', 0.1, '2025-01-01', '2025-01-01'),
+        (1, 0, '0xa', 0.2, '2025-01-02', '2025-01-02'),
+        (1, 1, '0xb', 19.99, '2025-01-03', '2025-01-03'),
+        (1, 1, '0xb', 5.0, '2025-01-04', '2025-01-04');
+    DELETE FROM investments WHERE id = 4;
+    INSERT INTO transaction_bills (user_id, amount, transaction_type, timestamp, tax_amount,
+                                   fee_amount, net_amount, created_at)
+        VALUES (1, 19.99, 'investment', '2025-01-03', 0.0, 1.5, 18.49, '2025-01-03');
+    INSERT INTO bond_aggregates VALUES (0, 0.30000000000000004, 2, 1, '2025-01-02'), (1, 19.99, 1, 1, '2025-01-03');
+    INSERT INTO platform_aggregates VALUES (1, 20.29, 3, 2, '2025-01-03');
+    INSERT INTO bond_investors VALUES (0, '0xa'), (1, '0xb');
+    INSERT INTO platform_investors VALUES ('0xa'), ('0xb');
+""")
+legacy.commit()
+legacy.close()
+
+db = Database(path)
+with db.get_connection() as conn:
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert [row[0] for row in conn.execute("SELECT amount FROM investments ORDER BY id")] == [10, 20, 1999]
+    assert "idx_investment_address" in {row[1] for row in conn.execute("PRAGMA index_list(investments)")}
+assert column_types(db, "investments")["amount"] == "INTEGER"
+assert {column_types(db, "transaction_bills")[c] for c in ("amount", "tax_amount", "fee_amount", "net_amount")} \
+    == {"INTEGER"}
+assert column_types(db, "bonds")["currency_scale"] == "INTEGER"
+assert [row["amount"] for row in db.get_user_investments(1)] == [19.99, 0.2, 0.1]
+assert db.get_bills_summary(user_id=1) == {"total_bills": 1, "total_amount": 19.99, "total_tax": 0.0,
+                                           "total_fee": 1.5, "total_net": 18.49}
+assert db.verify_aggregates() == []
+assert db.get_bond_aggregate(0)["total_invested"] == 0.3
+assert db.record_investment(1, 0, "0xa", 1.0, "2025-02-01")["id"] == 5
+print("✓ Columns retyped, values converted, indexes and id sequence kept, aggregates exact")
+
+db.close()
+db = Database(path)
+assert db.get_platform_aggregate()["total_invested"] == 21.29
+db.close()
+print("✓ Reopening a migrated database changes nothing")
+
+with sqlite3.connect(path) as conn:
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+try:
+    Database(path)
+    raise AssertionError("newer schema should be refused")
+except RuntimeError as e:
+    assert "newer" in str(e)
+print("✓ A database from newer code is refused")
+
+# TEST 2: Totals are exact integer sums
+print("\nTEST 2: Exact totals")
+database._db = Database(os.path.join(tempfile.mkdtemp(), "minor_units_test.db"))
+db = database._db
+user_id = db.create_user("fixed@example.com", "fixed", "hash")["id"]
+for _ in range(10):
+    db.record_investment(user_id, 7, "0xc", 0.1, "2026-01-01T00:00:00")
+    transaction = db.record_transaction(user_id, "investment", 0.1, bond_id=7, status="completed")
+    db.create_transaction_bill(transaction["id"], user_id, "Bond 7", 0.1, "investment", fee_amount=0.03)
+assert sum([0.1] * 10) != 1.0
+assert db.get_bond_aggregate(7)["total_invested"] == 1.0
+assert db.get_investment_totals(user_id=user_id)["total_invested"] == 1.0
+assert db.get_user_holdings(user_id) == [{"bond_id": 7, "invested": 1.0, "investment_count": 10}]
+summary = db.get_bills_summary(user_id=user_id)
+assert (summary["total_amount"], summary["total_fee"], summary["total_net"]) == (1.0, 0.3, 0.7)
+assert db.get_user_bills(user_id)[0]["net_amount"] == 0.07
+print("✓ Ten 0.10 investments total exactly 1.00; bill nets are exact")
+
+# TEST 3: The Amount type and per-bond currency scales
+print("\nTEST 3: Amount validation and currency scales")
+assert Investment(bondId=1, investorAddress="0xc", amount=10.1).amount == Decimal("10.10")
+assert Investment(bondId=1, investorAddress="0xc", amount=10.1).model_dump()["amount"] == 10.1
+for bad in (10.005, 10.015, 0.1 + 0.2):
+    try:
+        Investment(bondId=1, investorAddress="0xc", amount=bad)
+        raise AssertionError(f"{bad} should be rejected")
+    except ValueError:
+        pass
+assert to_minor_units(1e12) == 10 ** 14
+bond_service = BondService()
+yen = Bond(id=1, name="Yen Bond", issuer="Treasury", faceValue=1_000_000, couponRate=100,
+           maturityDate="2036-01-01T00:00:00", issueDate="2026-01-01T00:00:00", description="",
+           minimumInvestment=1000, bondTokenAddress="0x" + "1" * 40, currencyScale=0)
+bond_service.add_bond(yen)
+assert bond_service.get_bond(1).currencyScale == 0 and bond_service.get_bond(1).faceValue == 1_000_000
+results = InvestmentService().record_investments(
+    [Investment(bondId=1, investorAddress="0xc", amount=amount) for amount in (1500.0, 1500.5)],
+    user_id, bond_service.get_bond_map()
+)
+assert [r["status"] for r in results] == ["recorded", "rejected"]
+assert "0 decimal places" in results[1]["error"]
+for bad in ({"currencyScale": 3}, {"minimumInvestment": 1000.5}):
+    try:
+        bond_service.add_bond(yen.model_copy(update=bad))
+        raise AssertionError(f"{bad} should be rejected")
+    except ValueError:
+        pass
+try:
+    bond_service.update_bond(1, {"faceValue": 999.99})
+    raise AssertionError("sub-yen face value should be rejected")
+except ValueError:
+    pass
+assert bond_service.update_bond(1, {"currencyScale": 2, "faceValue": 999.99}).faceValue == Decimal("999.99")
+print("✓ Amounts finer than cents rejected; bonds accept only amounts their currency can express")
+
+print("\n" + "=" * 80)
+print("ALL FIXED-POINT AMOUNT TESTS PASSED")
+print("=" * 80)
@@ -0,0 +1,146 @@
+"""
+Keyset pagination test for Bond Investment Platform
+Tests cursor round-trips and every filter of the paginated admin and bond listings
+"""
+
+import os
+import tempfile
+
+import database
+from database import Database, decode_cursor
+from services import InvestmentService
+
+print("=" * 80)
+print("KEYSET PAGINATION TEST")
+print("=" * 80)
+
+database._db = Database(os.path.join(tempfile.mkdtemp(), "pagination_test.db"))
+db = database._db
+
+user_ids = [db.create_user(f"page_{n}@example.com", f"page_{n}", "hash")["id"] for n in range(9)]
+for n, user_id in enumerate(user_ids):
+    db.create_payment_access(user_id)
+    if n % 3 == 1:
+        db.update_payment_access(user_id, payment_status="blocked")
+    if n % 2:
+        db.update_payment_access(user_id, access_level="limited")
+    for i in range(4):
+        bond_id = (n + i) % 3
+        amount = 10.0 + n + i
+        db.record_investment(user_id, bond_id, f"0x{n:040x}", amount, "2026-01-01T00:00:00")
+        transaction = db.record_transaction(user_id, "investment" if i % 2 == 0 else "withdrawal", amount,
+                                            bond_id=bond_id, status=("completed", "pending", "failed")[i % 3])
+        db.create_transaction_bill(transaction["id"], user_id, f"Bond {bond_id}", amount, transaction["type"],
+                                   status=("completed", "pending")[i % 2])
+
+# Spread rows over four days with many rows per day, so pages split inside a
+# run of equal created_at values and the id tie-break is exercised
+DAYS = ["2026-01-01T00:00:00", "2026-01-02T00:00:00", "2026-01-03T00:00:00", "2026-01-04T00:00:00"]
+with db.get_connection() as conn:
+    for table in ("users", "payment_access", "investments", "transactions", "transaction_bills"):
+        conn.execute(f"UPDATE {table} SET created_at = '2026-01-0' || (id % 4 + 1) || 'T00:00:00'")
+
+
+def newest_first(rows):
+    return sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=True)
+
+
+def page_through(fetch, limit, **filters):
+    """Follow next_cursor from the first page to the last, checking each cursor"""
+    rows, cursor = [], None
+    while True:
+        page, cursor = fetch(limit=limit, cursor=cursor, **filters)
+        assert len(page) <= limit
+        rows.extend(page)
+        if cursor is None:
+            return rows
+        assert len(page) == limit
+        assert decode_cursor(cursor) == (page[-1]["created_at"], page[-1]["id"])
+
+
+def check_listing(name, fetch, filters):
+    """Every filter, alone, pages to exactly the matching rows, newest first, for several page sizes"""
+    everything = page_through(fetch, 1000)
+    assert everything == newest_first(everything), name
+    for field, value, matches in filters:
+        expected = [row for row in everything if matches(row)]
+        assert expected and len(expected) < len(everything), (name, field)
+        for limit in (1, 4, 7, len(expected)):
+            assert page_through(fetch, limit, **{field: value}) == expected, (name, field, limit)
+    print(f"✓ {name}: {len(everything)} rows, {len(filters)} filters, page sizes 1/4/7/all")
+
+
+def created_range(after=None, before=None):
+    """Filter tuples for created_after and created_before"""
+    checks = []
+    if after:
+        checks.append(("created_after", after, lambda row: row["created_at"] >= after))
+    if before:
+        checks.append(("created_before", before, lambda row: row["created_at"] < before))
+    return checks
+
+
+# Test 1: Users
+print("\n[TEST 1] Users...")
+check_listing("users", db.get_users_page, created_range(DAYS[2], DAYS[1]))
+
+# Test 2: Payment access
+print("\n[TEST 2] Payment access...")
+check_listing("payment access", db.get_payment_access_page, [
+    ("payment_status", "blocked", lambda row: row["payment_status"] == "blocked"),
+    ("access_level", "limited", lambda row: row["access_level"] == "limited"),
+])
+assert db.count_payment_access(payment_status="blocked") == 3
+assert db.count_payment_access(access_level="limited", payment_status="blocked") == 2
+
+# Test 3: Transactions
+print("\n[TEST 3] Transactions...")
+check_listing("transactions", db.get_transactions_page, [
+    ("user_id", user_ids[4], lambda row: row["user_id"] == user_ids[4]),
+    ("bond_id", 2, lambda row: row["bond_id"] == 2),
+    ("status", "failed", lambda row: row["status"] == "failed"),
+    ("trans_type", "withdrawal", lambda row: row["type"] == "withdrawal"),
+] + created_range(DAYS[3], DAYS[1]))
+assert db.get_transaction_status_counts(trans_type="withdrawal") == {"pending": 9, "completed": 9}
+
+# Test 4: Bills
+print("\n[TEST 4] Bills...")
+check_listing("bills", db.get_bills_page, [
+    ("user_id", user_ids[0], lambda row: row["user_id"] == user_ids[0]),
+    ("status", "pending", lambda row: row["status"] == "pending"),
+    ("trans_type", "investment", lambda row: row["transaction_type"] == "investment"),
+] + created_range(DAYS[1], DAYS[2]))
+pending = db.get_bills_summary(status="pending")
+assert pending["total_bills"] == 18
+assert pending["total_amount"] == sum(row["amount"] for row in page_through(db.get_bills_page, 5, status="pending"))
+
+# Test 5: Bond investments, with totals matching the filtered page
+print("\n[TEST 5] Bond investments...")
+check_listing("investments", db.get_investments_page, [
+    ("bond_id", 1, lambda row: row["bond_id"] == 1),
+    ("user_id", user_ids[8], lambda row: row["user_id"] == user_ids[8]),
+    ("investor_address", f"0x{3:040x}", lambda row: row["investor_address"] == f"0x{3:040x}"),
+] + created_range(DAYS[2], DAYS[3]))
+investment_service = InvestmentService()
+for after, before in ((None, None), (DAYS[2], None), (None, DAYS[1]), (DAYS[1], DAYS[3])):
+    rows = page_through(db.get_investments_page, 3, bond_id=0, created_after=after, created_before=before)
+    totals = investment_service.get_bond_totals(0, created_after=after, created_before=before)
+    assert totals["investment_count"] == len(rows)
+    assert totals["total_invested"] == sum(row["amount"] for row in rows)
+    assert totals["investor_count"] == len({row["investor_address"] for row in rows})
+print("✓ Bond totals cover the same created_at range as the listing")
+
+# Test 6: Malformed cursors are rejected
+print("\n[TEST 6] Invalid cursor...")
+try:
+    db.get_transactions_page(limit=10, cursor="not-a-cursor")
+    raise AssertionError("invalid cursor should be rejected")
+except ValueError:
+    pass
+print("✓ Malformed cursor raises ValueError")
+
+db.close()
+
+print("\n" + "=" * 80)
+print("ALL KEYSET PAGINATION TESTS PASSED")
+print("=" * 80)
@@ -0,0 +1,93 @@
+"""
+Portfolio valuation test for Bond Investment Platform
+Tests per-holding accrual, projected income, mark-to-model value and per-user caching
+"""
+
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+import database
+from database import Database
+from models import Bond, Investment
+from services import BondService, InvestmentService, PortfolioValuationService
+
+print("=" * 80)
+print("PORTFOLIO VALUATION TEST")
+print("=" * 80)
+
+database._db = Database(os.path.join(tempfile.mkdtemp(), "portfolio_test.db"))
+db = database._db
+alice = db.create_user("pv_alice@example.com", "pv_alice", "hash")["id"]
+bob = db.create_user("pv_bob@example.com", "pv_bob", "hash")["id"]
+
+today = datetime.combine(date.today(), datetime.min.time())
+bond_service = BondService()
+for bond_id, rate, frequency, months in ((0, 600, 2, 24), (1, 400, 4, 60)):
+    # Issued four months ago, maturing on a coupon date
+    bond_service.add_bond(Bond(
+        id=bond_id, name=f"Bond {bond_id}", issuer="Treasury", faceValue=1e6, couponRate=rate,
+        description="", minimumInvestment=10.0, bondTokenAddress="0x" + "0" * 40,
+        issueDate=(today - timedelta(days=122)).isoformat(),
+        maturityDate=(today - timedelta(days=122) + timedelta(days=round(months * 30.44))).isoformat(),
+        couponFrequency=frequency
+    ))
+investment_service = InvestmentService()
+portfolios = PortfolioValuationService(investment_service, bond_service)
+
+
+def invest(user_id: int, bond_id: int, amount: float):
+    investment_service.record_investment(
+        Investment(bondId=bond_id, investorAddress="0x" + "a" * 40, amount=amount), user_id=user_id
+    )
+
+
+invest(alice, 0, 1000.0)
+invest(alice, 0, 500.0)
+invest(alice, 1, 2000.0)
+invest(alice, 7, 100.0)  # Not in the catalog
+invest(bob, 1, 2500.15)
+
+# Test 1: Holdings are grouped per bond and valued from the coupon schedules
+print("\n[TEST 1] Valuation...")
+portfolio = portfolios.get_portfolio(alice, "0xalice")
+holdings = {h.bondId: h for h in portfolio.holdings}
+print(f"  Total value {portfolio.totalValue:.2f}, income {portfolio.projectedAnnualIncome:.2f}, "
+      f"yield {portfolio.totalYield:.3f}%")
+assert len(portfolio.investments) == 4
+assert holdings[0].invested == 1500.0 and holdings[0].investmentCount == 2
+schedules = bond_service.get_coupon_schedules()
+for bond_id, notional in ((0, 1500.0), (1, 2000.0)):
+    schedule = schedules.get(bond_id)
+    assert abs(holdings[bond_id].accruedInterest - notional * schedule.accrued(date.today())) < 1e-9
+    assert 0 < holdings[bond_id].accruedInterest < notional * schedule.amounts.max()
+    # Priced at its own coupon rate, a holding is worth about par plus accrued interest
+    assert abs(holdings[bond_id].marketValue - notional - holdings[bond_id].accruedInterest) < 1e-3 * notional
+assert abs(holdings[0].projectedAnnualIncome - 90.0) < 1e-9
+assert abs(holdings[1].projectedAnnualIncome - 80.0) < 1e-9
+assert holdings[7].marketValue == 100.0 and holdings[7].nextPaymentDate is None
+assert abs(portfolio.totalYield - 170.0 / 3600.0 * 100) < 1e-9
+print("✓ Accrued interest, projected income and model value per holding")
+
+marked = PortfolioValuationService(investment_service, bond_service, model_yield=8.0)
+assert marked.get_portfolio(alice, "0xalice").totalValue < portfolio.totalValue
+print("✓ A higher model yield marks the portfolio down")
+
+# Test 2: Cached per user and invalidated by that user's writes only
+print("\n[TEST 2] Caching...")
+assert portfolios.get_portfolio(alice, "0xalice") is portfolio
+portfolios.get_portfolio(bob, "0xbob")
+invest(bob, 0, 1000.2)
+assert portfolios.get_portfolio(alice, "0xalice") is portfolio
+bob_portfolio = portfolios.get_portfolio(bob, "0xbob")
+assert bob_portfolio.totalInvested == 3500.35  # Not 3500.3500000000004 from float sums
+print(f"✓ Cache stats: {portfolios.cache_stats()}")
+assert portfolios.cache_stats() == {"size": 2, "max_size": 10000, "hits": 2, "misses": 3}
+
+bond_service.update_bond(1, {"couponRate": 500})
+assert portfolios.get_portfolio(alice, "0xalice").projectedAnnualIncome > portfolio.projectedAnnualIncome
+print("✓ Catalog changes revalue cached portfolios")
+
+print("\n" + "=" * 80)
+print("PORTFOLIO VALUATION TEST COMPLETE")
+print("=" * 80)
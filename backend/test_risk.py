@@ -0,0 +1,72 @@
+"""
+Monte Carlo rate risk test for Bond Investment Platform
+Tests Vasicek scenarios, repricing, scenario caching, process-pool parity and VaR/ES aggregation
+"""
+
+from datetime import date, datetime
+
+import numpy as np
+
+from bond_fixtures import make_bond
+from coupon_schedule import CouponSchedule, ScheduleSet
+from risk import RiskEngine, VasicekModel
+
+print("=" * 80)
+print("MONTE CARLO RATE RISK TEST")
+print("=" * 80)
+
+TODAY = date(2026, 1, 1)
+model = VasicekModel(mean_reversion=0.2, long_rate=0.05, volatility=0.012, initial_rate=0.03)
+ISSUE = datetime(2025, 1, 1)
+
+
+schedules = ScheduleSet(CouponSchedule.build(bond) for bond in [
+    make_bond(0, 450, datetime(2036, 1, 1), issue=ISSUE),
+    make_bond(1, 400, datetime(2031, 1, 1), 4, issue=ISSUE),
+    make_bond(2, 350, datetime(2026, 1, 5), 1, issue=ISSUE),  # Matures inside the horizon
+])
+
+# Test 1: Scenarios follow the Vasicek transition density and zero prices are sane
+print("\n[TEST 1] Model...")
+rates = model.simulate(1.0, 200000, seed=1)
+decay = np.exp(-0.2)
+assert abs(rates.mean() - (0.03 * decay + 0.05 * (1 - decay))) < 1e-4
+assert abs(rates.std() - 0.012 * np.sqrt((1 - decay ** 2) / 0.4)) < 1e-4
+log_a, B = model.zero_coefficients(np.array([0.0, 1.0, 10.0]))
+prices = np.exp(log_a - B * 0.03)
+assert prices[0] == 1.0 and 1.0 > prices[1] > prices[2] > 0
+print(f"✓ Horizon rate mean {rates.mean():.5f}, std {rates.std():.5f}; zero prices {prices.round(4).tolist()}")
+
+# Test 2: Scenario sets are cached by seed; process-pool repricing matches the serial path
+print("\n[TEST 2] Engine...")
+engine = RiskEngine(model, workers=1, chunk_elements=1000)
+serial = engine.bond_pnl(schedules, TODAY, 10, 5000, seed=7)
+assert engine.scenarios(10 / 365.0, 5000, 7) is engine.scenarios(10 / 365.0, 5000, 7)
+assert engine.cache_stats()["misses"] == 1 and engine.cache_stats()["hits"] == 2
+assert abs(serial["pnl"][:, 2].std()) < 1e-12  # Fully repaid before the horizon: no rate risk
+assert serial["pnl"][:, 0].std() > serial["pnl"][:, 1].std()  # Longer bond, more risk
+print(f"✓ P&L std per unit face: {serial['pnl'].std(axis=0).round(6).tolist()}")
+
+# Forked workers: spawning would re-run this script in each worker
+parallel_engine = RiskEngine(model, workers=2, parallel_threshold=0, chunk_elements=1000, start_method="fork")
+parallel = parallel_engine.bond_pnl(schedules, TODAY, 10, 5000, seed=7)
+parallel_engine.close()
+assert np.allclose(parallel["pnl"], serial["pnl"])
+print("✓ Process-pool repricing matches the serial path")
+
+# Test 3: Portfolio aggregation
+print("\n[TEST 3] Portfolio VaR/ES...")
+report = engine.portfolio_risk(schedules, {0: 1000.0, 1: 500.0, 9: 100.0}, TODAY, 10, 5000, seed=7)
+expected = serial["pnl"][:, :2] @ np.array([1000.0, 500.0])
+assert abs(report["expectedPnl"] - expected.mean()) < 1e-9
+for measure in report["measures"]:
+    assert 0 < measure["valueAtRisk"] <= measure["expectedShortfall"]
+assert report["measures"][1]["valueAtRisk"] > report["measures"][0]["valueAtRisk"]
+doubled = engine.portfolio_risk(schedules, {0: 2000.0, 1: 1000.0}, TODAY, 10, 5000, seed=7)
+assert abs(doubled["measures"][0]["valueAtRisk"] - 2 * report["measures"][0]["valueAtRisk"]) < 1e-6
+print(f"✓ Value {report['value']:.2f}, 99% VaR {report['measures'][1]['valueAtRisk']:.2f}, "
+      f"ES {report['measures'][1]['expectedShortfall']:.2f}")
+
+print("\n" + "=" * 80)
+print("MONTE CARLO RATE RISK TEST COMPLETE")
+print("=" * 80)
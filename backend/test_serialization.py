@@ -0,0 +1,75 @@
+"""
+Serialization test for Bond Investment Platform
+Tests that msgspec Struct mirrors and FastJSONResponse produce the same JSON as the Pydantic path
+"""
+
+import json
+import os
+import tempfile
+
+from fastapi.encoders import jsonable_encoder
+
+import database
+from database import Database
+from models import Bond, Holding, Investment, Portfolio
+from serialization import BondStruct, HoldingStruct, InvestmentStruct, PortfolioStruct, FastJSONResponse, bond_struct
+from services import BondService, InvestmentService, PortfolioValuationService
+
+print("=" * 80)
+print("SERIALIZATION TEST")
+print("=" * 80)
+
+# TEST 1: Mirrors carry exactly the model fields
+print("\nTEST 1: Struct mirrors match the Pydantic models")
+for model, struct in ((Bond, BondStruct), (Investment, InvestmentStruct),
+                      (Holding, HoldingStruct), (Portfolio, PortfolioStruct)):
+    assert set(model.model_fields) == set(struct.__struct_fields__), model.__name__
+print("✓ Bond, Investment, Holding and Portfolio mirrors are in sync")
+
+# TEST 2: Same JSON as model_dump + jsonable_encoder
+print("\nTEST 2: Encoded bonds match the Pydantic output")
+database._db = Database(os.path.join(tempfile.mkdtemp(), "serialization_test.db"))
+db = database._db
+bond_service = BondService()
+bond_service.add_bond(Bond(
+    id=1, name="Treasury 2030", issuer="Treasury", faceValue=1000.0, couponRate=425,
+    maturityDate="2030-06-30T00:00:00", issueDate="2025-06-30T00:00:00", description="Note \"A\" – 5y",
+    minimumInvestment=100.0, bondTokenAddress="0x" + "1" * 40, couponFrequency=4
+))
+bond = bond_service.get_bond(1)
+structs = bond_service.get_bond_structs()
+assert json.loads(FastJSONResponse(structs).body) == jsonable_encoder([bond.model_dump()])
+assert bond_service.get_bond_structs() is structs
+assert FastJSONResponse(bond_struct(bond)).body == FastJSONResponse(bond).body
+print("✓ Struct, Pydantic and dict inputs encode identically; Structs are cached per catalog")
+
+# TEST 3: sqlite3.Row results encode directly
+print("\nTEST 3: sqlite3.Row encoding")
+user_id = db.create_user("ser@example.com", "ser", "hash")["id"]
+db.record_transaction(user_id, "investment", 250.5, bond_id=1, status="completed", description="Buy")
+rows = db.get_user_transactions(user_id, raw_rows=True)
+assert not isinstance(rows[0], dict)
+assert json.loads(FastJSONResponse({"transactions": rows}).body) == {
+    "transactions": db.get_user_transactions(user_id)
+}
+page, _ = db.get_transactions_page(limit=10, raw_rows=True)
+assert json.loads(FastJSONResponse(page).body)[0]["username"] == "ser"
+print("✓ Rows from get_user_transactions and get_transactions_page encode as objects")
+
+# TEST 4: Valued portfolios are built as Structs and encode as a valid Portfolio
+print("\nTEST 4: Portfolio encoding")
+investment_service = InvestmentService()
+for amount in (150.0, 300.25):
+    investment_service.record_investment(
+        Investment(bondId=1, investorAddress="0x" + "2" * 40, amount=amount), user_id=user_id
+    )
+portfolio = PortfolioValuationService(investment_service, bond_service).get_portfolio(user_id, "0xser")
+assert isinstance(portfolio, PortfolioStruct) and isinstance(portfolio.holdings[0], HoldingStruct)
+encoded = json.loads(FastJSONResponse(portfolio).body)
+assert encoded == jsonable_encoder(Portfolio.model_validate(encoded).model_dump())
+assert encoded["totalInvested"] == 450.25 and encoded["holdings"][0]["investmentCount"] == 2
+print("✓ get_portfolio returns a PortfolioStruct that encodes to the Portfolio model's JSON")
+
+print("\n" + "=" * 80)
+print("ALL SERIALIZATION TESTS PASSED")
+print("=" * 80)
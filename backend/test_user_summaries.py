@@ -0,0 +1,84 @@
+"""
+User summary test for Bond Investment Platform
+Tests the set-based /api/admin/users/full query against the per-user queries it replaced
+"""
+
+import os
+import tempfile
+
+from database import Database, decode_cursor
+
+print("=" * 80)
+print("USER SUMMARIES TEST")
+print("=" * 80)
+
+db = Database(os.path.join(tempfile.mkdtemp(), "user_summaries_test.db"))
+
+# Seed users with different mixes of activity; every third user has no payment access
+user_ids = []
+for n in range(7):
+    user_id = db.create_user(f"summary_{n}@example.com", f"summary_{n}", f"hash_{n}")["id"]
+    user_ids.append(user_id)
+    if n % 3:
+        db.create_payment_access(user_id)
+    for i in range(n):
+        amount = 10.0 * (i + 1) + 0.1 * n
+        db.record_investment(user_id, i % 3, f"0x{n:040x}", amount, "2026-01-01T00:00:00")
+        transaction = db.record_transaction(user_id, "investment", amount, bond_id=i % 3)
+        if i % 2 == 0:
+            db.create_transaction_bill(transaction["id"], user_id, f"Bond {i % 3}", amount, "investment")
+    if n == 5:
+        db.record_transaction(user_id, "withdrawal", 5.0)
+
+
+def expected(user: dict) -> dict:
+    """Build a summary the way the endpoint did before, with one query per table per user"""
+    investments = db.get_user_investments(user["id"])
+    return {
+        **user,
+        "payment_access": db.get_payment_access(user["id"]),
+        "transaction_count": len(db.get_user_transactions(user["id"])),
+        "bill_count": len(db.get_user_bills(user["id"])),
+        "investment_count": len(investments),
+        "total_invested": round(sum(inv["amount"] for inv in investments), 2),
+    }
+
+
+# Test 1: One query returns the same counts and sums as the per-user queries
+print("\n[TEST 1] Summaries match per-user queries...")
+summaries, next_cursor = db.get_user_summaries()
+assert next_cursor is None
+assert sorted(s["id"] for s in summaries) == sorted(user_ids)
+users = {user["id"]: user for user in db.get_all_users()}
+for summary in summaries:
+    assert summary == expected(users[summary["id"]]), summary
+busiest = next(s for s in summaries if s["username"] == "summary_6")
+assert (busiest["investment_count"], busiest["transaction_count"], busiest["bill_count"]) == (6, 6, 3)
+assert busiest["total_invested"] == 213.6
+idle = next(s for s in summaries if s["username"] == "summary_0")
+assert (idle["investment_count"], idle["total_invested"], idle["payment_access"]) == (0, 0.0, None)
+print(f"✓ {len(summaries)} users: counts, totals and payment access match")
+
+# Test 2: The id cursor pages through every user exactly once, newest first
+print("\n[TEST 2] Paging with the cursor...")
+pages, cursor = [], None
+while True:
+    page, cursor = db.get_user_summaries(limit=3, cursor=cursor)
+    pages.append(page)
+    if cursor is None:
+        break
+    assert decode_cursor(cursor) == (page[-1]["created_at"], page[-1]["id"])
+assert [len(page) for page in pages] == [3, 3, 1]
+paged = [summary for page in pages for summary in page]
+assert paged == summaries
+assert [(s["created_at"], s["id"]) for s in paged] == sorted(
+    ((s["created_at"], s["id"]) for s in paged), reverse=True)
+exact, cursor = db.get_user_summaries(limit=len(user_ids))
+assert len(exact) == len(user_ids) and cursor is None
+print("✓ Pages of 3, 3 and 1 cover every user once; no cursor after the last page")
+
+db.close()
+
+print("\n" + "=" * 80)
+print("ALL USER SUMMARIES TESTS PASSED")
+print("=" * 80)
@@ -0,0 +1,121 @@
+"""
+Group-commit write queue test for Bond Investment Platform
+Tests shared commits under concurrency, returned ids, per-write failures and draining on close
+"""
+
+import os
+import tempfile
+import threading
+
+import database
+from database import Database
+from models import Investment
+from services import InvestmentService
+from write_queue import GroupCommitWriter
+
+print("=" * 80)
+print("GROUP-COMMIT WRITE QUEUE TEST")
+print("=" * 80)
+
+database._db = Database(os.path.join(tempfile.mkdtemp(), "write_queue_test.db"))
+db = database._db
+user_id = db.create_user("queue@example.com", "queue", "hash")["id"]
+writer = GroupCommitWriter(db, max_batch=64, max_latency=0.05)
+investment_service = InvestmentService(writer)
+
+THREADS, PER_THREAD = 8, 25
+records, errors = [], []
+
+
+def invest(thread: int):
+    try:
+        for i in range(PER_THREAD):
+            record = investment_service.record_investment(
+                Investment(bondId=thread % 3, investorAddress=f"0x{thread:040x}", amount=float(10 + i)),
+                user_id=user_id
+            )
+            transaction = writer.submit(db.record_transaction, user_id, "investment", record["amount"],
+                                        bond_id=record["bond_id"], status="completed").result()
+            bill = writer.submit(db.create_transaction_bill, transaction["id"], user_id, "Bond",
+                                 record["amount"], "investment", "completed").result()
+            records.append((record, transaction, bill))
+    except Exception as e:
+        errors.append(e)
+
+
+# TEST 1: Concurrent writers get their own ids back and every row is stored
+print("\nTEST 1: Concurrent investments, transactions and bills")
+threads = [threading.Thread(target=invest, args=(t,)) for t in range(THREADS)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+assert not errors, errors
+total = THREADS * PER_THREAD
+assert len({record["id"] for record, _, _ in records}) == total
+stored = {row["id"]: row for row in db.get_user_investments(user_id)}
+transactions = {row["id"]: row for row in db.get_user_transactions(user_id)}
+bills = {row["id"]: row for row in db.get_user_bills(user_id)}
+assert len(stored) == len(transactions) == len(bills) == total
+for record, transaction, bill in records:
+    assert stored[record["id"]]["amount"] == record["amount"]
+    assert transactions[transaction["id"]]["amount"] == record["amount"]
+    assert bills[bill["id"]]["transaction_id"] == transaction["id"]
+assert db.verify_aggregates() == []
+print(f"✓ {total} investments with transactions and bills stored under their returned ids")
+
+# TEST 2: Writes were actually grouped
+print("\nTEST 2: Group sizes")
+stats = writer.stats()
+assert stats["writes"] == 3 * total and stats["failed"] == 0
+assert stats["groups"] < stats["writes"] and stats["largest_group"] > 1, stats
+print(f"✓ {stats['writes']} writes in {stats['groups']} commits (largest {stats['largest_group']})")
+
+# TEST 3: A failing write is rolled back alone
+print("\nTEST 3: Per-write failures")
+def fail(**kwargs):
+    db.record_transaction(user_id, "withdrawal", 1.0, description="rolled back")
+    raise ValueError("rejected")
+
+before = writer.stats()["groups"]
+good = writer.submit(db.record_transaction, user_id, "withdrawal", 2.0, description="kept")
+bad = writer.submit(fail)
+after = writer.submit(db.record_transaction, user_id, "withdrawal", 3.0, description="kept")
+assert good.result()["id"] and after.result()["id"]
+try:
+    bad.result()
+    raise AssertionError("failing write should raise")
+except ValueError as e:
+    assert str(e) == "rejected"
+descriptions = [row["description"] for row in db.get_user_transactions(user_id) if row["type"] == "withdrawal"]
+assert sorted(descriptions) == ["kept", "kept"], descriptions
+assert writer.stats()["groups"] == before + 1 and writer.stats()["failed"] == 1
+print("✓ Neighbouring writes in the same commit are kept, the failing one is not")
+
+# TEST 4: Group commits are fsynced even when the profile is not
+print("\nTEST 4: Durability")
+def synchronous_in_group():
+    with db.get_connection() as conn:
+        return conn, conn.execute("PRAGMA synchronous").fetchone()[0]
+
+assert db.pragmas["synchronous"] == "NORMAL"  # The default balanced profile
+conn, level = writer.submit(synchronous_in_group).result()
+assert level == 2
+assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+print("✓ Groups commit with synchronous=FULL; the pooled connection goes back to NORMAL")
+
+# TEST 5: close() commits queued writes, then refuses new ones
+print("\nTEST 5: Close")
+pending = [writer.submit(db.record_transaction, user_id, "withdrawal", 4.0) for _ in range(10)]
+writer.close()
+assert all(future.done() and future.result()["id"] for future in pending)
+try:
+    writer.submit(db.record_transaction, user_id, "withdrawal", 5.0)
+    raise AssertionError("closed writer should refuse writes")
+except RuntimeError:
+    pass
+print("✓ Queued writes committed on close; later submits are refused")
+
+print("\n" + "=" * 80)
+print("ALL GROUP-COMMIT WRITE QUEUE TESTS PASSED")
+print("=" * 80)
@@ -0,0 +1,150 @@
+"""
+Group commit for the Bond Investment Platform
+A single writer thread commits database writes queued by concurrent requests in shared transactions
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from database import Database
+from config import GROUP_COMMIT_MAX_BATCH, GROUP_COMMIT_MAX_LATENCY
+
+
+class GroupCommitWriter:
+    """Runs queued Database write methods on one thread, many per transaction
+
+    The writer takes the first queued write, keeps collecting for up to
+    `max_latency` seconds or `max_batch` writes, then runs them all in one
+    BEGIN IMMEDIATE ... COMMIT: one write-lock acquisition and one fsync
+    per group instead of per write. The Database methods join that
+    transaction through get_connection's per-thread reuse, and each runs
+    under a savepoint so a failing write is rolled back alone.
+
+    Group commits run with synchronous=FULL whatever the DB_PROFILE, so
+    the WAL is fsynced even under the default "balanced" profile
+    (synchronous=NORMAL), and the connection's own setting is restored
+    afterwards. Futures are resolved only after the group commits, with
+    the method's return value (e.g. the record with its new id) or its
+    exception, so nothing is acknowledged before it is durable. Writes
+    still queued when the process dies were never acknowledged.
+    """
+
+    # PRAGMA synchronous level for group commits: FULL, or EXTRA if the profile asks for more
+    SYNCHRONOUS_FULL = 2
+
+    def __init__(self, db: Database, max_batch: int = GROUP_COMMIT_MAX_BATCH,
+                 max_latency: float = GROUP_COMMIT_MAX_LATENCY):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Metrics
+        self._writes = 0
+        self._failed = 0
+        self._groups = 0
+        self._largest_group = 0
+        self._commit_time_total = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, write: Callable, *args, **kwargs) -> Future:
+        """Queue `write(*args, **kwargs)`, a Database write method; returns a Future for its result"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            self._queue.put((write, args, kwargs, future))
+        return future
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+            group = [item]
+            deadline = time.monotonic() + self.max_latency
+            while len(group) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+            self._commit(group)
+
+    def _commit(self, group: list):
+        group = [item for item in group if item[3].set_running_or_notify_cancel()]
+        if not group:
+            return
+        start = time.monotonic()
+        outcomes = []
+        try:
+            with self.db.get_connection() as conn:
+                # synchronous can only change outside a transaction, so the
+                # group is committed here rather than by get_connection
+                synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+                conn.execute(f"PRAGMA synchronous = {max(synchronous, self.SYNCHRONOUS_FULL)}")
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for write, args, kwargs, _ in group:
+                        conn.execute("SAVEPOINT queued_write")
+                        try:
+                            outcomes.append((write(*args, **kwargs), None))
+                        except Exception as e:
+                            conn.execute("ROLLBACK TO queued_write")
+                            outcomes.append((None, e))
+                        conn.execute("RELEASE queued_write")
+                    conn.commit()
+                finally:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    conn.execute(f"PRAGMA synchronous = {synchronous}")
+        except Exception as e:
+            # Nothing in the group was committed
+            outcomes = [(None, e)] * len(group)
+
+        with self._lock:
+            self._groups += 1
+            self._writes += len(group)
+            self._failed += sum(error is not None for _, error in outcomes)
+            self._largest_group = max(self._largest_group, len(group))
+            self._commit_time_total += time.monotonic() - start
+        for (_, _, _, future), (result, error) in zip(group, outcomes):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def stats(self) -> dict:
+        """Queue depth, group sizes and commit times"""
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "writes": self._writes,
+                "failed": self._failed,
+                "groups": self._groups,
+                "avg_group_size": self._writes / self._groups if self._groups else 0.0,
+                "largest_group": self._largest_group,
+                "avg_commit_ms": self._commit_time_total / self._groups * 1000 if self._groups else 0.0,
+                "max_batch": self.max_batch,
+                "max_latency_ms": self.max_latency * 1000,
+            }
+
+    def close(self):
+        """Commit everything already queued, then stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
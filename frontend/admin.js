@@ -7,6 +7,8 @@ const ADMIN_API_URL = 'http://localhost:8000/api/admin';
 let adminToken = null;
 let adminUser = null;
 let currentAdminTab = 'users'; // Track current tab
+// Rows loaded so far for each paginated tab, and the cursor of the next page
+const adminPages = {};
 
 // Initialize admin module
 document.addEventListener('DOMContentLoaded', () => {
@@ -269,13 +271,49 @@ async function loadAdminDashboard() {
 }
 
 /**
- * Load all users with full data
+ * URL of the first page of a listing, or of its next page when appending
  */
-async function loadAdminUsers() {
+function adminPageUrl(tabName, path, append) {
+    const page = adminPages[tabName];
+    if (append && page && page.cursor) {
+        return `${ADMIN_API_URL}${path}?cursor=${encodeURIComponent(page.cursor)}`;
+    }
+    return `${ADMIN_API_URL}${path}`;
+}
+
+/**
+ * Add a fetched page to the rows already loaded for a tab
+ */
+function mergeAdminPage(tabName, listKey, data, append) {
+    const loaded = append && adminPages[tabName] ? adminPages[tabName].items : [];
+    const items = loaded.concat(data[listKey] || []);
+    adminPages[tabName] = { items: items, cursor: data.next_cursor || null };
+    data[listKey] = items;
+    return data;
+}
+
+/**
+ * Row count and a "Load more" button while further pages exist
+ */
+function adminPager(tabName, loaderName, total) {
+    const page = adminPages[tabName];
+    if (!page) return '';
+    let html = '<div class="form-actions"><span>Showing ' + page.items.length + ' of ' + total + '</span>';
+    if (page.cursor) {
+        html += '<button class="btn btn-secondary" onclick="' + loaderName + '(true)">Load more</button>';
+    }
+    html += '</div>';
+    return html;
+}
+
+/**
+ * Load users with full data, one page at a time
+ */
+async function loadAdminUsers(append = false) {
     if (!adminToken) return;
 
     try {
-        const response = await fetch(`${ADMIN_API_URL}/users/full`, {
+        const response = await fetch(adminPageUrl('users', '/users/full', append), {
             headers: {
                 'Authorization': `Bearer ${adminToken}`
             }
@@ -291,7 +329,7 @@ async function loadAdminUsers() {
         }
 
         const data = await response.json();
-        displayAdminUsers(data);
+        displayAdminUsers(mergeAdminPage('users', 'users', data, append));
     } catch (error) {
         console.error('Error loading users:', error);
         showAdminMessage('users', 'Error loading users: ' + error.message, true);
@@ -343,6 +381,7 @@ function displayAdminUsers(data) {
     });
 
     html += '</tbody></table>';
+    html += adminPager('users', 'loadAdminUsers', data.total_users);
     container.innerHTML = html;
 }
 
@@ -507,11 +546,11 @@ async function deleteBond(bondId) {
 /**
  * Load payment access
  */
-async function loadAdminPaymentAccess() {
+async function loadAdminPaymentAccess(append = false) {
     if (!adminToken) return;
 
     try {
-        const response = await fetch(`${ADMIN_API_URL}/payment-access`, {
+        const response = await fetch(adminPageUrl('payments', '/payment-access', append), {
             headers: {
                 'Authorization': `Bearer ${adminToken}`
             }
@@ -520,7 +559,7 @@ async function loadAdminPaymentAccess() {
         if (!response.ok) throw new Error('Failed to load payment access');
 
         const data = await response.json();
-        displayPaymentAccess(data);
+        displayPaymentAccess(mergeAdminPage('payments', 'payment_access', data, append));
     } catch (error) {
         console.error('Error loading payment access:', error);
         showAdminMessage('payments', 'Error loading payment access: ' + error.message, true);
@@ -561,17 +600,18 @@ function displayPaymentAccess(data) {
     });
 
     html += '</tbody></table>';
+    html += adminPager('payments', 'loadAdminPaymentAccess', data.total_records);
     container.innerHTML = html;
 }
 
 /**
  * Load transactions
  */
-async function loadAdminTransactions() {
+async function loadAdminTransactions(append = false) {
     if (!adminToken) return;
 
     try {
-        const response = await fetch(`${ADMIN_API_URL}/transactions`, {
+        const response = await fetch(adminPageUrl('transactions', '/transactions', append), {
             headers: {
                 'Authorization': `Bearer ${adminToken}`
             }
@@ -580,7 +620,7 @@ async function loadAdminTransactions() {
         if (!response.ok) throw new Error('Failed to load transactions');
 
         const data = await response.json();
-        displayAdminTransactions(data);
+        displayAdminTransactions(mergeAdminPage('transactions', 'transactions', data, append));
     } catch (error) {
         console.error('Error loading transactions:', error);
         showAdminMessage('transactions', 'Error loading transactions: ' + error.message, true);
@@ -620,17 +660,18 @@ function displayAdminTransactions(data) {
     });
 
     html += '</tbody></table>';
+    html += adminPager('transactions', 'loadAdminTransactions', data.total_transactions);
     container.innerHTML = html;
 }
 
 /**
  * Load bills
  */
-async function loadAdminBills() {
+async function loadAdminBills(append = false) {
     if (!adminToken) return;
 
     try {
-        const response = await fetch(`${ADMIN_API_URL}/bills`, {
+        const response = await fetch(adminPageUrl('bills', '/bills', append), {
             headers: {
                 'Authorization': `Bearer ${adminToken}`
             }
@@ -639,7 +680,7 @@ async function loadAdminBills() {
         if (!response.ok) throw new Error('Failed to load bills');
 
         const data = await response.json();
-        displayAdminBills(data);
+        displayAdminBills(mergeAdminPage('bills', 'bills', data, append));
     } catch (error) {
         console.error('Error loading bills:', error);
         showAdminMessage('bills', 'Error loading bills: ' + error.message, true);
@@ -685,6 +726,7 @@ function displayAdminBills(data) {
     });
 
     html += '</tbody></table>';
+    html += adminPager('bills', 'loadAdminBills', data.total_bills);
     container.innerHTML = html;
 }
 
@@ -776,12 +818,9 @@ function viewUserDetails(userId) {
 async function fetchAndShowUserDetails(userId, basicUser) {
     if (!adminToken) return;
     try {
-        const response = await fetch(`${ADMIN_API_URL}/users/full`, {
-            headers: { 'Authorization': `Bearer ${adminToken}` }
-        });
-        if (!response.ok) throw new Error('Failed to fetch user details');
-        const data = await response.json();
-        const fullUser = data.users.find(u => u.id === userId);
+        // The user's row came from a page already loaded into the table
+        const loaded = adminPages.users ? adminPages.users.items : [];
+        const fullUser = loaded.find(u => u.id === userId);
         if (!fullUser) {
             alert('User details not found');
             return;
@@ -830,3 +869,7 @@ window.fetchAndShowUserDetails = fetchAndShowUserDetails;
 window.displayUserDetailsModal = displayUserDetailsModal;
 window.closeUserDetailsModal = closeUserDetailsModal;
 window.editPaymentAccess = editPaymentAccess;
+window.loadAdminUsers = loadAdminUsers;
+window.loadAdminPaymentAccess = loadAdminPaymentAccess;
+window.loadAdminTransactions = loadAdminTransactions;
+window.loadAdminBills = loadAdminBills;